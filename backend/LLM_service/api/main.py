@@ -1,34 +1,57 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from contextlib import asynccontextmanager
 from typing import Optional
+import asyncio
+import json
+import time
+import os
 
 from api.models import (
     SpeakingTopicRequest, SpeakingTopicResponse,
     SpeakingEvaluateRequest, SpeakingEvaluateResponse,
-    SpeakingFullEvaluateResponse, TranscribeResponse,
+    SpeakingFullEvaluateResponse, TranscribeResponse, SpeakingEvalMode,
+    ReadAloudTopicRequest, ReadAloudTopicResponse, ReadAloudEvaluateResponse,
     PronunciationRequest, PronunciationResponse,
     PronunciationTipsResponse, RelatedWordsResponse, AutocompleteResponse,
     WritingTopicRequest, WritingTopicResponse,
-    WritingEvaluateRequest, WritingEvaluateResponse,
+    WritingEvaluateRequest, WritingEvaluateResponse, WritingBatchEvaluateRequest,
     CustomTopicRequest, CustomTopicResponse,
-    TopicListResponse, HealthResponse,
+    TopicListResponse, HealthResponse, JobSubmitResponse, JobStatusResponse,
     YouTubeRecommendationsRequest, YouTubeRecommendationsResponse, YouTubeVideo
 )
 
 # Import modularized services
 from api.services import (
-    init_all_services, check_minio_connected, check_data_loaded,
+    init_all_services, close_groq, check_minio_connected, check_data_loaded,
     get_speaking_topic, get_writing_topic, generate_topic,
     evaluate_speaking, evaluate_writing, get_pronunciation,
-    get_all_topics, generate_pronunciation_audio, speaking_data,
+    get_all_topics, speaking_data,
     transcribe_audio, evaluate_speaking_full, evaluate_speaking_from_transcript,
     get_pronunciation_tips, get_related_words, search_words,
     get_recommended_videos, extract_weaknesses_from_speaking, extract_weaknesses_from_writing,
-    search_youtube_videos
+    search_youtube_videos, bypass_llm_cache, get_llm_cache_stats,
+    get_groq_key_stats, get_data_stats, refresh_word_index, get_word_index_stats,
+    get_pronunciation_audio_cached, get_tts_cache_stats, get_bundle_version, get_transcript_cache_stats,
+    evaluate_writing_stream, evaluation_jobs, QueueFullError, get_job_stats,
+    evaluate_writing_batch, WRITING_BATCH_MAX_ESSAYS, shutdown_audio_pool,
+    spool_upload, AudioTooLargeError, AudioTooLongError,
+    get_read_aloud_topic, evaluate_read_aloud, READ_ALOUD_MAX_REFERENCE_CHARS
 )
 
+# How often (seconds) to check whether the dictionary word index changed; 0 disables
+WORD_INDEX_REFRESH_INTERVAL = float(os.getenv("WORD_INDEX_REFRESH_INTERVAL", "600"))
+
+async def _refresh_word_index_periodically():
+    """Reload the autocomplete index when the dictionary is re-ingested"""
+    while True:
+        await asyncio.sleep(WORD_INDEX_REFRESH_INTERVAL)
+        try:
+            await asyncio.to_thread(refresh_word_index)
+        except Exception as e:
+            print(f"⚠️ Word index refresh failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup - Initialize modular services
@@ -38,9 +61,19 @@ async def lifespan(app: FastAPI):
         print("✅ All services ready!")
     else:
         print("⚠️ Some services failed to initialize")
+    
+    refresher = None
+    if WORD_INDEX_REFRESH_INTERVAL > 0:
+        refresher = asyncio.create_task(_refresh_word_index_periodically())
+    evaluation_jobs.start()
     yield
     # Shutdown
     print("👋 English Learning API shutting down...")
+    if refresher:
+        refresher.cancel()
+    await evaluation_jobs.stop()
+    await close_groq()
+    shutdown_audio_pool()
 
 app = FastAPI(
     title="English Learning API",
@@ -64,9 +97,23 @@ async def health_check():
     return HealthResponse(
         status="ok",
         minio_connected=check_minio_connected(),
-        data_loaded=check_data_loaded()
+        data_loaded=check_data_loaded(),
+        bundle_version=get_bundle_version()
     )
 
+@app.get("/stats", tags=["Health"])
+async def service_stats():
+    """Data, LLM result cache and per-key Groq usage statistics"""
+    return {
+        "data": get_data_stats(),
+        "word_index": get_word_index_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "groq_keys": get_groq_key_stats(),
+        "tts_cache": get_tts_cache_stats(),
+        "transcript_cache": get_transcript_cache_stats(),
+        "jobs": get_job_stats()
+    }
+
 # ========== SPEAKING ==========
 @app.post("/speaking/topic", response_model=SpeakingTopicResponse, tags=["Speaking"])
 async def get_speaking_topic_endpoint(request: SpeakingTopicRequest):
@@ -84,11 +131,19 @@ async def evaluate_speaking_endpoint(request: SpeakingEvaluateRequest):
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
     
-    result = evaluate_speaking(request.topic_id, topic["context"], request.transcript)
+    with bypass_llm_cache(request.no_cache):
+        result = await evaluate_speaking(request.topic_id, topic["context"], request.transcript, request.mode)
     if not result:
         raise HTTPException(status_code=500, detail="Evaluation failed - check LLM configuration")
     return SpeakingEvaluateResponse(**result)
 
+async def _spool_audio(audio: UploadFile):
+    """Stream the upload into an AudioUpload, rejecting oversized/over-long recordings early"""
+    try:
+        return await spool_upload(audio, audio.filename or "audio.wav")
+    except (AudioTooLargeError, AudioTooLongError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/speaking/transcribe", response_model=TranscribeResponse, tags=["Speaking"])
 async def transcribe_audio_endpoint(audio: UploadFile = File(...)):
     """
@@ -100,13 +155,11 @@ async def transcribe_audio_endpoint(audio: UploadFile = File(...)):
     if audio.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail=f"Unsupported audio format: {audio.content_type}")
     
-    # Read audio data
-    audio_data = await audio.read()
-    if len(audio_data) > 25 * 1024 * 1024:  # 25MB limit
-        raise HTTPException(status_code=400, detail="Audio file too large (max 25MB)")
-    
-    # Transcribe
-    transcript, metadata = transcribe_audio(audio_data, audio.filename or "audio.wav")
+    upload = await _spool_audio(audio)
+    try:
+        transcript, metadata = await transcribe_audio(upload, upload.filename)
+    finally:
+        upload.close()
     
     if transcript:
         return TranscribeResponse(
@@ -125,7 +178,9 @@ async def transcribe_audio_endpoint(audio: UploadFile = File(...)):
 async def evaluate_speaking_audio_endpoint(
     audio: UploadFile = File(...),
     topic_id: str = Form(...),
-    topic_context: Optional[str] = Form(None)
+    topic_context: Optional[str] = Form(None),
+    no_cache: bool = Form(False),
+    mode: Optional[SpeakingEvalMode] = Form(None)
 ):
     """
     Full speaking evaluation with 4 layers:
@@ -148,16 +203,53 @@ async def evaluate_speaking_audio_endpoint(
             raise HTTPException(status_code=404, detail="Topic not found")
         topic_context = topic["context"]
     
-    # Read audio data
-    audio_data = await audio.read()
-    if len(audio_data) > 25 * 1024 * 1024:  # 25MB limit
-        raise HTTPException(status_code=400, detail="Audio file too large (max 25MB)")
+    upload = await _spool_audio(audio)
     
     # Full evaluation with all layers
-    result = evaluate_speaking_full(audio_data, topic_context, topic_id, audio.filename or "audio.wav")
+    try:
+        with bypass_llm_cache(no_cache):
+            result = await evaluate_speaking_full(upload, topic_context, topic_id, upload.filename, mode)
+    finally:
+        upload.close()
     
     return SpeakingFullEvaluateResponse(**result)
 
+@app.post("/speaking/evaluate-audio/jobs", response_model=JobSubmitResponse, status_code=202, tags=["Jobs"])
+async def submit_speaking_audio_job(
+    audio: UploadFile = File(...),
+    topic_id: str = Form(...),
+    topic_context: Optional[str] = Form(None),
+    no_cache: bool = Form(False),
+    mode: Optional[SpeakingEvalMode] = Form(None)
+):
+    """Queue a full speaking evaluation; poll GET /jobs/{job_id} for the result"""
+    allowed_types = ["audio/wav", "audio/mpeg", "audio/mp3", "audio/m4a", "audio/webm", "audio/ogg", "audio/x-wav"]
+    if audio.content_type not in allowed_types:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio format: {audio.content_type}")
+    
+    if not topic_context:
+        topic = get_speaking_topic(topic_id)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        topic_context = topic["context"]
+    
+    # Spooled copy outlives the request; the job deletes it when done
+    upload = await _spool_audio(audio)
+    
+    async def run():
+        try:
+            with bypass_llm_cache(no_cache):
+                result = await evaluate_speaking_full(upload, topic_context, topic_id, upload.filename, mode)
+        finally:
+            upload.close()
+        return SpeakingFullEvaluateResponse(**result).model_dump()
+    
+    try:
+        return _submit_job("speaking_audio", run)
+    except HTTPException:
+        upload.close()
+        raise
+
 @app.post("/speaking/evaluate-full", response_model=SpeakingFullEvaluateResponse, tags=["Speaking"])
 async def evaluate_speaking_full_endpoint(request: SpeakingEvaluateRequest):
     """
@@ -177,19 +269,68 @@ async def evaluate_speaking_full_endpoint(request: SpeakingEvaluateRequest):
             raise HTTPException(status_code=404, detail="Topic not found")
         topic_context = topic["context"]
     
-    result = evaluate_speaking_from_transcript(request.topic_id, topic_context, request.transcript)
+    with bypass_llm_cache(request.no_cache):
+        result = await evaluate_speaking_from_transcript(request.topic_id, topic_context, request.transcript, request.mode)
     if not result:
         raise HTTPException(status_code=500, detail="Evaluation failed - check LLM configuration")
     
     return SpeakingFullEvaluateResponse(**result)
 
+@app.post("/speaking/read-aloud/topic", response_model=ReadAloudTopicResponse, tags=["Speaking"])
+async def get_read_aloud_topic_endpoint(request: ReadAloudTopicRequest):
+    """Get a Read Aloud passage (questions 1-2 from exam data)"""
+    topic = get_read_aloud_topic(request.topic_id, request.question_number)
+    if not topic:
+        raise HTTPException(status_code=404, detail="No Read Aloud passage found")
+    return ReadAloudTopicResponse(**topic)
+
+@app.post("/speaking/read-aloud/evaluate", response_model=ReadAloudEvaluateResponse, tags=["Speaking"])
+async def evaluate_read_aloud_endpoint(
+    audio: UploadFile = File(...),
+    topic_id: Optional[str] = Form(None),
+    question_number: Optional[str] = Form(None),
+    reference_text: Optional[str] = Form(None)
+):
+    """
+    Read Aloud evaluation (questions 1-2), no LLM involved:
+    1. ASR (Speech Recognition) - using Groq Whisper
+    2. Word alignment against the passage: WER, omitted/inserted/mispronounced words
+    3. Accuracy, completeness and fluency scores with TOEIC 0-3 estimate
+    
+    Pass topic_id + question_number for an exam passage, or reference_text for a custom one.
+    """
+    allowed_types = ["audio/wav", "audio/mpeg", "audio/mp3", "audio/m4a", "audio/webm", "audio/ogg", "audio/x-wav"]
+    if audio.content_type not in allowed_types:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio format: {audio.content_type}")
+    
+    if reference_text and len(reference_text) > READ_ALOUD_MAX_REFERENCE_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Reference text too long (max {READ_ALOUD_MAX_REFERENCE_CHARS} characters)"
+        )
+    if not reference_text:
+        if not topic_id or not question_number:
+            raise HTTPException(status_code=400, detail="Provide reference_text or topic_id and question_number")
+        topic = get_read_aloud_topic(topic_id, question_number)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Read Aloud passage not found")
+        reference_text = topic["context"]
+    
+    upload = await _spool_audio(audio)
+    try:
+        result = await evaluate_read_aloud(upload, reference_text, topic_id, question_number, upload.filename)
+    finally:
+        upload.close()
+    
+    return ReadAloudEvaluateResponse(**result)
+
 # ========== PRONUNCIATION ==========
 @app.post("/pronunciation", response_model=PronunciationResponse, tags=["Pronunciation"])
 async def get_pronunciation_endpoint(request: PronunciationRequest):
     """Get pronunciation info for a word (IPA and audio URL)
     If word not found in dictionary, LLM will generate IPA and meanings.
     """
-    result = get_pronunciation(request.word, generate_if_not_found=True)
+    result = await get_pronunciation(request.word, generate_if_not_found=True)
     return PronunciationResponse(**result)
 
 @app.get("/pronunciation/{word}", response_model=PronunciationResponse, tags=["Pronunciation"])
@@ -199,7 +340,7 @@ async def get_pronunciation_by_word(word: str, generate: bool = True):
     - **word**: The English word to look up
     - **generate**: If True and word not found, LLM will generate pronunciation (default: True)
     """
-    result = get_pronunciation(word, generate_if_not_found=generate)
+    result = await get_pronunciation(word, generate_if_not_found=generate)
     return PronunciationResponse(**result)
 
 @app.get("/pronunciation/{word}/tips", response_model=PronunciationTipsResponse, tags=["Pronunciation"])
@@ -212,11 +353,11 @@ async def get_pronunciation_tips_endpoint(word: str):
     - Similar sounding words for practice
     """
     # First get the IPA if available
-    pron_result = get_pronunciation(word, generate_if_not_found=True)
+    pron_result = await get_pronunciation(word, generate_if_not_found=True)
     ipa = pron_result.get("ipa")
     
     # Generate tips
-    result = get_pronunciation_tips(word, ipa)
+    result = await get_pronunciation_tips(word, ipa)
     return PronunciationTipsResponse(**result)
 
 @app.get("/pronunciation/{word}/related", response_model=RelatedWordsResponse, tags=["Pronunciation"])
@@ -243,28 +384,81 @@ async def search_autocomplete(q: str, limit: int = 10):
     suggestions = search_words(q, limit)
     return AutocompleteResponse(query=q, suggestions=suggestions)
 
+@app.post("/pronunciation/index/refresh", tags=["Pronunciation"])
+async def refresh_word_index_endpoint(force: bool = False):
+    """Reload the autocomplete word index (after the dictionary was re-ingested)"""
+    reloaded = await asyncio.to_thread(refresh_word_index, force)
+    return {"reloaded": reloaded, **get_word_index_stats()}
+
+# Audio for a (word, voice, speed) never changes, so clients may keep it
+AUDIO_CACHE_CONTROL = "public, max-age=2592000, immutable"
+
+def _parse_byte_range(range_header: str, size: int) -> Optional[tuple]:
+    """(start, end) inclusive for a single 'bytes=' range; None if unsatisfiable"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if not start:  # Suffix range: last N bytes
+            length = int(end)
+            return (max(0, size - length), size - 1) if length > 0 else None
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    return (start, end) if start <= end and start < size else None
+
 @app.get("/pronunciation/{word}/audio", tags=["Pronunciation"])
-async def get_pronunciation_audio(word: str):
+async def get_pronunciation_audio(
+    word: str,
+    voice: str = "us",
+    speed: str = "slow",
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
+):
     """Get pronunciation audio (MP3) for a word
     
     Audio is generated using Text-to-Speech, even for words not in dictionary.
+    Cached per (word, voice, speed); supports ETag revalidation and Range requests.
     """
-    # Generate audio (works for any word)
-    audio_data = generate_pronunciation_audio(word)
-    if not audio_data:
+    try:
+        cached = await get_pronunciation_audio_cached(word, voice, speed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not cached:
         raise HTTPException(status_code=500, detail="Failed to generate audio")
     
-    return Response(
-        content=audio_data,
-        media_type="audio/mpeg",
-        headers={"Content-Disposition": f"attachment; filename={word}.mp3"}
-    )
+    audio_data, etag = cached
+    headers = {
+        "Content-Disposition": f"attachment; filename={word}.mp3",
+        "ETag": etag,
+        "Cache-Control": AUDIO_CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+    
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    if range_header:
+        byte_range = _parse_byte_range(range_header, len(audio_data))
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(audio_data)}"})
+        start, end = byte_range
+        return Response(
+            content=audio_data[start:end + 1],
+            status_code=206,
+            media_type="audio/mpeg",
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{len(audio_data)}"}
+        )
+    
+    return Response(content=audio_data, media_type="audio/mpeg", headers=headers)
 
 # ========== WRITING ==========
 @app.post("/writing/topic", response_model=WritingTopicResponse, tags=["Writing"])
 async def get_writing_topic_endpoint(request: WritingTopicRequest):
     """Get a writing topic (exam, custom, or AI-generated)"""
-    topic = get_writing_topic(request.topic_type.value, request.topic_id, request.category)
+    topic = await get_writing_topic(request.topic_type.value, request.topic_id, request.category)
     if not topic:
         raise HTTPException(status_code=404, detail="No writing topic found")
     return WritingTopicResponse(**topic)
@@ -272,11 +466,134 @@ async def get_writing_topic_endpoint(request: WritingTopicRequest):
 @app.post("/writing/evaluate", response_model=WritingEvaluateResponse, tags=["Writing"])
 async def evaluate_writing_endpoint(request: WritingEvaluateRequest):
     """Evaluate writing essay with AI"""
-    result = evaluate_writing(request.topic_id, request.topic_context, request.essay)
+    with bypass_llm_cache(request.no_cache):
+        result = await evaluate_writing(
+            request.topic_id, request.topic_context, request.essay,
+            request.mode, request.include_improved_version
+        )
     if not result:
         raise HTTPException(status_code=500, detail="Evaluation failed - check LLM configuration")
     return WritingEvaluateResponse(**result)
 
+@app.post("/writing/evaluate/stream", tags=["Writing"])
+async def evaluate_writing_stream_endpoint(request: WritingEvaluateRequest, format: str = "sse"):
+    """Evaluate writing essay, streaming each step as it finishes
+    
+    Events: scores, errors, strengths, feedback, improved_version_delta (tokens),
+    improved_version, and finally result (WritingEvaluateResponse) or error.
+    format=sse (text/event-stream, default) or format=ndjson (one JSON object per line).
+    """
+    async def events():
+        async for item in evaluate_writing_stream(
+            request.topic_id, request.topic_context, request.essay,
+            request.mode, request.include_improved_version
+        ):
+            if item["event"] == "result":
+                item["data"] = WritingEvaluateResponse(**item["data"]).model_dump()
+            yield item
+    
+    return _event_stream_response(events(), format, request.no_cache)
+
+@app.post("/writing/evaluate/batch", tags=["Writing"])
+async def evaluate_writing_batch_endpoint(request: WritingBatchEvaluateRequest, format: str = "ndjson"):
+    """Evaluate a class set of essays for one topic concurrently
+    
+    Streams one "item" event per essay as it completes ({index, id, success, result, error},
+    result shaped like WritingEvaluateResponse), then a "done" event with totals.
+    format=ndjson (default) or format=sse.
+    """
+    if not request.essays:
+        raise HTTPException(status_code=400, detail="No essays provided")
+    if len(request.essays) > WRITING_BATCH_MAX_ESSAYS:
+        raise HTTPException(status_code=400, detail=f"Too many essays (max {WRITING_BATCH_MAX_ESSAYS})")
+    
+    # Resolved once and shared by every essay in the batch
+    topic_context = request.topic_context
+    if not topic_context:
+        topic = await get_writing_topic("exam", request.topic_id)
+        if not topic or topic["topic_id"] != request.topic_id:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        topic_context = topic["context"]
+    
+    essays = [essay.model_dump() for essay in request.essays]
+    
+    async def events():
+        started = time.perf_counter()
+        succeeded = 0
+        async for item in evaluate_writing_batch(
+            request.topic_id, topic_context, essays,
+            request.mode, request.include_improved_version
+        ):
+            if item["result"]:
+                item["result"] = WritingEvaluateResponse(**item["result"]).model_dump()
+                succeeded += 1
+            yield {"event": "item", "data": item}
+        yield {"event": "done", "data": {
+            "total": len(essays),
+            "succeeded": succeeded,
+            "failed": len(essays) - succeeded,
+            "elapsed": round(time.perf_counter() - started, 3)
+        }}
+    
+    return _event_stream_response(events(), format, request.no_cache)
+
+def _event_stream_response(events, format: str, no_cache: bool = False) -> StreamingResponse:
+    """Stream {"event", "data"} items as Server-Sent Events or NDJSON"""
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+    
+    async def body():
+        # Set inside the generator: the body is streamed after the endpoint returns
+        with bypass_llm_cache(no_cache):
+            async for item in events:
+                if format == "sse":
+                    payload = json.dumps(item["data"], ensure_ascii=False)
+                    yield f"event: {item['event']}\ndata: {payload}\n\n"
+                else:
+                    yield json.dumps(item, ensure_ascii=False) + "\n"
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/writing/evaluate/jobs", response_model=JobSubmitResponse, status_code=202, tags=["Jobs"])
+async def submit_writing_job(request: WritingEvaluateRequest):
+    """Queue a writing evaluation; poll GET /jobs/{job_id} for the result"""
+    async def run():
+        with bypass_llm_cache(request.no_cache):
+            result = await evaluate_writing(
+                request.topic_id, request.topic_context, request.essay,
+                request.mode, request.include_improved_version
+            )
+        return WritingEvaluateResponse(**result).model_dump() if result else None
+    
+    return _submit_job("writing", run)
+
+# ========== JOBS ==========
+def _submit_job(kind: str, run) -> JobSubmitResponse:
+    try:
+        job = evaluation_jobs.submit(kind, run)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return JobSubmitResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        position=evaluation_jobs.position(job),
+        status_url=f"/jobs/{job.id}"
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job_status(job_id: str, wait: float = 0):
+    """Job status and result; wait (max 60s) holds the request until the job finishes"""
+    job = await evaluation_jobs.wait(job_id, min(max(wait, 0), 60))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return JobStatusResponse(**job.to_dict())
+
 # ========== TOPICS ==========
 @app.get("/topics", response_model=TopicListResponse, tags=["Topics"])
 async def list_all_topics():
@@ -286,7 +603,7 @@ async def list_all_topics():
 @app.post("/topics/generate", response_model=CustomTopicResponse, tags=["Topics"])
 async def generate_custom_topic(request: CustomTopicRequest):
     """Generate a new custom topic using AI"""
-    topic = generate_topic(request.category)
+    topic = await generate_topic(request.category)
     if not topic:
         raise HTTPException(status_code=500, detail="Topic generation failed - check LLM configuration")
     return CustomTopicResponse(
@@ -309,7 +626,7 @@ async def get_youtube_recommendations(request: YouTubeRecommendationsRequest):
     Returns 2-3 relevant English learning videos for Vietnamese learners
     based on the weak areas identified in the evaluation.
     """
-    videos = get_recommended_videos(
+    videos = await get_recommended_videos(
         feedback=request.feedback,
         weaknesses=request.weaknesses,
         skill_type=request.skill_type,
@@ -335,7 +652,7 @@ async def search_youtube(q: str, max_results: int = 3):
     from api.services import search_youtube_videos
     
     max_results = min(max_results, 5)
-    videos = search_youtube_videos(q, max_results)
+    videos = await asyncio.to_thread(search_youtube_videos, q, max_results)
     
     return {
         "query": q,
@@ -13,10 +13,16 @@ class SpeakingTopicResponse(BaseModel):
     context: str
     image_urls: List[str] = []
 
+class SpeakingEvalMode(str, Enum):
+    full = "full"  # Layers 2, 3 and 3b as separate concurrent LLM calls
+    compact = "compact"  # One combined LLM call (about 3x fewer tokens)
+
 class SpeakingEvaluateRequest(BaseModel):
     topic_id: str
     transcript: str  # Text from speech-to-text
     topic_context: Optional[str] = None  # Optional: provide custom topic context instead of loading from database
+    no_cache: bool = False  # Skip the LLM result cache and re-evaluate
+    mode: Optional[SpeakingEvalMode] = None  # Defaults to SPEAKING_EVAL_MODE
 
 class SpeakingEvaluateResponse(BaseModel):
     topic_id: str
@@ -41,6 +47,34 @@ class SpeakingFullEvaluateResponse(BaseModel):
     scores: Optional[Dict[str, float]] = None
     feedback: Optional[Dict[str, Any]] = None
 
+# Read Aloud (questions 1-2), scored locally against the passage
+class ReadAloudTopicRequest(BaseModel):
+    topic_id: Optional[str] = None  # If None, random topic
+    question_number: Optional[str] = None  # "1" or "2"; if None, random
+
+class ReadAloudTopicResponse(BaseModel):
+    topic_id: str
+    question_number: str
+    test_name: str
+    question_type: str
+    context: str  # Passage to read
+
+class ReadAloudEvaluateResponse(BaseModel):
+    topic_id: Optional[str] = None
+    question_number: Optional[str] = None
+    success: bool
+    transcript: Optional[str] = None
+    reference_text: Optional[str] = None
+    error: Optional[str] = None
+    alignment: Optional[Dict[str, Any]] = None
+    mismatches: List[dict] = []
+    omitted_words: List[str] = []
+    inserted_words: List[str] = []
+    scores: Optional[Dict[str, float]] = None
+    feedback: Optional[Dict[str, Any]] = None
+    fluency_metrics: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, float]] = None
+
 class TranscribeResponse(BaseModel):
     success: bool
     transcript: Optional[str] = None
@@ -105,10 +139,30 @@ class WritingTopicResponse(BaseModel):
     category: Optional[str] = None
     prompt_type: Optional[str] = None
 
+class WritingEvalMode(str, Enum):
+    full = "full"  # One LLM call per step (5 calls)
+    single_pass = "single_pass"  # Scores, errors, strengths and feedback in one call
+    auto = "auto"  # single_pass while the Groq key pool is under pressure, else full
+
 class WritingEvaluateRequest(BaseModel):
     topic_id: str
     topic_context: str
     essay: str
+    no_cache: bool = False  # Skip the LLM result cache and re-evaluate
+    mode: Optional[WritingEvalMode] = None  # Defaults to WRITING_EVAL_MODE
+    include_improved_version: bool = True  # False skips the rewrite call
+
+class WritingBatchEssay(BaseModel):
+    id: Optional[str] = None  # Client reference (e.g. student id), echoed back
+    essay: str
+
+class WritingBatchEvaluateRequest(BaseModel):
+    topic_id: str
+    topic_context: Optional[str] = None  # Loaded from the exam topic when omitted
+    essays: List[WritingBatchEssay]
+    no_cache: bool = False
+    mode: Optional[WritingEvalMode] = None
+    include_improved_version: bool = True
 
 class WritingEvaluateResponse(BaseModel):
     topic_id: str
@@ -122,6 +176,25 @@ class WritingEvaluateResponse(BaseModel):
     errors: List[dict]
     suggestions: List[str]
     improved_version: Optional[str] = None
+    step_timings: Optional[Dict[str, Any]] = None  # Per-step start/end/duration and critical path
+
+# ========== EVALUATION JOBS ==========
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    position: int = 0  # Jobs queued ahead of this one
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # queued, running, completed, failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None  # WritingEvaluateResponse / SpeakingFullEvaluateResponse
+    error: Optional[str] = None
 
 # ========== TOPICS ==========
 class CustomTopicRequest(BaseModel):
@@ -144,6 +217,7 @@ class HealthResponse(BaseModel):
     status: str
     minio_connected: bool
     data_loaded: bool
+    bundle_version: Optional[str] = None
 
 # ========== YOUTUBE ==========
 class YouTubeVideo(BaseModel):
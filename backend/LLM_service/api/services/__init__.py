@@ -5,28 +5,70 @@ Modularized service layer for better organization
 
 # Import modules without auto-initialization
 from .clients import (
-    init_minio, init_groq, check_minio_connected,
-    minio_client, groq_clients, get_groq_client
+    init_minio, init_groq, close_groq, check_minio_connected,
+    minio_client, groq_clients, get_groq_client, get_groq_key_stats
+)
+
+from .llm_cache import (
+    bypass_llm_cache, get_llm_cache_stats
 )
 
 from .data_loader import (
-    load_data_from_minio, check_data_loaded, get_pronunciation_data,
+    load_data_from_minio, check_data_loaded, get_data_stats, get_bundle_version, get_pronunciation_data,
+    get_generated_pronunciation,
     speaking_data, writing_data, custom_topics, pronunciation_data
 )
 
+from .packed_dictionary import (
+    load_packed_dictionary, get_packed_dictionary
+)
+
+from .tts_cache import (
+    get_pronunciation_audio_cached, get_tts_cache_stats
+)
+
+from .audio_preprocessing import (
+    preprocess_audio, shutdown_audio_pool, AudioTooLongError
+)
+
+from .audio_upload import (
+    spool_upload, AudioUpload, AudioTooLargeError
+)
+
+from .transcript_cache import (
+    get_transcript_cache_stats
+)
+
+from .jobs import (
+    evaluation_jobs, QueueFullError, get_job_stats
+)
+
+from .word_index import (
+    load_word_index, refresh_word_index, get_word_index_stats
+)
+
 from .topics import (
     get_speaking_topic, get_writing_topic, generate_topic,
     get_all_topics, get_pronunciation, generate_pronunciation_audio,
-    get_pronunciation_tips, get_related_words, search_words
+    get_pronunciation_tips, get_related_words, search_words, get_read_aloud_topic
+)
+
+from .fluency_metrics import (
+    compute_fluency_metrics
 )
 
 from .speaking_evaluation import (
     transcribe_audio, evaluate_pronunciation_fluency, evaluate_grammar_content,
-    evaluate_speaking_full, evaluate_speaking_from_transcript, evaluate_speaking
+    evaluate_speaking_full, evaluate_speaking_from_transcript, evaluate_speaking,
+    evaluate_speaking_compact, SPEAKING_EVAL_MODES
+)
+
+from .read_aloud import (
+    evaluate_read_aloud, READ_ALOUD_MAX_REFERENCE_CHARS
 )
 
 from .writing_evaluation import (
-    evaluate_writing
+    evaluate_writing, evaluate_writing_stream, evaluate_writing_batch, WRITING_BATCH_MAX_ESSAYS
 )
 
 # Initialize services manually when needed
@@ -52,6 +94,14 @@ def init_all_services():
         return False
     print("Data loaded from MinIO")
     
+    # 4. Map the packed dictionary (falls back to per-word objects when not published)
+    if not load_packed_dictionary():
+        print("Packed dictionary not loaded (per-word lookups)")
+    
+    # 5. Build the in-process word prefix index (autocomplete)
+    if not load_word_index():
+        print("Word index not loaded (autocomplete disabled)")
+    
     print("All services initialized successfully!")
     return True
 # Test hot reload
@@ -0,0 +1,169 @@
+"""
+Audio Preprocessing
+Normalizes recordings before they are uploaded to Whisper:
+- Transcode to 16 kHz mono FLAC (or Opus), which is what Whisper resamples to anyway
+- Trim leading and trailing silence
+- Reject recordings longer than AUDIO_MAX_DURATION before any upload
+- Split long recordings at pauses into chunks of at most AUDIO_CHUNK_SECONDS, transcribed concurrently
+Decoding and encoding (pydub + ffmpeg) run in a bounded process pool, off the event loop.
+If the recording cannot be decoded it is sent to Whisper unchanged.
+"""
+
+import io
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Tuple, List, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .audio_upload import AudioUpload  # audio_upload imports this module
+
+AUDIO_PREPROCESS_ENABLED = os.getenv("AUDIO_PREPROCESS_ENABLED", "true").lower() == "true"
+AUDIO_PREPROCESS_WORKERS = int(os.getenv("AUDIO_PREPROCESS_WORKERS", "2"))
+AUDIO_TARGET_SAMPLE_RATE = 16000
+# "flac" (lossless) or "opus" (smaller, lossy)
+AUDIO_OUTPUT_FORMAT = os.getenv("AUDIO_OUTPUT_FORMAT", "flac").lower()
+AUDIO_OPUS_BITRATE = os.getenv("AUDIO_OPUS_BITRATE", "32k")
+AUDIO_MAX_DURATION = float(os.getenv("AUDIO_MAX_DURATION", "300"))
+AUDIO_SILENCE_THRESHOLD_DB = float(os.getenv("AUDIO_SILENCE_THRESHOLD_DB", "-45"))
+# Silence kept around the speech so the first/last words are not clipped
+AUDIO_SILENCE_PADDING_MS = 200
+# Longer recordings are split; cuts go in the middle of a pause of at least AUDIO_SPLIT_SILENCE_MS
+AUDIO_CHUNK_SECONDS = float(os.getenv("AUDIO_CHUNK_SECONDS", "60"))
+AUDIO_SPLIT_SILENCE_MS = int(os.getenv("AUDIO_SPLIT_SILENCE_MS", "300"))
+
+# (audio, offset in seconds from the start of the trimmed recording); the audio is
+# encoded bytes, or the AudioUpload itself when the original is passed through
+AudioChunk = Tuple[Union[bytes, "AudioUpload"], float]
+
+# Output format -> (pydub export kwargs, file extension Whisper recognizes)
+_OUTPUT_FORMATS = {
+    "flac": ({"format": "flac"}, "flac"),
+    "opus": ({"format": "ogg", "codec": "libopus", "bitrate": AUDIO_OPUS_BITRATE}, "ogg"),
+}
+
+
+class AudioTooLongError(ValueError):
+    """Recording exceeds AUDIO_MAX_DURATION (after silence trimming)"""
+
+
+def _trim_silence(sound):
+    """Drop leading and trailing silence, keeping AUDIO_SILENCE_PADDING_MS on each side"""
+    from pydub.silence import detect_leading_silence
+
+    start = detect_leading_silence(sound, silence_threshold=AUDIO_SILENCE_THRESHOLD_DB)
+    if start >= len(sound):
+        return sound  # Nothing above the threshold, leave it to Whisper
+    end = len(sound) - detect_leading_silence(sound.reverse(), silence_threshold=AUDIO_SILENCE_THRESHOLD_DB)
+    return sound[max(0, start - AUDIO_SILENCE_PADDING_MS):min(len(sound), end + AUDIO_SILENCE_PADDING_MS)]
+
+
+def _split_points(sound) -> List[int]:
+    """
+    Cut positions (ms) giving chunks of at most AUDIO_CHUNK_SECONDS
+    Each cut is the middle of the last pause in the second half of the chunk window,
+    or a hard cut at the window end when the speaker never pauses.
+    """
+    chunk_ms = int(AUDIO_CHUNK_SECONDS * 1000)
+    if chunk_ms <= 0 or len(sound) <= chunk_ms:
+        return []
+
+    from pydub.silence import detect_silence
+
+    pauses = detect_silence(
+        sound, min_silence_len=AUDIO_SPLIT_SILENCE_MS,
+        silence_thresh=AUDIO_SILENCE_THRESHOLD_DB, seek_step=10
+    )
+    midpoints = [(start + end) // 2 for start, end in pauses]
+
+    points = []
+    start = 0
+    while len(sound) - start > chunk_ms:
+        limit = start + chunk_ms
+        candidates = [m for m in midpoints if start + chunk_ms // 2 <= m <= limit]
+        cut = candidates[-1] if candidates else limit
+        points.append(cut)
+        start = cut
+    return points
+
+
+def _normalize(source: Union[str, bytes], filename: str, size: int) -> Tuple[List[AudioChunk], str, Dict]:
+    """Worker process: decode (from a spooled file path or bytes), downmix/resample, trim, check duration, split, encode"""
+    from pydub import AudioSegment
+
+    # WAV is parsed directly; other containers are probed by ffmpeg (m4a is not an ffmpeg format name)
+    is_wav = filename.lower().endswith(".wav")
+    sound = AudioSegment.from_file(
+        source if isinstance(source, str) else io.BytesIO(source),
+        format="wav" if is_wav else None
+    )
+    original_duration = len(sound) / 1000
+
+    sound = sound.set_channels(1).set_frame_rate(AUDIO_TARGET_SAMPLE_RATE)
+    sound = _trim_silence(sound)
+    duration = len(sound) / 1000
+    if duration > AUDIO_MAX_DURATION:
+        raise AudioTooLongError(
+            f"Recording too long ({duration:.0f}s of speech, max {AUDIO_MAX_DURATION:.0f}s)"
+        )
+
+    export_kwargs, output_extension = _OUTPUT_FORMATS[AUDIO_OUTPUT_FORMAT]
+    bounds = [0] + _split_points(sound) + [len(sound)]
+    chunks = []
+    for start, end in zip(bounds, bounds[1:]):
+        output = io.BytesIO()
+        sound[start:end].export(output, **export_kwargs)
+        chunks.append((output.getvalue(), start / 1000))
+
+    stem = os.path.splitext(filename)[0] or "audio"
+    return chunks, f"{stem}.{output_extension}", {
+        "original_bytes": size,
+        "bytes": sum(len(chunk) for chunk, _ in chunks),
+        "original_duration": round(original_duration, 2),
+        "duration": round(duration, 2),
+        "format": AUDIO_OUTPUT_FORMAT,
+        "chunks": len(chunks)
+    }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=AUDIO_PREPROCESS_WORKERS)
+    return _pool
+
+
+async def preprocess_audio(upload: "AudioUpload") -> Tuple[List[AudioChunk], str, Optional[Dict]]:
+    """
+    (chunks, filename, info) ready for Whisper, chunks as [(audio, offset_seconds)]
+    Spooled uploads reach the worker as a file path, so the recording is not pickled.
+    info is None when the original is passed through as a single chunk.
+    Raises AudioTooLongError for recordings over AUDIO_MAX_DURATION.
+    """
+    if not AUDIO_PREPROCESS_ENABLED:
+        return [(upload, 0.0)], upload.filename, None
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), _normalize, upload.source, upload.filename, upload.size)
+    except AudioTooLongError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Audio preprocessing failed, sending original recording: {e}")
+        return [(upload, 0.0)], upload.filename, None
+
+
+def shutdown_audio_pool():
+    """Stop the worker processes (called on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+__all__ = [
+    'AUDIO_MAX_DURATION', 'AudioTooLongError', 'preprocess_audio', 'shutdown_audio_pool'
+]
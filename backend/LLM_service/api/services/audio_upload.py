@@ -0,0 +1,144 @@
+"""
+Audio Upload Spooling
+Uploaded recordings are read in fixed-size chunks instead of all at once:
+- Size limit enforced before reading (declared size) and while reading
+- SHA-256 computed on the fly (transcript cache key)
+- Kept in memory up to AUDIO_SPOOL_MEMORY_BYTES, spooled to a temp file beyond that
+- WAV recordings over the duration limit are rejected from the header alone
+The resulting AudioUpload is passed through preprocessing and ASR as a file, not copied as bytes.
+"""
+
+import io
+import os
+import wave
+import asyncio
+import hashlib
+import tempfile
+from typing import Optional, BinaryIO
+
+from .audio_preprocessing import AUDIO_MAX_DURATION, AudioTooLongError
+
+AUDIO_MAX_UPLOAD_BYTES = int(os.getenv("AUDIO_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+AUDIO_SPOOL_MEMORY_BYTES = int(os.getenv("AUDIO_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+AUDIO_READ_CHUNK_BYTES = 256 * 1024
+# Whole-recording limit checked before decoding (silence is only trimmed later, so it allows some slack)
+AUDIO_MAX_RECORDING_DURATION = float(os.getenv("AUDIO_MAX_RECORDING_DURATION", str(AUDIO_MAX_DURATION * 1.5)))
+
+
+class AudioTooLargeError(ValueError):
+    """Upload exceeds AUDIO_MAX_UPLOAD_BYTES"""
+
+
+class AudioUpload:
+    """One uploaded recording, held in memory (small) or in a temp file (large)"""
+
+    def __init__(self, filename: str = "audio.wav"):
+        self.filename = filename
+        self.size = 0
+        self.sha256: Optional[str] = None
+        self.data: Optional[bytes] = None
+        self.path: Optional[str] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str = "audio.wav") -> "AudioUpload":
+        upload = cls(filename)
+        upload.data = data
+        upload.size = len(data)
+        upload.sha256 = hashlib.sha256(data).hexdigest()
+        return upload
+
+    def open(self) -> BinaryIO:
+        """Fresh read handle positioned at the start (caller closes it)"""
+        if self.path:
+            return open(self.path, "rb")
+        return io.BytesIO(self.data or b"")
+
+    @property
+    def source(self):
+        """Path for on-disk uploads, bytes otherwise (what the preprocessing worker reads)"""
+        return self.path or self.data
+
+    def close(self):
+        """Delete the temp file, if any"""
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.data = None
+
+
+def _wav_duration(handle: BinaryIO) -> Optional[float]:
+    """Duration from the WAV header, or None if it is not a readable WAV file"""
+    try:
+        with wave.open(handle, "rb") as wav:
+            rate = wav.getframerate()
+            return wav.getnframes() / rate if rate else None
+    except (wave.Error, EOFError):
+        return None
+
+
+def _check_wav_duration(upload: AudioUpload):
+    if not upload.filename.lower().endswith(".wav"):
+        return
+    with upload.open() as handle:
+        duration = _wav_duration(handle)
+    if duration is not None and duration > AUDIO_MAX_RECORDING_DURATION:
+        raise AudioTooLongError(
+            f"Recording too long ({duration:.0f}s, max {AUDIO_MAX_RECORDING_DURATION:.0f}s)"
+        )
+
+
+async def spool_upload(file, filename: Optional[str] = None, max_bytes: int = AUDIO_MAX_UPLOAD_BYTES) -> AudioUpload:
+    """
+    Read an upload (anything with async read(n), e.g. FastAPI's UploadFile) into an AudioUpload
+    Raises AudioTooLargeError / AudioTooLongError as soon as a limit is known to be exceeded.
+    """
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise AudioTooLargeError(f"Audio file too large (max {max_bytes // (1024 * 1024)}MB)")
+
+    upload = AudioUpload(filename or getattr(file, "filename", None) or "audio.wav")
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    try:
+        while True:
+            chunk = await file.read(AUDIO_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            upload.size += len(chunk)
+            if upload.size > max_bytes:
+                raise AudioTooLargeError(f"Audio file too large (max {max_bytes // (1024 * 1024)}MB)")
+            digest.update(chunk)
+
+            if spool is None:
+                buffer += chunk
+                if len(buffer) > AUDIO_SPOOL_MEMORY_BYTES:
+                    suffix = os.path.splitext(upload.filename)[1]
+                    spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=suffix, delete=False)
+                    upload.path = spool.name
+                    await asyncio.to_thread(spool.write, bytes(buffer))
+                    buffer = bytearray()
+            else:
+                await asyncio.to_thread(spool.write, chunk)
+
+        if spool is not None:
+            spool.close()
+        else:
+            upload.data = bytes(buffer)
+        upload.sha256 = digest.hexdigest()
+
+        _check_wav_duration(upload)
+        return upload
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        upload.close()
+        raise
+
+
+__all__ = [
+    'AUDIO_MAX_UPLOAD_BYTES', 'AudioTooLargeError', 'AudioUpload', 'spool_upload'
+]
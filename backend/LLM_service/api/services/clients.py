@@ -1,13 +1,16 @@
 """
 Client Management Module
-Handles MinIO, Groq API clients, and multi-key retry mechanism
+Handles MinIO, Groq API clients, and multi-key scheduling (see key_pool.py)
 """
 
 import os
 import time
+import asyncio
 from typing import Optional, List
 from minio import Minio
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, APIConnectionError, APIStatusError
+import httpx
+from .key_pool import GroqKeyPool, get_retry_after, get_usage_tokens
 
 # ========== CONFIGURATION ==========
 # MinIO Configuration (shared with PHP API and other services)
@@ -24,10 +27,16 @@ GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
 LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-large-v3-turbo")
 
+# Async client pool tuning (one shared connection pool per API key)
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "200"))
+# Attempts per call when the pool has fewer keys (transient errors are retried even with one key)
+GROQ_MIN_ATTEMPTS = int(os.getenv("GROQ_MIN_ATTEMPTS", "3"))
+
 # ========== GLOBAL CLIENTS ==========
 minio_client: Optional[Minio] = None
-groq_clients: List[OpenAI] = []
-current_groq_index = 0
+groq_clients: List[AsyncOpenAI] = []
+groq_key_pool = GroqKeyPool()  # Per-key RPM/TPM budgets over groq_clients
 
 # ========== MINIO CLIENT ==========
 def init_minio() -> bool:
@@ -75,8 +84,7 @@ def check_minio_connected() -> bool:
 
 # ========== GROQ CLIENTS WITH MULTI-KEY SUPPORT ==========
 def init_groq() -> bool:
-    """Initialize multiple Groq clients for quota management"""
-    global groq_clients, current_groq_index
+    """Initialize multiple async Groq clients for quota management"""
     groq_clients.clear()  # Clear instead of reassign to keep reference
     
     if not GROQ_API_KEYS:
@@ -86,28 +94,56 @@ def init_groq() -> bool:
     for i, api_key in enumerate(GROQ_API_KEYS):
         if api_key:
             try:
-                client = OpenAI(api_key=api_key, base_url=GROQ_BASE_URL)
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=GROQ_BASE_URL,
+                    timeout=GROQ_TIMEOUT,
+                    max_retries=0,  # Retries happen in groq_api_call_with_retry: quota errors move to another key
+                    http_client=DefaultAsyncHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=GROQ_MAX_CONNECTIONS,
+                            max_keepalive_connections=GROQ_MAX_CONNECTIONS // 2
+                        )
+                    )
+                )
                 groq_clients.append(client)
                 print(f"✅ Initialized Groq client {i+1}/{len(GROQ_API_KEYS)}")
             except Exception as e:
                 print(f"❌ Failed to initialize Groq client {i+1}: {e}")
     
-    current_groq_index = 0
-    print(f"📊 Total Groq clients: {len(groq_clients)}")
+    groq_key_pool.reset(groq_clients)
+    print(f"📊 Total Groq clients: {len(groq_clients)} "
+          f"(budget per key: {groq_key_pool.rpm} RPM / {groq_key_pool.tpm} TPM)")
     return len(groq_clients) > 0
 
-def get_groq_client() -> Optional[OpenAI]:
-    """Get current Groq client"""
-    if not groq_clients:
-        return None
-    return groq_clients[current_groq_index % len(groq_clients)]
+async def close_groq():
+    """Close the HTTP connection pools of all Groq clients"""
+    for client in groq_clients:
+        try:
+            await client.close()
+        except Exception as e:
+            print(f"⚠️ Failed to close Groq client: {e}")
+    groq_clients.clear()
+    groq_key_pool.reset(groq_clients)
 
-def rotate_groq_client():
-    """Switch to next Groq client"""
-    global current_groq_index
-    if groq_clients:
-        current_groq_index = (current_groq_index + 1) % len(groq_clients)
-        print(f"🔄 Rotated to Groq client {current_groq_index + 1}/{len(groq_clients)}")
+def get_groq_client() -> Optional[AsyncOpenAI]:
+    """Get the least-loaded Groq client (does not reserve capacity)"""
+    key = groq_key_pool.peek()
+    return key.client if key else None
+
+def get_groq_pressure() -> float:
+    """How close the key pool is to its rate budget (0 = idle, 1 = saturated)"""
+    return groq_key_pool.pressure()
+
+def get_groq_key_stats() -> List[dict]:
+    """Per-key budget and usage snapshot"""
+    return groq_key_pool.stats()
+
+def is_transient_error(error: Exception) -> bool:
+    """Connection problems, timeouts and 5xx responses (worth retrying, not a quota issue)"""
+    if isinstance(error, APIConnectionError):  # Includes APITimeoutError
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
 
 def is_quota_error(error: Exception) -> bool:
     """Check if error is due to quota/rate limit"""
@@ -118,40 +154,61 @@ def is_quota_error(error: Exception) -> bool:
     ]
     return any(indicator in error_str for indicator in quota_indicators)
 
-def groq_api_call_with_retry(api_call_func, max_retries: int = None):
+async def groq_api_call_with_retry(api_call_func, max_retries: int = None, estimated_tokens: int = None,
+                                   consume=None):
     """
-    Execute Groq API call with automatic retry on quota errors
-    Will try all available API keys before giving up
+    Execute Groq API call on the least-loaded key with capacity
+    Calls queue while every key is saturated; a quota error puts that key on
+    cooldown and the call is retried on another key. Transient errors (connection,
+    timeout, 5xx) are retried after a short backoff; other errors are raised at once.
+    
+    api_call_func receives an AsyncOpenAI client and must return an awaitable,
+    so waiting on the network never blocks the event loop.
+    estimated_tokens is reserved from the key's TPM budget (reconciled with usage).
+    consume (streaming calls) receives the stream and returns (value, total_tokens or None);
+    the key is held until it has drained the stream, and its errors are not retried.
     """
     if not groq_clients:
         raise Exception("No Groq clients available")
     
     if max_retries is None:
-        max_retries = len(groq_clients)
+        max_retries = max(len(groq_clients), GROQ_MIN_ATTEMPTS)
     
     last_error = None
+    backoff = 0.0
     
     for attempt in range(max_retries):
-        client = get_groq_client()
-        if not client:
-            break
-            
+        if backoff:
+            await asyncio.sleep(backoff)  # After the failed attempt released its key
+            backoff = 0.0
+        key = await groq_key_pool.acquire(estimated_tokens)
+        actual_tokens = None
+        
         try:
-            result = api_call_func(client)
-            return result
-        except Exception as e:
-            last_error = e
-            print(f"⚠️ Groq API error (attempt {attempt + 1}/{max_retries}): {str(e)[:100]}")
+            try:
+                result = await api_call_func(key.client)
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ Groq API error on key {key.index + 1} (attempt {attempt + 1}/{max_retries}): {str(e)[:100]}")
+                
+                if is_quota_error(e):
+                    groq_key_pool.penalize(key, get_retry_after(e))
+                    continue
+                elif is_transient_error(e) and attempt + 1 < max_retries:
+                    backoff = min(2.0, 0.5 * 2 ** attempt)
+                    continue
+                else:
+                    # Client errors (4xx other than quota) and the last transient failure are not retried
+                    raise e
             
-            if is_quota_error(e):
-                print(f"🔄 Quota error detected, rotating to next API key...")
-                rotate_groq_client()
-                if attempt < max_retries - 1:  # Don't sleep on last attempt
-                    time.sleep(1)  # Brief pause before retry
-                continue
-            else:
-                # Non-quota error, don't retry
-                raise e
+            if consume is None:
+                actual_tokens = get_usage_tokens(result)
+                return result
+            # Part of the output may already be delivered, so a failing stream is not retried
+            value, actual_tokens = await consume(result)
+            return value
+        finally:
+            groq_key_pool.release(key, estimated_tokens, actual_tokens)
     
     # All retries failed
     raise Exception(f"All Groq API keys failed. Last error: {last_error}")
@@ -160,7 +217,8 @@ def groq_api_call_with_retry(api_call_func, max_retries: int = None):
 __all__ = [
     'MINIO_ENDPOINT', 'MINIO_ACCESS_KEY', 'MINIO_SECRET_KEY', 'MINIO_BUCKET',
     'GROQ_API_KEYS', 'GROQ_BASE_URL', 'LLM_MODEL', 'WHISPER_MODEL',
-    'minio_client', 'groq_clients', 'current_groq_index',
-    'init_minio', 'init_groq', 'check_minio_connected',
-    'get_groq_client', 'rotate_groq_client', 'is_quota_error', 'groq_api_call_with_retry'
+    'minio_client', 'groq_clients', 'groq_key_pool',
+    'init_minio', 'init_groq', 'close_groq', 'check_minio_connected',
+    'get_groq_client', 'get_groq_key_stats', 'get_groq_pressure', 'is_quota_error', 'is_transient_error',
+    'groq_api_call_with_retry'
 ]
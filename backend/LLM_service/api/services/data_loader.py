@@ -3,19 +3,201 @@ Data Loading Module
 Handles loading and caching data from MinIO storage
 """
 
+import io
+import os
 import json
-from typing import Dict, List
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple
 
 # Import at function level to avoid circular imports
 def _get_clients():
     from .clients import minio_client, MINIO_BUCKET
     return minio_client, MINIO_BUCKET
 
+def _build_topic_indexes():
+    from .topics import build_topic_indexes
+    build_topic_indexes()
+
+def _get_packed():
+    from .packed_dictionary import get_packed_dictionary
+    return get_packed_dictionary()
+
+# Published by scripts/ingest.py: speaking Q7 / writing Q8 records, custom topics and a manifest
+TOPIC_BUNDLE_OBJECT = "bundle/topics.json"
+
+# Concurrent GETs while loading exam data at startup
+# (the MinIO client keeps 10 pooled connections per host, stay within that)
+MINIO_LOAD_WORKERS = int(os.getenv("MINIO_LOAD_WORKERS", "8"))
+
+# Budgets for the on-demand pronunciation caches
+PRONUNCIATION_CACHE_MAX_ENTRIES = int(os.getenv("PRONUNCIATION_CACHE_MAX_ENTRIES", "5000"))
+PRONUNCIATION_CACHE_MAX_BYTES = int(os.getenv("PRONUNCIATION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# How long a "word not found" answer is remembered
+PRONUNCIATION_NEGATIVE_TTL = float(os.getenv("PRONUNCIATION_NEGATIVE_TTL", "300"))
+
+class PronunciationCache:
+    """Thread-safe LRU bounded by entries and bytes, with short-lived negative entries for misses"""
+    
+    def __init__(self, max_entries: int = PRONUNCIATION_CACHE_MAX_ENTRIES,
+                 max_bytes: int = PRONUNCIATION_CACHE_MAX_BYTES,
+                 negative_ttl: float = PRONUNCIATION_NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self.size = 0
+        # word -> (data or None for a miss, approximate size, expiry for misses)
+        self._entries: "OrderedDict[str, Tuple[Optional[Dict], int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def lookup(self, word: str) -> Tuple[bool, Optional[Dict]]:
+        """(found, data); found with data None means the word is known to be absent"""
+        with self._lock:
+            entry = self._entries.get(word)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            data, size, expires_at = entry
+            if data is None and expires_at < time.monotonic():
+                self._remove(word)
+                self.misses += 1
+                return False, None
+            
+            self._entries.move_to_end(word)
+            if data is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, data
+    
+    def set(self, word: str, data: Dict):
+        self._store(word, data, len(json.dumps(data, ensure_ascii=False)), 0.0)
+    
+    def set_missing(self, word: str):
+        self._store(word, None, len(word), time.monotonic() + self.negative_ttl)
+    
+    def _store(self, word: str, data: Optional[Dict], size: int, expires_at: float):
+        with self._lock:
+            if word in self._entries:
+                self._remove(word)
+            self._entries[word] = (data, size, expires_at)
+            self.size += size
+            while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _remove(self, word: str):
+        _, size, _ = self._entries.pop(word)
+        self.size -= size
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+def _is_missing_object(error: Exception) -> bool:
+    """True for a definite 'object does not exist', not for connection or server errors"""
+    return getattr(error, "code", None) in ("NoSuchKey", "NoSuchObject")
+
 # ========== DATA CACHE ==========
 speaking_data: Dict = {}
 writing_data: Dict = {}
 custom_topics: List = []
-pronunciation_data: Dict = {}  # Lazy loaded on-demand
+pronunciation_data = PronunciationCache()  # Lazy loaded on-demand
+generated_pronunciations = PronunciationCache()  # LLM-generated entries (mirrors pronunciation-generated/)
+bundle_manifest: Dict = {}  # Manifest of the loaded topic bundle (empty when loaded per object)
+
+# LLM-generated entries for words missing from the dictionary
+GENERATED_PRONUNCIATION_PREFIX = "pronunciation-generated/"
+
+def _read_json_object(object_name: str):
+    minio_client, MINIO_BUCKET = _get_clients()
+    response = minio_client.get_object(MINIO_BUCKET, object_name)
+    try:
+        return json.loads(response.read().decode('utf-8'))
+    finally:
+        response.close()
+        response.release_conn()
+
+def _load_exam_prefix(prefix: str, target: Dict) -> int:
+    """Fetch every <prefix><topic_id>/data.json concurrently into target; returns the count loaded"""
+    minio_client, MINIO_BUCKET = _get_clients()
+    started = time.perf_counter()
+    
+    object_names = [
+        obj.object_name
+        for obj in minio_client.list_objects(MINIO_BUCKET, prefix=prefix, recursive=True)
+        if obj.object_name.endswith("data.json")
+    ]
+    
+    loaded = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=MINIO_LOAD_WORKERS) as executor:
+        futures = {executor.submit(_read_json_object, name): name for name in object_names}
+        for future in as_completed(futures):
+            object_name = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                # One bad object must not abort the whole load
+                failed += 1
+                print(f"⚠️  Failed to load {object_name}: {e}")
+                continue
+            topic_id = object_name.split("/")[1]
+            target[topic_id] = data
+            loaded += 1
+    
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {prefix}: {loaded} loaded, {failed} failed in {elapsed:.2f}s")
+    return loaded
+
+def _load_topic_bundle() -> bool:
+    """Load speaking, writing and custom topics from the bundle with a single GET"""
+    global custom_topics, bundle_manifest
+    
+    started = time.perf_counter()
+    try:
+        bundle = _read_json_object(TOPIC_BUNDLE_OBJECT)
+    except Exception as e:
+        print(f"⚠️  Topic bundle not available ({TOPIC_BUNDLE_OBJECT}): {e}")
+        return False
+    
+    speaking_data.clear()
+    speaking_data.update(bundle.get("speaking", {}))
+    writing_data.clear()
+    writing_data.update(bundle.get("writing", {}))
+    custom_topics = bundle.get("custom_topics", [])
+    bundle_manifest = bundle.get("manifest", {})
+    
+    elapsed = time.perf_counter() - started
+    print(f"✅ Loaded topic bundle {bundle_manifest.get('version')}: {len(speaking_data)} speaking, "
+          f"{len(writing_data)} writing, {len(custom_topics)} custom in {elapsed:.2f}s")
+    return True
 
 def load_data_from_minio() -> bool:
     """Load essential data from MinIO bucket (speaking, writing, topics)
@@ -29,35 +211,20 @@ def load_data_from_minio() -> bool:
         print("MinIO client not initialized")
         return False
     
+    # One GET when ingest published a bundle
+    if _load_topic_bundle():
+        _build_topic_indexes()
+        return True
+    
     try:
         # Load speaking data (question 7 - Express Opinion)
         print("📖 Loading speaking data...")
-        objects = minio_client.list_objects(MINIO_BUCKET, prefix="speaking/", recursive=True)
-        speaking_count = 0
-        for obj in objects:
-            if obj.object_name.endswith("data.json"):
-                response = minio_client.get_object(MINIO_BUCKET, obj.object_name)
-                data = json.loads(response.read().decode('utf-8'))
-                topic_id = obj.object_name.split("/")[1]
-                speaking_data[topic_id] = data
-                speaking_count += 1
-                response.close()
-                response.release_conn()
+        speaking_count = _load_exam_prefix("speaking/", speaking_data)
         print(f"✅ Loaded {speaking_count} speaking topics")
         
         # Load writing data (question 8 - Opinion Essay)
         print("📖 Loading writing data...")
-        objects = minio_client.list_objects(MINIO_BUCKET, prefix="writing/", recursive=True)
-        writing_count = 0
-        for obj in objects:
-            if obj.object_name.endswith("data.json"):
-                response = minio_client.get_object(MINIO_BUCKET, obj.object_name)
-                data = json.loads(response.read().decode('utf-8'))
-                topic_id = obj.object_name.split("/")[1]
-                writing_data[topic_id] = data
-                writing_count += 1
-                response.close()
-                response.release_conn()
+        writing_count = _load_exam_prefix("writing/", writing_data)
         print(f"✅ Loaded {writing_count} writing topics")
         
         # Load custom topics
@@ -78,6 +245,7 @@ def load_data_from_minio() -> bool:
         
         total_topics = len(speaking_data) + len(writing_data) + len(custom_topics)
         print(f"📊 Total data loaded: {total_topics} topics")
+        _build_topic_indexes()
         return True
         
     except Exception as e:
@@ -88,25 +256,39 @@ def check_data_loaded() -> bool:
     """Check if data has been loaded"""
     return len(speaking_data) > 0 or len(writing_data) > 0 or len(custom_topics) > 0
 
+def get_bundle_version() -> str:
+    """Version of the loaded topic bundle, None when topics were loaded per object"""
+    return bundle_manifest.get("version")
+
 def get_data_stats() -> Dict:
     """Get statistics about loaded data"""
+    packed = _get_packed()
     return {
         "speaking_topics": len(speaking_data),
         "writing_topics": len(writing_data), 
         "custom_topics": len(custom_topics),
         "pronunciation_entries_cached": len(pronunciation_data),
-        "total_topics": len(speaking_data) + len(writing_data) + len(custom_topics)
+        "pronunciation_entries_packed": len(packed) if packed is not None else 0,
+        "pronunciation_entries_generated": len(generated_pronunciations),
+        "pronunciation_cache": pronunciation_data.stats(),
+        "generated_pronunciation_cache": generated_pronunciations.stats(),
+        "total_topics": len(speaking_data) + len(writing_data) + len(custom_topics),
+        "bundle_version": get_bundle_version()
     }
 
 def get_pronunciation_data(word: str) -> Dict:
     """Get pronunciation data for a word (lazy load from MinIO)"""
-    global pronunciation_data
-    
     word_lower = word.lower().strip()
     
-    # Check cache first
-    if word_lower in pronunciation_data:
-        return pronunciation_data[word_lower]
+    # Check cache first (including recent misses)
+    found, data = pronunciation_data.lookup(word_lower)
+    if found:
+        return data
+    
+    # Packed dictionary: a local mmap lookup, and a miss there is authoritative
+    packed = _get_packed()
+    if packed is not None:
+        return packed.get(word_lower)
     
     # Load from MinIO
     minio_client, MINIO_BUCKET = _get_clients()
@@ -114,17 +296,76 @@ def get_pronunciation_data(word: str) -> Dict:
         try:
             response = minio_client.get_object(MINIO_BUCKET, f"pronunciation/{word_lower}.json")
             data = json.loads(response.read().decode('utf-8'))
-            pronunciation_data[word_lower] = data  # Cache it
+            pronunciation_data.set(word_lower, data)  # Cache it
+            response.close()
+            response.release_conn()
+            return data
+        except Exception as e:
+            if _is_missing_object(e):
+                pronunciation_data.set_missing(word_lower)  # Word not found
+    
+    return None
+
+def _generated_object_name(word: str) -> str:
+    # Words come from user input, so keep the object name a single safe path segment
+    return f"{GENERATED_PRONUNCIATION_PREFIX}{quote(word, safe='')}.json"
+
+def get_generated_pronunciation(word: str) -> Dict:
+    """Get a previously generated pronunciation (in-process cache, then MinIO)"""
+    word_lower = word.lower().strip()
+    
+    found, data = generated_pronunciations.lookup(word_lower)
+    if found:
+        return data
+    
+    minio_client, MINIO_BUCKET = _get_clients()
+    if minio_client:
+        try:
+            response = minio_client.get_object(MINIO_BUCKET, _generated_object_name(word_lower))
+            data = json.loads(response.read().decode('utf-8'))
+            generated_pronunciations.set(word_lower, data)
             response.close()
             response.release_conn()
             return data
         except Exception as e:
-            pass  # Word not found
+            if _is_missing_object(e):
+                generated_pronunciations.set_missing(word_lower)  # Never generated
     
     return None
 
+def cache_generated_pronunciation(word: str, entry: Dict) -> Dict:
+    """Remember a generated pronunciation in-process; returns the stored entry"""
+    word_lower = word.lower().strip()
+    entry = {**entry, "word": word_lower, "generated": True}
+    generated_pronunciations.set(word_lower, entry)
+    return entry
+
+def save_generated_pronunciation(word: str, entry: Dict) -> bool:
+    """Write a generated pronunciation back so later lookups (any worker) skip the LLM"""
+    word_lower = word.lower().strip()
+    entry = cache_generated_pronunciation(word_lower, entry)
+    
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return False
+    
+    try:
+        payload = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        minio_client.put_object(
+            MINIO_BUCKET,
+            _generated_object_name(word_lower),
+            io.BytesIO(payload),
+            len(payload),
+            content_type='application/json'
+        )
+        return True
+    except Exception as e:
+        print(f"⚠️ Failed to store generated pronunciation for {word_lower}: {e}")
+        return False
+
 # Export data and functions
 __all__ = [
-    'speaking_data', 'writing_data', 'custom_topics', 'pronunciation_data',
-    'load_data_from_minio', 'check_data_loaded', 'get_data_stats', 'get_pronunciation_data'
+    'PronunciationCache', 'speaking_data', 'writing_data', 'custom_topics', 'pronunciation_data', 'generated_pronunciations',
+    'load_data_from_minio', 'check_data_loaded', 'get_data_stats', 'get_bundle_version', 'get_pronunciation_data',
+    'get_generated_pronunciation', 'cache_generated_pronunciation', 'save_generated_pronunciation'
 ]
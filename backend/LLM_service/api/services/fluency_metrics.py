@@ -0,0 +1,142 @@
+"""
+Acoustic Fluency Metrics
+Deterministic fluency measures from Whisper verbose_json segments (no LLM):
+- Speech rate (words per minute over the speaking time)
+- Pauses between segments: count, per minute, mean/max length and a length distribution
+- Filler-word ratio (um, uh, er, ...)
+- Mean recognition confidence (duration-weighted exp(avg_logprob))
+plus a 0-10 fluency score derived from them.
+"""
+
+import os
+import re
+import math
+from typing import Optional, List, Dict
+
+# Gaps shorter than this between segments are ordinary phrasing, not pauses
+PAUSE_MIN_SECONDS = float(os.getenv("FLUENCY_PAUSE_MIN_SECONDS", "0.3"))
+LONG_PAUSE_SECONDS = float(os.getenv("FLUENCY_LONG_PAUSE_SECONDS", "1.0"))
+
+# Comfortable speech rate band for exam answers; the rate score falls off linearly outside it
+IDEAL_WPM = (100, 170)
+MIN_WPM = 40
+MAX_WPM = 250
+
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "ahh", "hmm", "mm", "eh"}
+# Also ordinary English ("what kind of music", "I mean, ..."), so only counted when
+# Whisper sets them off by commas on both sides ("there are many, you know, things")
+FILLER_PHRASES = ("you know", "i mean", "kind of", "sort of")
+
+_WORD_RE = re.compile(r"[a-zA-Z']+")
+_FILLER_PHRASE_RE = re.compile(r",\s*(?:" + "|".join(FILLER_PHRASES) + r")\s*,", re.IGNORECASE)
+
+
+def _words(text: str) -> List[str]:
+    return [word.lower() for word in _WORD_RE.findall(text or "")]
+
+
+def _count_fillers(text: str, words: List[str]) -> int:
+    count = sum(1 for word in words if word in FILLER_WORDS)
+    count += len(_FILLER_PHRASE_RE.findall(text or ""))
+    return count
+
+
+def _rate_score(wpm: float) -> float:
+    low, high = IDEAL_WPM
+    if low <= wpm <= high:
+        return 10.0
+    if wpm < low:
+        return max(0.0, 10.0 * (wpm - MIN_WPM) / (low - MIN_WPM))
+    return max(0.0, 10.0 * (MAX_WPM - wpm) / (MAX_WPM - high))
+
+
+def fluency_score(metrics: Dict) -> float:
+    """
+    0-10 (0.5 steps): speech rate, penalized for time lost in long pauses, very frequent
+    pauses and fillers (ratios rather than per-minute counts, so short answers are not over-penalized)
+    """
+    score = _rate_score(metrics["words_per_minute"])
+    score -= 15 * metrics["long_pause_ratio"]
+    score -= 0.2 * max(0.0, metrics["pauses_per_minute"] - 10)
+    score -= min(4.0, 20 * metrics["filler_ratio"])
+    return round(min(10.0, max(0.0, score)) * 2) / 2
+
+
+def compute_fluency_metrics(segments: Optional[List[Dict]], duration: Optional[float] = None,
+                            transcript: Optional[str] = None) -> Optional[Dict]:
+    """
+    Fluency metrics from Whisper segments ({"start", "end", "text", "avg_logprob"})
+    Returns None when there are no usable timestamps (e.g. transcript-only evaluation).
+    """
+    timed = sorted(
+        (s for s in segments or []
+         if isinstance(s.get("start"), (int, float)) and isinstance(s.get("end"), (int, float)) and s["end"] > s["start"]),
+        key=lambda s: s["start"]
+    )
+    if not timed:
+        return None
+
+    text = transcript if transcript else " ".join(s.get("text", "") for s in timed)
+    words = _words(text)
+    speaking_time = timed[-1]["end"] - timed[0]["start"]
+    if speaking_time <= 0:
+        return None
+
+    pauses = [
+        round(current["start"] - previous["end"], 3)
+        for previous, current in zip(timed, timed[1:])
+        if current["start"] - previous["end"] >= PAUSE_MIN_SECONDS
+    ]
+    minutes = speaking_time / 60
+
+    weighted_confidence = 0.0
+    confidence_time = 0.0
+    for segment in timed:
+        logprob = segment.get("avg_logprob")
+        if isinstance(logprob, (int, float)):
+            length = segment["end"] - segment["start"]
+            weighted_confidence += math.exp(min(0.0, logprob)) * length
+            confidence_time += length
+
+    filler_count = _count_fillers(text, words)
+    metrics = {
+        "duration": round(duration, 2) if duration else round(timed[-1]["end"], 2),
+        "speaking_time": round(speaking_time, 2),
+        "word_count": len(words),
+        "words_per_minute": round(len(words) / minutes, 1),
+        "pause_count": len(pauses),
+        "pauses_per_minute": round(len(pauses) / minutes, 2),
+        "long_pause_ratio": round(sum(p for p in pauses if p >= LONG_PAUSE_SECONDS) / speaking_time, 3),
+        "mean_pause": round(sum(pauses) / len(pauses), 2) if pauses else 0.0,
+        "max_pause": round(max(pauses), 2) if pauses else 0.0,
+        "pause_distribution": {
+            "short": sum(1 for p in pauses if p < 0.5),
+            "medium": sum(1 for p in pauses if 0.5 <= p < LONG_PAUSE_SECONDS),
+            "long": sum(1 for p in pauses if p >= LONG_PAUSE_SECONDS),
+        },
+        "filler_count": filler_count,
+        "filler_ratio": round(filler_count / len(words), 3) if words else 0.0,
+        "mean_confidence": round(weighted_confidence / confidence_time, 3) if confidence_time else None,
+    }
+    metrics["fluency_score"] = fluency_score(metrics)
+    return metrics
+
+
+def describe_fluency_metrics(metrics: Dict) -> str:
+    """Compact text block for LLM prompts"""
+    distribution = metrics["pause_distribution"]
+    lines = [
+        f"- Speech rate: {metrics['words_per_minute']} words/minute ({metrics['word_count']} words in {metrics['speaking_time']}s)",
+        f"- Pauses: {metrics['pause_count']} (short {distribution['short']}, medium {distribution['medium']}, "
+        f"long {distribution['long']}; longest {metrics['max_pause']}s)",
+        f"- Filler words: {metrics['filler_count']} ({metrics['filler_ratio'] * 100:.1f}% of words)",
+    ]
+    if metrics.get("mean_confidence") is not None:
+        lines.append(f"- Mean ASR confidence: {metrics['mean_confidence']}")
+    lines.append(f"- Fluency score (computed): {metrics['fluency_score']}/10")
+    return "\n".join(lines)
+
+
+__all__ = [
+    'compute_fluency_metrics', 'fluency_score', 'describe_fluency_metrics'
+]
@@ -0,0 +1,183 @@
+"""
+Evaluation Job Queue
+In-process background jobs for long evaluations (no external broker):
+- Submit returns a job id immediately; a fixed pool of worker tasks runs jobs in FIFO order
+- Concurrency cap, queue depth limit and result TTL are configurable
+- Clients poll (optionally long-poll with wait) for the result
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+EVALUATION_JOB_CONCURRENCY = int(os.getenv("EVALUATION_JOB_CONCURRENCY", "4"))
+EVALUATION_JOB_QUEUE_LIMIT = int(os.getenv("EVALUATION_JOB_QUEUE_LIMIT", "100"))
+EVALUATION_JOB_RESULT_TTL = float(os.getenv("EVALUATION_JOB_RESULT_TTL", "3600"))
+
+
+class QueueFullError(Exception):
+    """Raised when the number of waiting jobs reached the queue limit"""
+
+
+class Job:
+    """One submitted evaluation"""
+
+    def __init__(self, kind: str, run: Callable[[], Awaitable[Optional[Dict]]]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.run = run
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    """FIFO queue drained by a bounded set of worker tasks"""
+
+    def __init__(self, concurrency: int = EVALUATION_JOB_CONCURRENCY,
+                 queue_limit: int = EVALUATION_JOB_QUEUE_LIMIT,
+                 result_ttl: float = EVALUATION_JOB_RESULT_TTL):
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Start the worker tasks (call from the running event loop)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        print(f"🧵 Evaluation job queue started ({self.concurrency} workers, limit {self.queue_limit})")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, run: Callable[[], Awaitable[Optional[Dict]]]) -> Job:
+        """Queue run() and return its job; raises QueueFullError when the queue is at its limit"""
+        if self._queue is None:
+            self.start()
+        self._purge_expired()
+
+        if self._queue.qsize() >= self.queue_limit:
+            self.rejected += 1
+            raise QueueFullError(f"Evaluation queue is full ({self.queue_limit} jobs waiting)")
+
+        job = Job(kind, run)
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Job after it finished or `timeout` seconds passed, whichever comes first"""
+        job = self.get(job_id)
+        if job and timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def position(self, job: Job) -> int:
+        """Jobs queued ahead of this one (0 once it is running)"""
+        if job.status != "queued":
+            return 0
+        return sum(1 for other in self.jobs.values() if other.status == "queued" and other.created_at < job.created_at)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await job.run()
+                if job.result is None:
+                    job.status = "failed"
+                    job.error = "Evaluation failed"
+                else:
+                    job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                print(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.run = None  # Release request data (audio bytes) held by the closure
+                job.finished_at = time.time()
+                job.done.set()
+                self._queue.task_done()
+
+            if job.status == "completed":
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": len(self._workers),
+            "concurrency": self.concurrency,
+            "queue_limit": self.queue_limit,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": statuses,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "result_ttl_seconds": self.result_ttl
+        }
+
+
+evaluation_jobs = JobQueue()
+
+
+def get_job_stats() -> Dict[str, Any]:
+    return evaluation_jobs.stats()
+
+
+__all__ = [
+    'QueueFullError', 'Job', 'JobQueue', 'evaluation_jobs', 'get_job_stats'
+]
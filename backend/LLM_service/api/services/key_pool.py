@@ -0,0 +1,294 @@
+"""
+Groq Key Pool Scheduler
+Spreads LLM calls over all GROQ_API_KEYS using per-key token buckets:
+- Each key has a requests-per-minute and a tokens-per-minute bucket
+- A call goes to the least-loaded key that still has capacity
+- When every key is saturated, callers queue (FIFO) until capacity refills; a dispatcher
+  task does the waiting, so each caller's timeout covers its whole time in the queue
+- Quota errors put the key on cooldown instead of rotating a shared index
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Optional, List, Any, Deque, Tuple
+
+# Per-key budgets (defaults match the Groq free tier for llama-3.1-8b-instant)
+GROQ_KEY_RPM = int(os.getenv("GROQ_KEY_RPM", "30"))
+GROQ_KEY_TPM = int(os.getenv("GROQ_KEY_TPM", "6000"))
+# Token estimate used when a caller does not provide one
+GROQ_DEFAULT_TOKEN_ESTIMATE = int(os.getenv("GROQ_DEFAULT_TOKEN_ESTIMATE", "1000"))
+# Cooldown after a quota error when the API gives no Retry-After
+GROQ_KEY_COOLDOWN = float(os.getenv("GROQ_KEY_COOLDOWN", "20"))
+# Maximum time a call may wait in the queue for a key with capacity. At the default 6000 TPM a key
+# refills ~100 tokens/s, so a full writing evaluation (~5 calls x ~1100 tokens) needs ~55s of budget.
+GROQ_QUEUE_TIMEOUT = float(os.getenv("GROQ_QUEUE_TIMEOUT", "120"))
+
+
+class TokenBucket:
+    """Continuously refilling bucket: capacity per minute, refilled at capacity/60 per second"""
+
+    def __init__(self, capacity: float):
+        self.capacity = float(capacity)
+        self.level = float(capacity)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds `amount` (after refill)"""
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+
+class KeyState:
+    """Budget and load of one API key"""
+
+    def __init__(self, index: int, client: Any, rpm: int, tpm: int):
+        self.index = index
+        self.client = client
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.quota_errors = 0
+
+    def refill(self, now: float):
+        self.requests.refill(now)
+        self.tokens.refill(now)
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until this key can accept a call of `tokens`"""
+        # A single call larger than the whole bucket is admitted once the bucket is full
+        tokens = min(tokens, self.tokens.capacity)
+        return max(
+            self.cooldown_until - now,
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+            0.0
+        )
+
+    def load(self) -> float:
+        """Fraction of the budget in use (0 = idle, 1 = saturated)"""
+        request_load = 1 - self.requests.level / self.requests.capacity
+        token_load = 1 - self.tokens.level / self.tokens.capacity
+        return max(request_load, token_load) + self.in_flight * 1e-3
+
+
+class GroqKeyPool:
+    """Least-loaded key selection with per-key RPM/TPM token buckets"""
+
+    def __init__(self, rpm: int = GROQ_KEY_RPM, tpm: int = GROQ_KEY_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.keys: List[KeyState] = []
+        # Callers waiting for capacity: (tokens, future resolved with the reserved key)
+        self._queue: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def reset(self, clients: List[Any]):
+        """Rebuild key states for a new list of clients"""
+        self.keys = [KeyState(i, client, self.rpm, self.tpm) for i, client in enumerate(clients)]
+        self._notify()
+
+    def peek(self) -> Optional[KeyState]:
+        """Least-loaded key without reserving capacity"""
+        if not self.keys:
+            return None
+        now = time.monotonic()
+        for key in self.keys:
+            key.refill(now)
+        return min(self.keys, key=lambda k: (k.wait_time(1, now), k.load()))
+
+    def pressure(self) -> float:
+        """Load of the least-loaded key (1 = every key saturated or cooling down)"""
+        if not self.keys:
+            return 1.0
+        now = time.monotonic()
+        loads = []
+        for key in self.keys:
+            key.refill(now)
+            loads.append(1.0 if key.cooldown_until > now else min(key.load(), 1.0))
+        return min(loads)
+
+    async def acquire(self, estimated_tokens: Optional[int] = None, timeout: float = GROQ_QUEUE_TIMEOUT) -> KeyState:
+        """
+        Reserve capacity on the least-loaded key
+        Waits in FIFO order when every key is saturated; raises TimeoutError after `timeout`
+        """
+        if not self.keys:
+            raise Exception("No Groq clients available")
+
+        tokens = GROQ_DEFAULT_TOKEN_ESTIMATE if estimated_tokens is None else max(0, int(estimated_tokens))
+        self._check_loop()
+        if not self._queue:
+            now = time.monotonic()
+            available = self._available(self.keys, tokens, now)
+            if available:
+                return self._reserve(available, tokens)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((tokens, future))
+        self._start_dispatcher()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"All {len(self.keys)} Groq keys saturated (queue timeout {timeout}s)")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._unreserve(future.result(), tokens)  # Granted just as the caller went away
+            raise
+
+    def _available(self, keys: List[KeyState], tokens: int, now: float) -> List[KeyState]:
+        for key in keys:
+            key.refill(now)
+        return [k for k in keys if k.wait_time(tokens, now) == 0]
+
+    def _reserve(self, available: List[KeyState], tokens: int) -> KeyState:
+        key = min(available, key=lambda k: k.load())
+        key.requests.level -= 1
+        key.tokens.level -= min(tokens, key.tokens.capacity)
+        key.in_flight += 1
+        key.total_requests += 1
+        return key
+
+    def _unreserve(self, key: KeyState, tokens: int):
+        key.requests.level = min(key.requests.capacity, key.requests.level + 1)
+        key.tokens.level = min(key.tokens.capacity, key.tokens.level + min(tokens, key.tokens.capacity))
+        key.in_flight = max(0, key.in_flight - 1)
+        key.total_requests -= 1
+        self._notify()
+
+    def _check_loop(self):
+        """Drop dispatcher state left over from another event loop (e.g. separate asyncio.run calls)"""
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is not None and self._dispatcher.get_loop() is not loop:
+            self._dispatcher = None
+            self._queue.clear()
+
+    def _notify(self):
+        """Capacity may have changed (release, cooldown, new keys): let the dispatcher re-check"""
+        if self._changed is not None:
+            self._changed.set()
+
+    def _start_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._changed = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        else:
+            self._notify()
+
+    async def _dispatch(self):
+        """
+        Hand out capacity to queued callers; sleeps until the head of the queue fits or capacity changes
+        The head's key is kept for it; other keys can serve smaller calls queued behind it.
+        """
+        while True:
+            self._changed.clear()
+            pending = [(tokens, future) for tokens, future in self._queue if not future.done()]
+            self._queue = deque(pending)
+            if not pending:
+                return
+            if not self.keys:
+                for _, future in pending:
+                    future.set_exception(Exception("No Groq clients available"))
+                self._queue.clear()
+                return
+
+            now = time.monotonic()
+            for key in self.keys:
+                key.refill(now)
+            head_tokens, head_future = pending[0]
+            head_key = min(self.keys, key=lambda k: (k.wait_time(head_tokens, now), k.load()))
+            wait = head_key.wait_time(head_tokens, now)
+            if wait == 0:
+                head_future.set_result(self._reserve([head_key], head_tokens))
+                continue
+
+            others = [k for k in self.keys if k is not head_key]
+            for tokens, future in pending[1:]:
+                available = [k for k in others if k.wait_time(tokens, now) == 0]
+                if available:
+                    future.set_result(self._reserve(available, tokens))
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, key: KeyState, estimated_tokens: Optional[int] = None, actual_tokens: Optional[int] = None):
+        """Finish a call; reconcile the token bucket with the real usage when known"""
+        key.in_flight = max(0, key.in_flight - 1)
+        if actual_tokens is None:
+            self._notify()
+            return
+
+        estimated = GROQ_DEFAULT_TOKEN_ESTIMATE if estimated_tokens is None else max(0, int(estimated_tokens))
+        reserved = min(estimated, key.tokens.capacity)
+        key.tokens.refill(time.monotonic())
+        key.tokens.level = min(key.tokens.capacity, key.tokens.level + reserved - actual_tokens)
+        key.total_tokens += actual_tokens
+        self._notify()
+
+    def penalize(self, key: KeyState, retry_after: Optional[float] = None):
+        """Put a key on cooldown after a quota/rate-limit error"""
+        cooldown = retry_after if retry_after and retry_after > 0 else GROQ_KEY_COOLDOWN
+        key.cooldown_until = max(key.cooldown_until, time.monotonic() + cooldown)
+        key.quota_errors += 1
+        print(f"🧊 Groq key {key.index + 1}/{len(self.keys)} cooling down for {cooldown:.0f}s")
+
+    def stats(self) -> List[dict]:
+        """Per-key budget snapshot"""
+        now = time.monotonic()
+        result = []
+        for key in self.keys:
+            key.refill(now)
+            result.append({
+                "key": key.index + 1,
+                "requests_available": round(key.requests.level, 1),
+                "tokens_available": round(key.tokens.level),
+                "in_flight": key.in_flight,
+                "cooling_down": key.cooldown_until > now,
+                "total_requests": key.total_requests,
+                "total_tokens": key.total_tokens,
+                "quota_errors": key.quota_errors
+            })
+        return result
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 500) -> int:
+    """Rough token estimate for a call (~4 characters per token plus expected completion)"""
+    return sum(len(text or "") for text in texts) // 4 + completion_tokens
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds) from an API error response, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_usage_tokens(result: Any) -> Optional[int]:
+    """Total tokens reported by a chat completion response"""
+    usage = getattr(result, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+__all__ = [
+    'GROQ_KEY_RPM', 'GROQ_KEY_TPM', 'TokenBucket', 'KeyState', 'GroqKeyPool',
+    'estimate_tokens', 'get_retry_after', 'get_usage_tokens'
+]
@@ -0,0 +1,220 @@
+"""
+LLM Result Cache
+Content-addressed cache for JSON LLM results (writing steps, speaking layers):
+- Key: SHA-256 of (prompt version, model, system prompt, normalized user content, params)
+- Bounded LRU with TTL eviction and hit/miss counters
+- Per-request bypass via bypass_llm_cache()
+- Single-flight: concurrent identical calls share one in-flight LLM request,
+  cancelled when every caller waiting on it is cancelled
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+# Bump when prompts or result post-processing change so old entries stop matching
+LLM_PROMPT_VERSION = os.getenv("LLM_PROMPT_VERSION", "1")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+
+# Set per request (copied into tasks created while it is set)
+_cache_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_LINE_PADDING = re.compile(r" ?\n ?")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_content(text: str) -> str:
+    """
+    Collapse runs of spaces/tabs so re-submissions differing only in spacing share an entry
+    Line and paragraph breaks are kept: coherence is graded on paragraphing.
+    """
+    text = _INLINE_WHITESPACE.sub(" ", (text or "").replace("\r\n", "\n").replace("\r", "\n"))
+    return _BLANK_LINES.sub("\n\n", _LINE_PADDING.sub("\n", text)).strip()
+
+
+def make_cache_key(model: str, system_prompt: str, user_content: str, **params) -> str:
+    """Content address of one LLM call"""
+    payload = json.dumps(
+        [LLM_PROMPT_VERSION, model, system_prompt, normalize_content(user_content), params],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResultCache:
+    """LRU + TTL cache of JSON results (stored serialized, so callers can mutate what they get)"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, json.dumps(value, ensure_ascii=False))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+llm_cache = LLMResultCache()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one shared task
+    The task is cancelled once every caller waiting on it was cancelled (client gone,
+    timeout), so abandoned calls stop instead of using up the key pool budget.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield: one cancelled caller must not cancel the call while others still wait for it
+            result = await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Last caller went away: stop the call, and let new callers start a fresh one
+                    self.abandoned += 1
+                    if self._in_flight.get(key) is task:
+                        del self._in_flight[key]
+                    task.cancel()
+        # Every caller (the first one too) gets its own copy: callers mutate results, and
+        # the first one resumes before the waiters copy theirs
+        return copy.deepcopy(result)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even when every waiter went away
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._in_flight), "calls": self.calls,
+            "coalesced": self.coalesced, "abandoned": self.abandoned
+        }
+
+
+single_flight = SingleFlight()
+
+
+@contextmanager
+def bypass_llm_cache(bypass: bool = True):
+    """Skip cache reads (fresh results are still stored) for calls made inside this block"""
+    token = _cache_bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _cache_bypass.reset(token)
+
+
+async def cached_llm_call(
+    system_prompt: str,
+    user_content: str,
+    compute: Callable[[], Awaitable[Optional[Any]]],
+    model: str,
+    **params
+) -> Optional[Any]:
+    """
+    Return a cached result for this (model, prompt, content) or run compute()
+    Identical calls already in flight are joined instead of repeated.
+    Only successful (non-None) results are cached.
+    """
+    key = make_cache_key(model, system_prompt, user_content, **params)
+    if not LLM_CACHE_ENABLED:
+        return await single_flight.run(key, compute)
+
+    if not _cache_bypass.get():
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def compute_and_store():
+        result = await compute()
+        if result is not None:
+            llm_cache.set(key, result)
+        return result
+
+    return await single_flight.run(key, compute_and_store)
+
+
+def get_llm_cache_stats() -> Dict:
+    return {**llm_cache.stats(), "single_flight": single_flight.stats()}
+
+
+__all__ = [
+    'LLM_PROMPT_VERSION', 'LLMResultCache', 'llm_cache', 'SingleFlight', 'single_flight',
+    'make_cache_key', 'normalize_content',
+    'bypass_llm_cache', 'cached_llm_call', 'get_llm_cache_stats'
+]
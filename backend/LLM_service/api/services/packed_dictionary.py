@@ -0,0 +1,185 @@
+"""
+Packed Dictionary Module
+Read-only, memory-mapped pronunciation dictionary built by scripts/ingest_dictionary.py.
+Downloaded once from MinIO, then every lookup is an O(log n) local read.
+
+File layout (little-endian):
+    header   : magic "PDICT001", u32 count, u32 reserved, u64 keys_offset, u64 records_offset
+    entries  : count x (u32 key_off, u16 key_len, u16 ipa_len, u32 rec_off, u32 rec_len), sorted by word
+    keys     : word bytes immediately followed by its IPA bytes (UTF-8)
+    records  : compact JSON per word ({"ipa": ..., "meanings": [...]})
+"""
+
+import os
+import json
+import mmap
+import struct
+from typing import Optional, Dict, Tuple, Iterator
+
+PACKED_DICTIONARY_OBJECT = "pronunciation-packed/dictionary.pdict"
+PACKED_DICTIONARY_PATH = os.getenv("PACKED_DICTIONARY_PATH", "/tmp/english-learning/dictionary.pdict")
+
+MAGIC = b"PDICT001"
+HEADER = struct.Struct("<8sIIQQ")
+ENTRY = struct.Struct("<IHHII")
+
+
+def _get_clients():
+    from .clients import minio_client, MINIO_BUCKET
+    return minio_client, MINIO_BUCKET
+
+
+class PackedDictionary:
+    """Binary search over a memory-mapped sorted key table; only touched pages become resident"""
+
+    def __init__(self, path: str, version: Optional[str] = None):
+        self.path = path
+        self.version = version
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, _, self.keys_offset, self.records_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a packed dictionary: {path}")
+        self.entries_offset = HEADER.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+    def _entry(self, i: int) -> Tuple[int, int, int, int, int]:
+        return ENTRY.unpack_from(self._mm, self.entries_offset + i * ENTRY.size)
+
+    def _key(self, i: int) -> bytes:
+        key_off, key_len, _, _, _ = self._entry(i)
+        start = self.keys_offset + key_off
+        return self._mm[start:start + key_len]
+
+    def _bisect(self, key: bytes) -> int:
+        """First position whose word is >= key"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _record(self, i: int) -> Dict:
+        _, _, _, rec_off, rec_len = self._entry(i)
+        start = self.records_offset + rec_off
+        return json.loads(self._mm[start:start + rec_len].decode("utf-8"))
+
+    def word_at(self, i: int) -> str:
+        return self._key(i).decode("utf-8")
+
+    def ipa_at(self, i: int) -> Optional[str]:
+        key_off, key_len, ipa_len, _, _ = self._entry(i)
+        start = self.keys_offset + key_off + key_len
+        return self._mm[start:start + ipa_len].decode("utf-8") or None
+
+    def find(self, word: str) -> int:
+        """Position of word, or -1"""
+        key = word.encode("utf-8")
+        i = self._bisect(key)
+        if i < self.count and self._key(i) == key:
+            return i
+        return -1
+
+    def get(self, word: str) -> Optional[Dict]:
+        """Full entry for word ({"word", "ipa", "meanings", ...}) or None"""
+        i = self.find(word)
+        if i < 0:
+            return None
+        record = self._record(i)
+        record["word"] = word
+        return record
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) positions of words starting with prefix"""
+        key = prefix.encode("utf-8")
+        lo = self._bisect(key)
+        hi = self._bisect(key + b"\xff")
+        return lo, hi
+
+    def iter_word_ipas(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """(word, ipa) for every entry, reading only the key blob"""
+        for i in range(self.count):
+            yield self.word_at(i), self.ipa_at(i)
+
+
+# Set once the packed file is downloaded and mapped
+packed_dictionary: Optional[PackedDictionary] = None
+
+
+def get_packed_version() -> Optional[str]:
+    """ETag of the published packed dictionary, or None if it is not published"""
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return None
+    try:
+        return minio_client.stat_object(MINIO_BUCKET, PACKED_DICTIONARY_OBJECT).etag
+    except Exception:
+        return None
+
+
+def load_packed_dictionary(force: bool = False) -> bool:
+    """Download the packed dictionary (unless the local copy is current) and memory-map it"""
+    global packed_dictionary
+
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        print("MinIO client not initialized")
+        return False
+
+    version = get_packed_version()
+    if not version:
+        print(f"⚠️ Packed dictionary not published ({PACKED_DICTIONARY_OBJECT}), using per-word objects")
+        return False
+
+    if not force and packed_dictionary and packed_dictionary.version == version:
+        return True
+
+    try:
+        os.makedirs(os.path.dirname(PACKED_DICTIONARY_PATH), exist_ok=True)
+        # Each version gets its own file so readers of the old mapping are never disturbed
+        etag = version.strip('"')
+        path = f"{PACKED_DICTIONARY_PATH}.{etag}"
+        if force or not os.path.exists(path):
+            print("📖 Downloading packed dictionary...")
+            tmp_path = f"{path}.part"
+            minio_client.fget_object(MINIO_BUCKET, PACKED_DICTIONARY_OBJECT, tmp_path)
+            os.replace(tmp_path, path)
+
+        previous = packed_dictionary
+        packed_dictionary = PackedDictionary(path, version=version)
+        if previous and previous.path != path:
+            # Unlinking keeps the old mapping readable for in-flight lookups
+            try:
+                os.remove(previous.path)
+            except OSError:
+                pass
+
+        size_kb = os.path.getsize(path) // 1024
+        print(f"✅ Packed dictionary mapped: {len(packed_dictionary)} words ({size_kb} KB on disk)")
+        return True
+    except Exception as e:
+        print(f"❌ Packed dictionary loading error: {e}")
+        return False
+
+
+def get_packed_dictionary() -> Optional[PackedDictionary]:
+    return packed_dictionary
+
+
+__all__ = [
+    'PACKED_DICTIONARY_OBJECT', 'PackedDictionary', 'load_packed_dictionary',
+    'get_packed_dictionary', 'get_packed_version'
+]
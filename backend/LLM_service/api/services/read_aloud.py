@@ -0,0 +1,246 @@
+"""
+Read Aloud Evaluation (speaking questions 1-2)
+Scored without an LLM - the only paid call is ASR:
+1. ASR (Whisper, shared with the speaking pipeline incl. transcript cache)
+2. Word alignment of the transcript against the reference passage (edit distance)
+3. WER, omitted / inserted / substituted words and per-word mismatches
+4. Accuracy, completeness and (measured) fluency scores
+"""
+
+import os
+import re
+import time
+import asyncio
+from typing import Optional, List, Dict, Tuple, Union
+
+from .audio_upload import AudioUpload
+from .fluency_metrics import compute_fluency_metrics
+from .speaking_evaluation import transcribe_audio
+
+# Words listed for practice in the feedback
+MAX_PRACTICE_WORDS = 10
+# Client-supplied passages are capped (exam passages are well under 1000 characters);
+# alignment is O(reference x transcript words)
+READ_ALOUD_MAX_REFERENCE_CHARS = int(os.getenv("READ_ALOUD_MAX_REFERENCE_CHARS", "3000"))
+# Longer digit runs are compared as written instead of spelled out
+MAX_SPELLED_DIGITS = 6
+
+_ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+         "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+
+_TOKEN_RE = re.compile(r"\$?\d+(?:\.\d+)?%?|[a-z]+(?:'[a-z]+)*")
+
+
+def _number_words(n: int) -> List[str]:
+    """Spoken form of 0..999999 (ASR writes "15" where the passage says "fifteen")"""
+    if n < 20:
+        return [_ONES[n]]
+    if n < 100:
+        return [_TENS[n // 10]] + (_ONES[n % 10:n % 10 + 1] if n % 10 else [])
+    if n < 1000:
+        return [_ONES[n // 100], "hundred"] + (_number_words(n % 100) if n % 100 else [])
+    if n < 1000000:
+        return _number_words(n // 1000) + ["thousand"] + (_number_words(n % 1000) if n % 1000 else [])
+    return [str(n)]
+
+
+def _expand_token(token: str) -> List[str]:
+    if not token[0].isdigit() and token[0] != "$":
+        return [token]
+
+    words = []
+    number = token.lstrip("$").rstrip("%")
+    whole, _, fraction = number.partition(".")
+    if len(whole) > MAX_SPELLED_DIGITS or len(fraction) > MAX_SPELLED_DIGITS:
+        return [token]
+    words.extend(_number_words(int(whole)))
+    if fraction:
+        words.append("point")
+        words.extend(_ONES[int(digit)] for digit in fraction)
+    if token.endswith("%"):
+        words.append("percent")
+    if token.startswith("$"):
+        words.append("dollars" if number != "1" else "dollar")
+    return words
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase words without punctuation, curly apostrophes unified and numbers spelled out"""
+    text = (text or "").lower().replace("’", "'").replace("‘", "'")
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", text)  # 1,000 -> 1000
+    words = []
+    for token in _TOKEN_RE.findall(text):
+        words.extend(_expand_token(token))
+    return words
+
+
+def align_words(reference: List[str], hypothesis: List[str]) -> List[Tuple[str, Optional[int], Optional[str], Optional[str]]]:
+    """
+    Minimum edit-distance alignment (Levenshtein over words)
+    Returns [(op, reference_index, expected, heard)] with op in match/substitution/omission/insertion.
+    """
+    n, m = len(reference), len(hypothesis)
+    # Rows of the DP table are kept for the backtrace; passages are ~100 words, so this is ~10k cells
+    rows = [list(range(m + 1))]
+    for i in range(1, n + 1):
+        previous = rows[-1]
+        row = [i] + [0] * m
+        expected = reference[i - 1]
+        for j in range(1, m + 1):
+            if expected == hypothesis[j - 1]:
+                row[j] = previous[j - 1]
+            else:
+                row[j] = 1 + min(previous[j - 1], previous[j], row[j - 1])
+        rows.append(row)
+
+    ops = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and reference[i - 1] == hypothesis[j - 1] and rows[i][j] == rows[i - 1][j - 1]:
+            ops.append(("match", i - 1, reference[i - 1], hypothesis[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and j > 0 and rows[i][j] == rows[i - 1][j - 1] + 1:
+            ops.append(("substitution", i - 1, reference[i - 1], hypothesis[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and rows[i][j] == rows[i - 1][j] + 1:
+            ops.append(("omission", i - 1, reference[i - 1], None))
+            i -= 1
+        else:
+            ops.append(("insertion", i if i < n else None, None, hypothesis[j - 1]))
+            j -= 1
+    ops.reverse()
+    return ops
+
+
+def score_read_aloud(reference_text: str, transcript: str, fluency_metrics: Optional[Dict] = None) -> Dict:
+    """Alignment statistics, mismatches, scores and feedback for one reading"""
+    reference = normalize_words(reference_text)
+    hypothesis = normalize_words(transcript)
+    ops = align_words(reference, hypothesis)
+
+    counts = {"match": 0, "substitution": 0, "omission": 0, "insertion": 0}
+    for op, _, _, _ in ops:
+        counts[op] += 1
+    total = len(reference) or 1
+    errors = counts["substitution"] + counts["omission"] + counts["insertion"]
+    wer = errors / total
+
+    mismatches = [
+        {"type": op, "position": position, "expected": expected, "heard": heard}
+        for op, position, expected, heard in ops if op != "match"
+    ]
+
+    accuracy = round(max(0.0, 1 - wer) * 10, 1)
+    completeness = round((len(reference) - counts["omission"]) / total * 10, 1)
+    if fluency_metrics:
+        fluency = fluency_metrics["fluency_score"]
+        overall = 0.6 * accuracy + 0.2 * completeness + 0.2 * fluency
+    else:
+        fluency = None
+        overall = 0.75 * accuracy + 0.25 * completeness
+    overall = round(overall, 1)
+
+    scores = {"accuracy": accuracy, "completeness": completeness, "overall": overall,
+              "toeic_score": _toeic_score(overall)}
+    if fluency is not None:
+        scores["fluency"] = fluency
+
+    return {
+        "alignment": {
+            "wer": round(wer, 3),
+            "reference_words": len(reference),
+            "transcript_words": len(hypothesis),
+            "correct": counts["match"],
+            "substitutions": counts["substitution"],
+            "omissions": counts["omission"],
+            "insertions": counts["insertion"]
+        },
+        "mismatches": mismatches,
+        "omitted_words": [m["expected"] for m in mismatches if m["type"] == "omission"],
+        "inserted_words": [m["heard"] for m in mismatches if m["type"] == "insertion"],
+        "scores": scores,
+        "feedback": _feedback(counts, len(reference), mismatches)
+    }
+
+
+def _toeic_score(overall: float) -> int:
+    """TOEIC Speaking Q1-2 scale (0-3)"""
+    if overall >= 8.5:
+        return 3
+    if overall >= 6.5:
+        return 2
+    if overall >= 4.0:
+        return 1
+    return 0
+
+
+def _feedback(counts: Dict[str, int], reference_count: int, mismatches: List[Dict]) -> Dict:
+    practice = []
+    for mismatch in mismatches:
+        word = mismatch["expected"]
+        if mismatch["type"] == "substitution" and word not in practice:
+            practice.append(word)
+    practice = practice[:MAX_PRACTICE_WORDS]
+
+    percent = round(counts["match"] / reference_count * 100) if reference_count else 0
+    summary = f"Đọc đúng {counts['match']}/{reference_count} từ ({percent}%)."
+    if counts["omission"]:
+        summary += f" Bỏ sót {counts['omission']} từ."
+    if counts["insertion"]:
+        summary += f" Thêm {counts['insertion']} từ không có trong đoạn văn."
+    if practice:
+        summary += f" Luyện phát âm lại: {', '.join(practice[:5])}."
+
+    return {"summary": summary, "words_to_practice": practice}
+
+
+async def evaluate_read_aloud(
+    audio: Union[bytes, AudioUpload],
+    reference_text: str,
+    topic_id: Optional[str] = None,
+    question_number: Optional[str] = None,
+    filename: str = "audio.wav"
+) -> Dict:
+    """
+    Read Aloud evaluation: ASR, then local alignment scoring (milliseconds, no LLM)
+    Same success/error convention as evaluate_speaking_full.
+    Raises ValueError for a reference_text over READ_ALOUD_MAX_REFERENCE_CHARS.
+    """
+    if len(reference_text) > READ_ALOUD_MAX_REFERENCE_CHARS:
+        raise ValueError(f"Reference text too long (max {READ_ALOUD_MAX_REFERENCE_CHARS} characters)")
+
+    result = {
+        "topic_id": topic_id,
+        "question_number": question_number,
+        "success": False,
+        "reference_text": reference_text
+    }
+
+    started = time.perf_counter()
+    transcript, asr_metadata = await transcribe_audio(audio, filename)
+    asr_seconds = time.perf_counter() - started
+    if not transcript:
+        result["error"] = asr_metadata.get("error", "Speech recognition failed")
+        return result
+
+    scoring_started = time.perf_counter()
+    fluency_metrics = compute_fluency_metrics(asr_metadata.get("segments"), asr_metadata.get("duration"), transcript)
+    # Off the event loop: a long passage against a long transcript takes tens of milliseconds
+    result.update(await asyncio.to_thread(score_read_aloud, reference_text, transcript, fluency_metrics))
+    result["success"] = True
+    result["transcript"] = transcript
+    result["fluency_metrics"] = fluency_metrics
+    result["timings"] = {
+        "asr": round(asr_seconds, 3),
+        "scoring_ms": round((time.perf_counter() - scoring_started) * 1000, 2)
+    }
+
+    print(f"Read Aloud evaluated - WER {result['alignment']['wer']}, overall {result['scores']['overall']} "
+          f"(scoring {result['timings']['scoring_ms']}ms)")
+    return result
+
+
+__all__ = [
+    'READ_ALOUD_MAX_REFERENCE_CHARS', 'normalize_words', 'align_words', 'score_read_aloud', 'evaluate_read_aloud'
+]
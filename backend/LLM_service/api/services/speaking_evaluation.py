@@ -7,10 +7,31 @@ Implements 4-layer speaking evaluation system for Vietnamese learners:
 4. Overall Assessment & Feedback
 """
 
+import os
 import json
 import io
-from typing import Optional, Tuple, Dict
+import asyncio
+from typing import Optional, Tuple, Dict, Union
 from .clients import groq_clients, groq_api_call_with_retry, LLM_MODEL, WHISPER_MODEL
+from .key_pool import estimate_tokens
+from .llm_cache import cached_llm_call
+from .transcript_cache import cached_transcription
+from .audio_preprocessing import preprocess_audio, AudioTooLongError
+from .audio_upload import AudioUpload
+from .fluency_metrics import compute_fluency_metrics, describe_fluency_metrics
+
+# Attempts per audio chunk before the transcription fails
+ASR_CHUNK_ATTEMPTS = int(os.getenv("ASR_CHUNK_ATTEMPTS", "2"))
+
+# Per-layer timeout (seconds) for the concurrent layer 2/3/3b fan-out
+SPEAKING_LAYER_TIMEOUT = float(os.getenv("SPEAKING_LAYER_TIMEOUT", "45"))
+
+# "full": layers 2, 3 and 3b as three LLM calls; "compact": one call returning all three
+SPEAKING_EVAL_MODES = ("full", "compact")
+SPEAKING_EVAL_MODE = os.getenv("SPEAKING_EVAL_MODE", "full").lower()
+if SPEAKING_EVAL_MODE not in SPEAKING_EVAL_MODES:
+    print(f"⚠️ Unknown SPEAKING_EVAL_MODE '{SPEAKING_EVAL_MODE}', using 'full'")
+    SPEAKING_EVAL_MODE = "full"
 
 # ========== EVALUATION PROMPTS ==========
 
@@ -55,6 +76,29 @@ Trả về JSON format:
     "vietnamese_specific_tips": ["Chú ý phát âm phụ âm cuối để rõ nghĩa"]
 }"""
 
+# Layer 2 when fluency was measured from the audio: pronunciation only, fluency comments on the given numbers
+PRONUNCIATION_WITH_METRICS_PROMPT = """Bạn là chuyên gia đánh giá phát âm tiếng Anh, chuyên hỗ trợ người học Việt Nam.
+
+Bạn nhận transcript và các CHỈ SỐ ĐỘ TRÔI CHẢY đã được đo từ âm thanh (tốc độ nói, ngắt nghỉ, từ đệm).
+KHÔNG chấm lại độ trôi chảy - chỉ nhận xét dựa trên các chỉ số đó.
+
+1. **Điểm Phát âm (0-10)**: ước tính từ transcript, chỉ trừ điểm cho lỗi RÕ RÀNG và NGHIÊM TRỌNG
+   (phát âm sai làm đổi nghĩa, thiếu phụ âm cuối -s/-ed, trọng âm sai hoàn toàn)
+2. **Nhận xét độ trôi chảy**: 1 câu dựa trên chỉ số, tối đa 2 fluency_issues cụ thể
+
+QUAN TRỌNG: phản hồi bằng TIẾNG VIỆT, giữ nguyên từ tiếng Anh khi chỉ ra lỗi.
+Tối đa 3 pronunciation_issues và 2 vietnamese_specific_tips.
+
+Trả về JSON format:
+{
+    "pronunciation_score": 7.5,
+    "pronunciation_feedback": "Phát âm tốt, rõ ràng",
+    "pronunciation_issues": [{"word": "technology", "issue": "Trọng âm sai", "suggestion": "Nhấn mạnh âm tiết thứ 2: tech-NO-lo-gy"}],
+    "fluency_feedback": "Tốc độ nói phù hợp nhưng còn ngắt nghỉ dài",
+    "fluency_issues": ["Giảm các khoảng ngừng dài hơn 1 giây giữa các ý"],
+    "vietnamese_specific_tips": ["Chú ý phát âm phụ âm cuối để rõ nghĩa"]
+}"""
+
 # Layer 3: Grammar, Content & Topic Matching
 GRAMMAR_CONTENT_PROMPT = """Bạn là chuyên gia đánh giá ngữ pháp và nội dung tiếng Anh cho bài thi nói.
 
@@ -125,6 +169,44 @@ Ví dụ LẠC ĐỀ:
 - Đề bài hỏi về "sở thích đọc sách" nhưng thí sinh nói về "xem phim" → is_off_topic: true
 - Đề bài hỏi "mô tả công việc mơ ước" nhưng thí sinh nói về "kỳ nghỉ hè" → is_off_topic: true"""
 
+# Compact mode: Layer 2 + Layer 3 + Layer 3b in a single structured call
+COMPACT_SPEAKING_PROMPT = """Bạn là chuyên gia đánh giá bài thi nói tiếng Anh, chuyên hỗ trợ người học Việt Nam.
+Bạn nhận ĐỀ BÀI và transcript CÂU TRẢ LỜI của thí sinh. Đánh giá trong MỘT lần theo 3 phần:
+
+1. pronunciation_fluency: phát âm (ước tính từ transcript) và độ trôi chảy (0-10)
+   - Chỉ trừ điểm cho lỗi RÕ RÀNG, NGHIÊM TRỌNG (thiếu phụ âm cuối -s/-ed, trọng âm sai hoàn toàn)
+2. grammar_content: ngữ pháp, từ vựng, nội dung (0-10)
+   - Chỉ bắt lỗi chắc chắn 100%, không bắt lỗi nhỏ hoặc chủ quan
+3. topic_matching: câu trả lời có đúng CHỦ ĐỀ đề bài không (0-10)
+   - Đúng hoàn toàn 8-10, liên quan một phần 5-7, lạc đề 0-4 (is_off_topic=true)
+
+QUY TẮC:
+- Khuyến khích và xây dựng, không quá khắt khe
+- Phản hồi bằng TIẾNG VIỆT, giữ nguyên từ/câu tiếng Anh khi chỉ lỗi
+- Tối đa: 3 pronunciation_issues, 2 fluency_issues, 2 vietnamese_specific_tips,
+  3 grammar_errors, 2 vocabulary_suggestions, 3 improvement_suggestions, 2 suggestions
+
+JSON format:
+{
+    "pronunciation_fluency": {
+        "pronunciation_score": 7.5, "pronunciation_feedback": "...",
+        "pronunciation_issues": [{"word": "technology", "issue": "Trọng âm sai", "suggestion": "tech-NO-lo-gy"}],
+        "fluency_score": 8.0, "fluency_feedback": "...",
+        "fluency_issues": ["..."], "vietnamese_specific_tips": ["..."]
+    },
+    "grammar_content": {
+        "grammar_score": 8.0, "grammar_feedback": "...",
+        "grammar_errors": [{"error": "I goes", "correction": "I go", "rule": "..."}],
+        "vocabulary_score": 7.5, "vocabulary_feedback": "...", "vocabulary_suggestions": ["..."],
+        "content_score": 8.0, "content_feedback": "...", "improvement_suggestions": ["..."]
+    },
+    "topic_matching": {
+        "topic_matching_score": 8.5, "is_off_topic": false,
+        "topic_analysis": "Đề bài yêu cầu: ...", "response_analysis": "Thí sinh trả lời: ...",
+        "matching_explanation": "Phân tích: ...", "off_topic_warning": "", "suggestions": ["..."]
+    }
+}"""
+
 # Legacy prompt for backward compatibility
 SPEAKING_EVAL_PROMPT = """Bạn là chuyên gia đánh giá kỹ năng nói tiếng Anh cho bài thi TOEIC Speaking.
 Nhiệm vụ: Đánh giá câu trả lời của người nói dựa trên chủ đề cho trước.
@@ -169,72 +251,194 @@ Trả về JSON format (errors: max 5 items, suggestions: max 3 items):
 
 # ========== LAYER 1: SPEECH RECOGNITION ==========
 
-def transcribe_audio(audio_data: bytes, filename: str = "audio.wav") -> Tuple[Optional[str], Optional[dict]]:
+def _plain_segments(segments) -> list:
+    """Whisper segments as JSON-serializable dicts (the SDK may return objects)"""
+    plain = []
+    for segment in segments or []:
+        if isinstance(segment, dict):
+            plain.append(segment)
+        elif hasattr(segment, "model_dump"):
+            plain.append(segment.model_dump())
+        else:
+            plain.append(dict(vars(segment)))
+    return plain
+
+async def transcribe_audio(audio: Union[bytes, AudioUpload], filename: str = "audio.wav") -> Tuple[Optional[str], Optional[dict]]:
     """
     Layer 1: Speech Recognition (ASR) using Groq Whisper
+    audio: raw bytes, or an AudioUpload spooled by the endpoint (passed on as a file, not copied)
+    The recording is normalized to 16 kHz mono first (audio_preprocessing.py), and the same
+    recording (by content hash) is transcribed once, see transcript_cache.py
     Returns: (transcript, metadata)
     """
     if not groq_clients:
         return None, {"error": "Groq clients not initialized"}
     
-    try:
-        def api_call(client):
-            audio_file = io.BytesIO(audio_data)
-            audio_file.name = filename
-            
+    upload = audio if isinstance(audio, AudioUpload) else AudioUpload.from_bytes(audio, filename)
+    return await cached_transcription(
+        upload.sha256, WHISPER_MODEL,
+        lambda: _transcribe_audio_uncached(upload)
+    )
+
+async def _whisper_call(audio: Union[bytes, AudioUpload], filename: str):
+    """One Groq Whisper request (verbose_json, English)"""
+    async def api_call(client):
+        # A fresh handle per attempt: spooled uploads are streamed from disk, bytes are not copied
+        audio_file = audio.open() if isinstance(audio, AudioUpload) else io.BytesIO(audio)
+        try:
             # Use Groq Whisper for transcription
-            transcription = client.audio.transcriptions.create(
+            return await client.audio.transcriptions.create(
                 model=WHISPER_MODEL,
-                file=audio_file,
+                file=(filename, audio_file),
                 language="en",  # Force English transcription
                 response_format="verbose_json"
             )
-            return transcription
-        
-        # Use retry mechanism
-        transcription = groq_api_call_with_retry(api_call)
+        finally:
+            audio_file.close()
+    
+    # Use retry mechanism (Whisper calls only count against the request budget)
+    return await groq_api_call_with_retry(api_call, estimated_tokens=0)
+
+async def _transcribe_chunk(audio: Union[bytes, AudioUpload], filename: str, index: int):
+    """Transcribe one chunk; a failed chunk is retried on its own (quota errors already move to another key)"""
+    for attempt in range(1, ASR_CHUNK_ATTEMPTS + 1):
+        try:
+            return await _whisper_call(audio, filename)
+        except Exception as e:
+            if attempt == ASR_CHUNK_ATTEMPTS:
+                raise
+            print(f"⚠️ Chunk {index + 1} transcription failed (attempt {attempt}/{ASR_CHUNK_ATTEMPTS}): {str(e)[:100]}")
+
+def _stitch_transcriptions(parts: list) -> Tuple[str, dict]:
+    """
+    Join per-chunk transcriptions [(offset_seconds, transcription)] in order
+    Segment ids are renumbered and start/end shifted by the chunk offset, so timestamps
+    stay continuous over the whole recording.
+    """
+    texts = []
+    segments = []
+    duration = 0.0
+    for offset, transcription in parts:
+        text = (transcription.text or "").strip()
+        if text:
+            texts.append(text)
+        for segment in _plain_segments(getattr(transcription, 'segments', [])):
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            for field in ("start", "end"):
+                if isinstance(segment.get(field), (int, float)):
+                    segment[field] = round(segment[field] + offset, 3)
+            segments.append(segment)
+        chunk_duration = getattr(transcription, 'duration', None)
+        if chunk_duration is not None:
+            duration = max(duration, offset + chunk_duration)
+    
+    return " ".join(texts), {
+        "language": getattr(parts[0][1], 'language', 'en'),
+        "duration": round(duration, 3) if duration else None,
+        "segments": segments,
+    }
+
+async def _transcribe_audio_uncached(upload: AudioUpload) -> Tuple[Optional[str], Optional[dict]]:
+    """Normalize one recording and transcribe its chunks concurrently across the key pool"""
+    try:
+        chunks, filename, preprocessing = await preprocess_audio(upload)
+    except AudioTooLongError as e:
+        return None, {"error": str(e)}
+    
+    tasks = [
+        asyncio.ensure_future(_transcribe_chunk(chunk, filename, index))
+        for index, (chunk, _) in enumerate(chunks)
+    ]
+    try:
+        try:
+            transcriptions = await asyncio.gather(*tasks)
+        finally:
+            # One failed chunk fails the recording: stop the others instead of using key capacity for them
+            for task in tasks:
+                task.cancel()
         
-        metadata = {
-            "language": getattr(transcription, 'language', 'en'),
-            "duration": getattr(transcription, 'duration', None),
-            "segments": getattr(transcription, 'segments', []),
-        }
+        if len(chunks) == 1:
+            transcription = transcriptions[0]
+            text = transcription.text
+            metadata = {
+                "language": getattr(transcription, 'language', 'en'),
+                "duration": getattr(transcription, 'duration', None),
+                "segments": _plain_segments(getattr(transcription, 'segments', [])),
+            }
+        else:
+            text, metadata = _stitch_transcriptions(
+                [(offset, transcription) for (_, offset), transcription in zip(chunks, transcriptions)]
+            )
         
-        return transcription.text, metadata
+        metadata["preprocessing"] = preprocessing
+        return text, metadata
     except Exception as e:
         print(f"Transcription error: {e}")
         return None, {"error": str(e)}
 
+# ========== LLM HELPER ==========
+
+async def _call_llm_json(system_prompt: str, user_content: str) -> dict:
+    """Call the LLM in JSON mode; identical (prompt, content) pairs are served from the LLM result cache"""
+    async def compute():
+        async def api_call(client):
+            return await client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format={"type": "json_object"}
+            )
+        
+        response = await groq_api_call_with_retry(
+            api_call, estimated_tokens=estimate_tokens(system_prompt, user_content)
+        )
+        return json.loads(response.choices[0].message.content)
+    
+    return await cached_llm_call(system_prompt, user_content, compute, model=LLM_MODEL)
+
 # ========== LAYER 2: PRONUNCIATION & FLUENCY ==========
 
-def evaluate_pronunciation_fluency(transcript: str) -> Optional[dict]:
+def _fluency_metrics_block(fluency_metrics: Optional[dict]) -> str:
+    if not fluency_metrics:
+        return ""
+    return f"\n\nMeasured fluency metrics (from audio timestamps):\n{describe_fluency_metrics(fluency_metrics)}"
+
+def _apply_fluency_metrics(pron_fluency: Optional[dict], fluency_metrics: Optional[dict]) -> Optional[dict]:
+    """Measured fluency replaces the LLM's estimate, so the fluency score is deterministic"""
+    if pron_fluency and fluency_metrics:
+        pron_fluency["fluency_score"] = fluency_metrics["fluency_score"]
+        pron_fluency["fluency_metrics"] = fluency_metrics
+    return pron_fluency
+
+async def evaluate_pronunciation_fluency(transcript: str, fluency_metrics: Optional[dict] = None) -> Optional[dict]:
     """
     Layer 2: Evaluate Pronunciation & Fluency
     Specialized for Vietnamese learners
+    With fluency_metrics (measured from Whisper segments) the LLM only scores pronunciation
+    and comments on the numbers; fluency_score comes from the metrics.
     """
     if not groq_clients:
         return None
     
     try:
-        def api_call(client):
-            return client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": PRONUNCIATION_FLUENCY_PROMPT},
-                    {"role": "user", "content": f"Transcript to evaluate:\n\n{transcript}"}
-                ],
-                response_format={"type": "json_object"}
-            )
+        if not fluency_metrics:
+            return await _call_llm_json(PRONUNCIATION_FLUENCY_PROMPT, f"Transcript to evaluate:\n\n{transcript}")
         
-        response = groq_api_call_with_retry(api_call)
-        return json.loads(response.choices[0].message.content)
+        result = await _call_llm_json(
+            PRONUNCIATION_WITH_METRICS_PROMPT,
+            f"Transcript to evaluate:\n\n{transcript}{_fluency_metrics_block(fluency_metrics)}"
+        )
+        return _apply_fluency_metrics(result, fluency_metrics)
     except Exception as e:
         print(f"Pronunciation/Fluency evaluation error: {e}")
         return None
 
 # ========== LAYER 3: GRAMMAR & CONTENT ==========
 
-def evaluate_grammar_content(transcript: str, topic_context: str) -> Optional[dict]:
+async def evaluate_grammar_content(transcript: str, topic_context: str) -> Optional[dict]:
     """
     Layer 3: Evaluate Grammar, Content & Topic Matching
     """
@@ -258,25 +462,14 @@ CHỦ ĐỀ BÀI THI: "{topic_context}"
 Phản hồi bằng TIẾNG VIỆT. JSON format:
 {{"grammar_score":8.0,"grammar_feedback":"...","grammar_errors":[],"vocabulary_score":7.0,"vocabulary_feedback":"...","vocabulary_suggestions":[],"content_score":6.0,"content_feedback":"...","topic_matching_score":9.0,"is_off_topic":false,"matching_analysis":"...","off_topic_warning":"","improvement_suggestions":[]}}"""
 
-        def api_call(client):
-            return client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Câu trả lời của thí sinh:\n{transcript}"}
-                ],
-                response_format={"type": "json_object"}
-            )
-        
-        response = groq_api_call_with_retry(api_call)
-        return json.loads(response.choices[0].message.content)
+        return await _call_llm_json(system_prompt, f"Câu trả lời của thí sinh:\n{transcript}")
     except Exception as e:
         print(f"Grammar/Content evaluation error: {e}")
         return None
 
 # ========== LAYER 3b: TOPIC MATCHING (DEDICATED) ==========
 
-def evaluate_topic_matching(topic_context: str, transcript: str) -> Optional[dict]:
+async def evaluate_topic_matching(topic_context: str, transcript: str) -> Optional[dict]:
     """
     Layer 3b: Dedicated Topic Matching Evaluation
     Phân tích chi tiết xem câu trả lời có đúng chủ đề không
@@ -294,15 +487,7 @@ def evaluate_topic_matching(topic_context: str, transcript: str) -> Optional[dic
         return None
     
     if not transcript or not transcript.strip():
-        return {
-            "topic_matching_score": 0,
-            "is_off_topic": True,
-            "topic_analysis": f"Đề bài: {topic_context[:100]}...",
-            "response_analysis": "Không có câu trả lời",
-            "matching_explanation": "Thí sinh chưa trả lời câu hỏi",
-            "off_topic_warning": "⚠️ Vui lòng trả lời câu hỏi",
-            "suggestions": ["Hãy trả lời theo chủ đề được yêu cầu"]
-        }
+        return _no_answer_topic_matching(topic_context)
     
     try:
         user_message = f"""ĐỀ BÀI (TOPIC):
@@ -313,28 +498,75 @@ CÂU TRẢ LỜI CỦA THÍ SINH:
 
 Hãy phân tích xem câu trả lời có đúng chủ đề không."""
 
-        def api_call(client):
-            return client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": TOPIC_MATCHING_PROMPT},
-                    {"role": "user", "content": user_message}
-                ],
-                response_format={"type": "json_object"}
-            )
-        
-        response = groq_api_call_with_retry(api_call)
-        result = json.loads(response.choices[0].message.content)
+        result = await _call_llm_json(TOPIC_MATCHING_PROMPT, user_message)
+        return _ensure_topic_matching_fields(result)
+    except Exception as e:
+        print(f"Topic matching evaluation error: {e}")
+        return None
+
+def _no_answer_topic_matching(topic_context: str) -> dict:
+    return {
+        "topic_matching_score": 0,
+        "is_off_topic": True,
+        "topic_analysis": f"Đề bài: {topic_context[:100]}...",
+        "response_analysis": "Không có câu trả lời",
+        "matching_explanation": "Thí sinh chưa trả lời câu hỏi",
+        "off_topic_warning": "⚠️ Vui lòng trả lời câu hỏi",
+        "suggestions": ["Hãy trả lời theo chủ đề được yêu cầu"]
+    }
+
+def _ensure_topic_matching_fields(result: dict) -> dict:
+    """Ensure required fields exist"""
+    if "topic_matching_score" not in result:
+        result["topic_matching_score"] = 5.0
+    if "is_off_topic" not in result:
+        result["is_off_topic"] = result["topic_matching_score"] <= 4
+    return result
+
+# ========== COMPACT MODE: LAYERS 2 + 3 + 3b IN ONE CALL ==========
+
+async def evaluate_speaking_compact(transcript: str, topic_context: str, fluency_metrics: Optional[dict] = None) -> Optional[dict]:
+    """
+    Layers 2, 3 and 3b from a single structured-output call
+    Returns {"pronunciation_fluency", "grammar_content", "topic_matching"} with the same
+    fields the separate layers produce (consumed by calculate_overall_scores / generate_overall_feedback)
+    Measured fluency_metrics are given to the model as context and replace its fluency_score.
+    """
+    if not groq_clients:
+        return None
+    
+    try:
+        user_message = f"""ĐỀ BÀI (TOPIC):
+{topic_context}
+
+CÂU TRẢ LỜI CỦA THÍ SINH:
+{transcript}{_fluency_metrics_block(fluency_metrics)}"""
         
-        # Ensure required fields exist
-        if "topic_matching_score" not in result:
-            result["topic_matching_score"] = 5.0
-        if "is_off_topic" not in result:
-            result["is_off_topic"] = result["topic_matching_score"] <= 4
+        result = await _call_llm_json(COMPACT_SPEAKING_PROMPT, user_message)
+        sections = {
+            "pronunciation_fluency": result.get("pronunciation_fluency"),
+            "grammar_content": result.get("grammar_content"),
+            "topic_matching": result.get("topic_matching"),
+        }
+        sections = {name: value if isinstance(value, dict) else None for name, value in sections.items()}
+        if not transcript or not transcript.strip():
+            sections["topic_matching"] = _no_answer_topic_matching(topic_context)
+        elif sections["topic_matching"]:
+            _ensure_topic_matching_fields(sections["topic_matching"])
         
-        return result
+        # The separate layer 3 reports topic matching itself; generate_overall_feedback reads it from
+        # there, and calculate_overall_scores falls back to it when the topic section is unusable
+        if sections["grammar_content"]:
+            topic = sections["topic_matching"] or _ensure_topic_matching_fields({})
+            sections["grammar_content"].update({
+                "topic_matching_score": topic["topic_matching_score"],
+                "is_off_topic": topic["is_off_topic"],
+                "off_topic_warning": topic.get("off_topic_warning", "")
+            })
+        _apply_fluency_metrics(sections["pronunciation_fluency"], fluency_metrics)
+        return sections
     except Exception as e:
-        print(f"Topic matching evaluation error: {e}")
+        print(f"Compact speaking evaluation error: {e}")
         return None
 
 # ========== LAYER 4: OVERALL ASSESSMENT ==========
@@ -525,9 +757,61 @@ def generate_overall_feedback(pron_fluency: Optional[dict], grammar_content: Opt
     
     return feedback
 
+# ========== CONCURRENT LAYER EXECUTION ==========
+
+async def _run_layer(name: str, coro, timeout: float = SPEAKING_LAYER_TIMEOUT) -> Tuple[Optional[dict], Optional[str]]:
+    """Run one evaluation layer with its own timeout
+    Returns: (result, error) - a failed layer never cancels the others
+    On timeout the layer's LLM call is cancelled, unless another request is waiting on the same call.
+    """
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout)
+        if result is None:
+            return None, "Evaluation failed"
+        return result, None
+    except asyncio.TimeoutError:
+        print(f"⏱️ {name} evaluation timed out after {timeout}s")
+        return None, "Evaluation timed out"
+    except Exception as e:
+        print(f"{name} evaluation error: {e}")
+        return None, "Evaluation failed"
+
+def resolve_speaking_mode(mode: Optional[str] = None) -> str:
+    """Per-request mode, falling back to SPEAKING_EVAL_MODE (validated at import); raises ValueError for unknown modes"""
+    mode = (mode or SPEAKING_EVAL_MODE).lower()
+    if mode not in SPEAKING_EVAL_MODES:
+        raise ValueError(f"Unknown speaking evaluation mode '{mode}' (available: {', '.join(SPEAKING_EVAL_MODES)})")
+    return mode
+
+async def run_evaluation_layers(transcript: str, topic_context: str, mode: Optional[str] = None,
+                                fluency_metrics: Optional[dict] = None) -> Dict[str, Tuple[Optional[dict], Optional[str]]]:
+    """
+    Run Layer 2, Layer 3 and Layer 3b concurrently ("full"), or as one combined call ("compact")
+    None of them depends on another's output, so latency is the slowest call, not the sum
+    fluency_metrics (audio evaluations only) make the fluency score local and the layer 2 prompt shorter
+    """
+    if resolve_speaking_mode(mode) == "compact":
+        sections, error = await _run_layer("Compact", evaluate_speaking_compact(transcript, topic_context, fluency_metrics))
+        sections = sections or {}
+        return {
+            name: (sections.get(name), None) if sections.get(name) else (None, error or "Evaluation failed")
+            for name in ("pronunciation_fluency", "grammar_content", "topic_matching")
+        }
+    
+    pron_fluency, grammar_content, topic_matching = await asyncio.gather(
+        _run_layer("Pronunciation/Fluency", evaluate_pronunciation_fluency(transcript, fluency_metrics)),
+        _run_layer("Grammar/Content", evaluate_grammar_content(transcript, topic_context)),
+        _run_layer("Topic matching", evaluate_topic_matching(topic_context, transcript)),
+    )
+    return {
+        "pronunciation_fluency": pron_fluency,
+        "grammar_content": grammar_content,
+        "topic_matching": topic_matching,
+    }
+
 # ========== FULL EVALUATION FUNCTIONS ==========
 
-def evaluate_speaking_full(audio_data: bytes, topic_context: str, topic_id: str, filename: str = "audio.wav") -> dict:
+async def evaluate_speaking_full(audio: Union[bytes, AudioUpload], topic_context: str, topic_id: str, filename: str = "audio.wav", mode: Optional[str] = None) -> dict:
     """
     Full speaking evaluation with 4 layers:
     1. ASR (Speech Recognition)
@@ -543,39 +827,29 @@ def evaluate_speaking_full(audio_data: bytes, topic_context: str, topic_id: str,
     }
     
     # Layer 1: ASR
-    transcript, asr_metadata = transcribe_audio(audio_data, filename)
+    transcript, asr_metadata = await transcribe_audio(audio, filename)
     if not transcript:
         result["error"] = "Speech recognition failed"
         result["layers"]["asr"] = {"error": asr_metadata.get("error", "Unknown error")}
         return result
     
     result["transcript"] = transcript
+    fluency_metrics = compute_fluency_metrics(asr_metadata.get("segments"), asr_metadata.get("duration"), transcript)
     result["layers"]["asr"] = {
         "transcript": transcript,
         "duration": asr_metadata.get("duration"),
-        "language": asr_metadata.get("language", "en")
+        "language": asr_metadata.get("language", "en"),
+        "fluency_metrics": fluency_metrics
     }
     
-    # Layer 2: Pronunciation & Fluency
-    pron_fluency = evaluate_pronunciation_fluency(transcript)
-    if pron_fluency:
-        result["layers"]["pronunciation_fluency"] = pron_fluency
-    else:
-        result["layers"]["pronunciation_fluency"] = {"error": "Evaluation failed"}
+    # Layer 2 + Layer 3 + Layer 3b: run concurrently (or as one compact call), keep whatever succeeded
+    layers = await run_evaluation_layers(transcript, topic_context, mode, fluency_metrics)
+    for name, (layer_result, error) in layers.items():
+        result["layers"][name] = layer_result if layer_result else {"error": error}
     
-    # Layer 3: Grammar & Content
-    grammar_content = evaluate_grammar_content(transcript, topic_context)
-    if grammar_content:
-        result["layers"]["grammar_content"] = grammar_content
-    else:
-        result["layers"]["grammar_content"] = {"error": "Evaluation failed"}
-    
-    # Layer 3b: Dedicated Topic Matching
-    topic_matching = evaluate_topic_matching(topic_context, transcript)
-    if topic_matching:
-        result["layers"]["topic_matching"] = topic_matching
-    else:
-        result["layers"]["topic_matching"] = {"error": "Evaluation failed"}
+    pron_fluency = layers["pronunciation_fluency"][0]
+    grammar_content = layers["grammar_content"][0]
+    topic_matching = layers["topic_matching"][0]
     
     # Layer 4: Combined Assessment
     result["success"] = True
@@ -584,10 +858,10 @@ def evaluate_speaking_full(audio_data: bytes, topic_context: str, topic_id: str,
     
     return result
 
-def evaluate_speaking_from_transcript(topic_id: str, context: str, transcript: str) -> Optional[dict]:
+async def evaluate_speaking_from_transcript(topic_id: str, context: str, transcript: str, mode: Optional[str] = None) -> Optional[dict]:
     """
     Evaluate speaking from text transcript (no audio)
-    Uses Layer 2 + Layer 3 + Layer 3b
+    Uses Layer 2 + Layer 3 + Layer 3b (run concurrently)
     """
     result = {
         "topic_id": topic_id,
@@ -596,20 +870,15 @@ def evaluate_speaking_from_transcript(topic_id: str, context: str, transcript: s
         "layers": {}
     }
     
-    # Layer 2: Pronunciation & Fluency (estimated from transcript)
-    pron_fluency = evaluate_pronunciation_fluency(transcript)
-    if pron_fluency:
-        result["layers"]["pronunciation_fluency"] = pron_fluency
-    
-    # Layer 3: Grammar & Content
-    grammar_content = evaluate_grammar_content(transcript, context)
-    if grammar_content:
-        result["layers"]["grammar_content"] = grammar_content
+    # Layer 2 (estimated from transcript) + Layer 3 + Layer 3b, run concurrently (or compact)
+    layers = await run_evaluation_layers(transcript, context, mode)
+    for name, (layer_result, _) in layers.items():
+        if layer_result:
+            result["layers"][name] = layer_result
     
-    # Layer 3b: Dedicated Topic Matching
-    topic_matching = evaluate_topic_matching(context, transcript)
-    if topic_matching:
-        result["layers"]["topic_matching"] = topic_matching
+    pron_fluency = layers["pronunciation_fluency"][0]
+    grammar_content = layers["grammar_content"][0]
+    topic_matching = layers["topic_matching"][0]
     
     # Calculate scores
     result["success"] = True
@@ -618,9 +887,9 @@ def evaluate_speaking_from_transcript(topic_id: str, context: str, transcript: s
     
     return result
 
-def evaluate_speaking(topic_id: str, context: str, transcript: str) -> Optional[dict]:
+async def evaluate_speaking(topic_id: str, context: str, transcript: str, mode: Optional[str] = None) -> Optional[dict]:
     """Legacy function - redirects to new evaluation for backward compatibility"""
-    result = evaluate_speaking_from_transcript(topic_id, context, transcript)
+    result = await evaluate_speaking_from_transcript(topic_id, context, transcript, mode)
     if result and result.get("success"):
         # Convert to legacy format with full matching info
         scores = result.get("scores", {})
@@ -662,6 +931,6 @@ def evaluate_speaking(topic_id: str, context: str, transcript: str) -> Optional[
 # Export functions
 __all__ = [
     'transcribe_audio', 'evaluate_pronunciation_fluency', 'evaluate_grammar_content',
-    'evaluate_topic_matching', 'evaluate_speaking_full', 'evaluate_speaking_from_transcript', 
+    'evaluate_topic_matching', 'evaluate_speaking_compact', 'resolve_speaking_mode', 'run_evaluation_layers', 'evaluate_speaking_full', 'evaluate_speaking_from_transcript', 
     'evaluate_speaking', 'calculate_overall_scores', 'generate_overall_feedback'
 ]
\ No newline at end of file
@@ -5,10 +5,16 @@ Handles topic retrieval, generation, and pronunciation services
 
 import json
 import random
-from typing import Optional, Dict
+import asyncio
+from typing import Optional, Dict, List, Tuple
 
 # Import clients (these are initialized)
 from .clients import groq_api_call_with_retry, LLM_MODEL
+from .llm_cache import cached_llm_call
+from .word_index import search_prefix
+
+# Write-back tasks are referenced here until they finish
+_background_tasks: set = set()
 
 # Lazy import to avoid circular dependency and ensure data is loaded
 def _get_data():
@@ -39,39 +45,135 @@ Respond in JSON format:
     "prompt": "the full topic prompt"
 }"""
 
+# ========== TOPIC INDEXES ==========
+# Speaking questions 1-2: read a passage aloud (scored locally, see read_aloud.py)
+READ_ALOUD_QUESTIONS = ("1", "2")
+READ_ALOUD_INSTRUCTION = "Read a text aloud"
+class TopicIndexes:
+    """Prepared topic responses, built once per data load so requests do constant work"""
+    
+    def __init__(self, speaking_data: Dict = None, writing_data: Dict = None, custom_topics: List = None):
+        self.speaking: Dict[str, dict] = {}
+        for topic_id, data in (speaking_data or {}).items():
+            q = _find_question(data, "7")
+            if q is not None:
+                self.speaking[topic_id] = {
+                    "topic_id": topic_id,
+                    "test_name": data.get("testName", ""),
+                    "question_type": q.get("questionType", "Express Opinion"),
+                    "context": q.get("context", ""),
+                    "image_urls": q.get("imageUrls", [])
+                }
+        self.speaking_ids: List[str] = list(self.speaking)
+        
+        # Questions 1-2 (Read Aloud), keyed by (topic_id, question_number)
+        self.read_aloud: Dict[Tuple[str, str], dict] = {}
+        for topic_id, data in (speaking_data or {}).items():
+            for number in READ_ALOUD_QUESTIONS:
+                q = _find_question(data, number)
+                if q is not None and q.get("context"):
+                    self.read_aloud[(topic_id, number)] = {
+                        "topic_id": topic_id,
+                        "question_number": number,
+                        "test_name": data.get("testName", ""),
+                        "question_type": q.get("questionType", "Read Aloud"),
+                        "context": _read_aloud_passage(q["context"])
+                    }
+        # Candidate keys per filter: (topic_id, question_number) with None meaning "any"
+        self.read_aloud_keys: Dict[Tuple[Optional[str], Optional[str]], List[Tuple[str, str]]] = {}
+        for key in self.read_aloud:
+            topic_id, number = key
+            for filter_key in ((None, None), (topic_id, None), (None, number), key):
+                self.read_aloud_keys.setdefault(filter_key, []).append(key)
+        
+        self.writing: Dict[str, dict] = {}
+        for topic_id, data in (writing_data or {}).items():
+            q = _find_question(data, "8")
+            if q is not None:
+                self.writing[topic_id] = {
+                    "topic_id": topic_id,
+                    "topic_type": "exam",
+                    "test_name": data.get("testName", ""),
+                    "question_type": q.get("questionType", "Opinion Essay"),
+                    "context": q.get("context", "")
+                }
+        self.writing_ids: List[str] = list(self.writing)
+        
+        self.custom: List[dict] = []
+        self.custom_by_category: Dict[str, List[dict]] = {}
+        for i, topic in enumerate(custom_topics or []):
+            prepared = {
+                "topic_id": f"custom_{i}",
+                "topic_type": "custom",
+                "question_type": topic.get("type", ""),
+                "context": topic.get("prompt", ""),
+                "category": topic.get("category", ""),
+                "prompt_type": topic.get("type", "")
+            }
+            self.custom.append(prepared)
+            self.custom_by_category.setdefault(prepared["category"].lower(), []).append(prepared)
+
+def _read_aloud_passage(context: str) -> str:
+    """Reference passage without the scraped "Read a text aloud" instruction"""
+    if context.lower().startswith(READ_ALOUD_INSTRUCTION.lower()):
+        context = context[len(READ_ALOUD_INSTRUCTION):]
+    return context.strip()
+
+def _find_question(data: dict, number: str) -> Optional[dict]:
+    for q in data.get("questions", []):
+        if str(q.get("questionNumber")) == number:
+            return q
+    return None
+
+# Replaced as a whole on (re)load
+topic_indexes = TopicIndexes()
+
+def build_topic_indexes():
+    """Rebuild topic indexes from the loaded data (called by data_loader after each load)"""
+    global topic_indexes
+    speaking_data, writing_data, custom_topics, _ = _get_data()
+    topic_indexes = TopicIndexes(speaking_data, writing_data, custom_topics)
+    print(f"🗂️ Topic indexes built: {len(topic_indexes.speaking)} speaking, "
+          f"{len(topic_indexes.read_aloud)} read aloud, "
+          f"{len(topic_indexes.writing)} writing, {len(topic_indexes.custom)} custom")
+
 # ========== SPEAKING TOPICS ==========
 def get_speaking_topic(topic_id: Optional[str] = None) -> Optional[dict]:
     """Get a speaking topic (question 7 - Express Opinion)"""
-    speaking_data, _, _, _ = _get_data()
+    indexes = topic_indexes
     
-    if not speaking_data:
+    if not indexes.speaking_ids:
         print("❌ No speaking data loaded")
         return None
     
-    if topic_id and topic_id in speaking_data:
-        data = speaking_data[topic_id]
+    if topic_id and topic_id in indexes.speaking:
         print(f"📝 Retrieved specific speaking topic: {topic_id}")
-    else:
-        topic_id = random.choice(list(speaking_data.keys()))
-        data = speaking_data[topic_id]
-        print(f"🎲 Generated random speaking topic: {topic_id}")
+        return dict(indexes.speaking[topic_id])
     
-    # Find question 7 (Express Opinion)
-    for q in data.get("questions", []):
-        if str(q.get("questionNumber")) == "7":
-            return {
-                "topic_id": topic_id,
-                "test_name": data.get("testName", ""),
-                "question_type": q.get("questionType", "Express Opinion"),
-                "context": q.get("context", ""),
-                "image_urls": q.get("imageUrls", [])
-            }
+    speaking_data, _, _, _ = _get_data()
+    if topic_id and topic_id in speaking_data:
+        print(f"⚠️ No question 7 found in topic {topic_id}")
+        return None
     
-    print(f"⚠️ No question 7 found in topic {topic_id}")
-    return None
+    topic_id = random.choice(indexes.speaking_ids)
+    print(f"🎲 Generated random speaking topic: {topic_id}")
+    return dict(indexes.speaking[topic_id])
+
+def get_read_aloud_topic(topic_id: Optional[str] = None, question_number: Optional[str] = None) -> Optional[dict]:
+    """Get a Read Aloud passage (questions 1-2); random topic and/or question when not given"""
+    indexes = topic_indexes
+    
+    keys = indexes.read_aloud_keys.get((topic_id or None, str(question_number) if question_number else None))
+    if not keys:
+        print(f"❌ No Read Aloud passage found (topic={topic_id}, question={question_number})")
+        return None
+    
+    key = random.choice(keys)
+    print(f"📝 Retrieved Read Aloud passage: {key[0]} Q{key[1]}")
+    return dict(indexes.read_aloud[key])
 
 # ========== WRITING TOPICS ==========
-def get_writing_topic(topic_type: str, topic_id: Optional[str] = None, category: Optional[str] = None) -> Optional[dict]:
+async def get_writing_topic(topic_type: str, topic_id: Optional[str] = None, category: Optional[str] = None) -> Optional[dict]:
     """Get a writing topic based on type (exam/custom/generated)"""
     print(f"🔍 Getting writing topic: type={topic_type}, id={topic_id}, category={category}")
     
@@ -80,71 +182,55 @@ def get_writing_topic(topic_type: str, topic_id: Optional[str] = None, category:
     elif topic_type == "custom":
         return _get_custom_writing_topic(category)
     elif topic_type == "generated":
-        return generate_topic(category or "general")
+        return await generate_topic(category or "general")
     else:
         print(f"❌ Unknown topic type: {topic_type}")
         return None
 
 def _get_exam_writing_topic(topic_id: Optional[str] = None) -> Optional[dict]:
     """Get exam writing topic (question 8 - Opinion Essay)"""
-    _, writing_data, _, _ = _get_data()
+    indexes = topic_indexes
     
-    if not writing_data:
+    if not indexes.writing_ids:
         print("❌ No writing exam data loaded")
         return None
     
-    if topic_id and topic_id in writing_data:
-        data = writing_data[topic_id]
+    if topic_id and topic_id in indexes.writing:
         print(f"📝 Retrieved specific writing topic: {topic_id}")
-    else:
-        topic_id = random.choice(list(writing_data.keys()))
-        data = writing_data[topic_id]
-        print(f"🎲 Generated random writing topic: {topic_id}")
+        return dict(indexes.writing[topic_id])
     
-    # Find question 8 (Opinion Essay)
-    for q in data.get("questions", []):
-        if str(q.get("questionNumber")) == "8":
-            return {
-                "topic_id": topic_id,
-                "topic_type": "exam",
-                "test_name": data.get("testName", ""),
-                "question_type": q.get("questionType", "Opinion Essay"),
-                "context": q.get("context", "")
-            }
+    _, writing_data, _, _ = _get_data()
+    if topic_id and topic_id in writing_data:
+        print(f"⚠️ No question 8 found in topic {topic_id}")
+        return None
     
-    print(f"⚠️ No question 8 found in topic {topic_id}")
-    return None
+    topic_id = random.choice(indexes.writing_ids)
+    print(f"🎲 Generated random writing topic: {topic_id}")
+    return dict(indexes.writing[topic_id])
 
 def _get_custom_writing_topic(category: Optional[str] = None) -> Optional[dict]:
     """Get custom writing topic"""
-    _, _, custom_topics, _ = _get_data()
+    indexes = topic_indexes
     
-    if not custom_topics:
+    if not indexes.custom:
         print("❌ No custom topics loaded")
         return None
     
     if category:
-        filtered = [t for t in custom_topics if t.get("category", "").lower() == category.lower()]
+        filtered = indexes.custom_by_category.get(category.lower())
         if filtered:
             topic = random.choice(filtered)
             print(f"📝 Retrieved custom topic for category: {category}")
         else:
-            topic = random.choice(custom_topics)
+            topic = random.choice(indexes.custom)
             print(f"⚠️ No topics for category '{category}', using random")
     else:
-        topic = random.choice(custom_topics)
+        topic = random.choice(indexes.custom)
         print("🎲 Generated random custom topic")
     
-    return {
-        "topic_id": f"custom_{custom_topics.index(topic)}",
-        "topic_type": "custom",
-        "question_type": topic.get("type", ""),
-        "context": topic.get("prompt", ""),
-        "category": topic.get("category", ""),
-        "prompt_type": topic.get("type", "")
-    }
+    return dict(topic)
 
-def generate_topic(category: str) -> Optional[dict]:
+async def generate_topic(category: str) -> Optional[dict]:
     """Generate a new topic using AI"""
     groq_clients, _, _ = _get_clients()
     
@@ -153,8 +239,8 @@ def generate_topic(category: str) -> Optional[dict]:
         return None
     
     try:
-        def api_call(client):
-            return client.chat.completions.create(
+        async def api_call(client):
+            return await client.chat.completions.create(
                 model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": TOPIC_GEN_PROMPT},
@@ -164,7 +250,7 @@ def generate_topic(category: str) -> Optional[dict]:
             )
         
         print(f"🤖 Generating AI topic for category: {category}")
-        response = groq_api_call_with_retry(api_call)
+        response = await groq_api_call_with_retry(api_call)
         result = json.loads(response.choices[0].message.content)
         topic_id = f"gen_{random.randint(10000, 99999)}"
         
@@ -228,7 +314,7 @@ Lưu ý:
 - Nghĩa phải ngắn gọn, rõ ràng, bằng tiếng Việt"""
 
 
-def get_pronunciation(word: str, generate_if_not_found: bool = True) -> dict:
+async def get_pronunciation(word: str, generate_if_not_found: bool = True) -> dict:
     """Get pronunciation info for a word, optionally generate with LLM if not found"""
     _, _, _, get_pronunciation_data = _get_data()
     groq_clients, _, _ = _get_clients()
@@ -236,8 +322,8 @@ def get_pronunciation(word: str, generate_if_not_found: bool = True) -> dict:
     word_lower = word.lower().strip()
     print(f"🔊 Looking up pronunciation for: {word_lower}")
     
-    # Get pronunciation data (lazy loaded)
-    pron_data = get_pronunciation_data(word_lower)
+    # Get pronunciation data (lazy loaded, MinIO read runs off the event loop)
+    pron_data = await asyncio.to_thread(get_pronunciation_data, word_lower)
     
     if pron_data:
         print(f"✅ Found pronunciation for: {word_lower}")
@@ -250,51 +336,86 @@ def get_pronunciation(word: str, generate_if_not_found: bool = True) -> dict:
             "generated": False
         }
     
+    # Generated earlier (by this or another worker)
+    from .data_loader import (
+        get_generated_pronunciation, cache_generated_pronunciation, save_generated_pronunciation
+    )
+    generated = await asyncio.to_thread(get_generated_pronunciation, word_lower)
+    if generated:
+        print(f"✅ Found generated pronunciation for: {word_lower}")
+        return {
+            "word": word,
+            "ipa": generated.get("ipa"),
+            "audio_url": f"/pronunciation/{word_lower}/audio",
+            "found": True,
+            "meanings": generated.get("meanings", []),
+            "generated": True
+        }
+    
     # If not found and LLM is available, generate pronunciation
     if generate_if_not_found and groq_clients:
         print(f"🤖 Generating pronunciation for: {word_lower}")
         try:
-            def api_call(client):
-                return client.chat.completions.create(
+            user_content = f"Từ: {word_lower}"
+            
+            async def api_call(client):
+                return await client.chat.completions.create(
                     model=LLM_MODEL,
                     messages=[
                         {"role": "system", "content": GENERATE_IPA_PROMPT},
-                        {"role": "user", "content": f"Từ: {word}"}
+                        {"role": "user", "content": user_content}
                     ],
                     response_format={"type": "json_object"},
                     temperature=0.3  # Lower temperature for more consistent IPA
                 )
             
-            response = groq_api_call_with_retry(api_call)
-            result = json.loads(response.choices[0].message.content)
-            
-            # Validate and ensure required fields
-            ipa = result.get("ipa", "").strip()
-            meanings = result.get("meanings", [])
-            
-            # Ensure meanings is a valid list with at least one entry
-            if not meanings or not isinstance(meanings, list) or len(meanings) == 0:
-                meanings = [{"type": "unknown", "meaning": "từ tiếng Anh"}]
-            
-            # Ensure each meaning has required fields
-            validated_meanings = []
-            for m in meanings:
-                if isinstance(m, dict) and "type" in m and "meaning" in m:
-                    validated_meanings.append({
-                        "type": m["type"],
-                        "meaning": m["meaning"]
-                    })
+            async def compute():
+                response = await groq_api_call_with_retry(api_call)
+                result = json.loads(response.choices[0].message.content)
+                
+                # Validate and ensure required fields
+                ipa = result.get("ipa", "").strip()
+                meanings = result.get("meanings", [])
+                
+                # Ensure meanings is a valid list with at least one entry
+                if not meanings or not isinstance(meanings, list) or len(meanings) == 0:
+                    meanings = [{"type": "unknown", "meaning": "từ tiếng Anh"}]
+                
+                # Ensure each meaning has required fields
+                validated_meanings = []
+                for m in meanings:
+                    if isinstance(m, dict) and "type" in m and "meaning" in m:
+                        validated_meanings.append({
+                            "type": m["type"],
+                            "meaning": m["meaning"]
+                        })
+                
+                if not validated_meanings:
+                    validated_meanings = [{"type": "unknown", "meaning": "từ tiếng Anh"}]
+                
+                print(f"✅ Generated pronunciation for: {word_lower} (meanings: {len(validated_meanings)})")
+                
+                # Cache now, persist to MinIO without delaying the response
+                # (inside compute, so coalesced callers write it once)
+                entry = cache_generated_pronunciation(
+                    word_lower, {"ipa": ipa if ipa else None, "meanings": validated_meanings}
+                )
+                task = asyncio.create_task(asyncio.to_thread(save_generated_pronunciation, word_lower, entry))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+                return {"ipa": ipa if ipa else None, "meanings": validated_meanings}
             
-            if not validated_meanings:
-                validated_meanings = [{"type": "unknown", "meaning": "từ tiếng Anh"}]
+            # Students looking up the same missing word at once share one LLM call
+            result = await cached_llm_call(
+                GENERATE_IPA_PROMPT, user_content, compute, model=LLM_MODEL, temperature=0.3
+            )
             
-            print(f"✅ Generated pronunciation for: {word_lower} (meanings: {len(validated_meanings)})")
             return {
                 "word": word,
-                "ipa": ipa if ipa else None,
+                "ipa": result["ipa"],
                 "audio_url": f"/pronunciation/{word_lower}/audio",
                 "found": True,
-                "meanings": validated_meanings,
+                "meanings": result["meanings"],
                 "generated": True
             }
         except Exception as e:
@@ -311,7 +432,7 @@ def get_pronunciation(word: str, generate_if_not_found: bool = True) -> dict:
     }
 
 
-def get_pronunciation_tips(word: str, ipa: str = None) -> dict:
+async def get_pronunciation_tips(word: str, ipa: str = None) -> dict:
     """Generate pronunciation tips for a specific word using LLM"""
     groq_clients, _, _ = _get_clients()
     
@@ -329,21 +450,28 @@ def get_pronunciation_tips(word: str, ipa: str = None) -> dict:
     
     try:
         ipa_info = f" (IPA: {ipa})" if ipa else ""
+        user_content = f"Từ: {word}{ipa_info}"
         
-        def api_call(client):
-            return client.chat.completions.create(
+        async def api_call(client):
+            return await client.chat.completions.create(
                 model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": PRONUNCIATION_TIPS_PROMPT},
-                    {"role": "user", "content": f"Từ: {word}{ipa_info}"}
+                    {"role": "user", "content": user_content}
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.7
             )
         
-        print(f"🤖 Generating tips for: {word}")
-        response = groq_api_call_with_retry(api_call)
-        result = json.loads(response.choices[0].message.content)
+        async def compute():
+            print(f"🤖 Generating tips for: {word}")
+            response = await groq_api_call_with_retry(api_call)
+            return json.loads(response.choices[0].message.content)
+        
+        # Concurrent requests for the same word share one in-flight call
+        result = await cached_llm_call(
+            PRONUNCIATION_TIPS_PROMPT, user_content, compute, model=LLM_MODEL, temperature=0.7
+        )
         
         # Validate and ensure all required fields are present
         tips = result.get("tips", "").strip()
@@ -377,12 +505,12 @@ def get_pronunciation_tips(word: str, ipa: str = None) -> dict:
 def get_related_words(word: str) -> dict:
     """Get related word forms from dictionary using prefix search"""
     _, _, _, get_pronunciation_data = _get_data()
-    _, minio_client, MINIO_BUCKET = _get_clients()
+    from .word_index import related_candidates
     
     word_lower = word.lower().strip()
     related = []
     
-    if not minio_client or len(word_lower) < 2:
+    if len(word_lower) < 2:
         return {"word": word, "related_words": [], "synonyms": [], "antonyms": []}
     
     # Get the word stem (first 3-5 characters depending on word length)
@@ -390,41 +518,16 @@ def get_related_words(word: str) -> dict:
     stem = word_lower[:stem_length]
     
     try:
-        # Find all words starting with the stem
-        objects = minio_client.list_objects(
-            MINIO_BUCKET, 
-            prefix=f"pronunciation/{stem}",
-            recursive=False
-        )
-        
-        for obj in objects:
-            if len(related) >= 8:
-                break
-                
-            filename = obj.object_name.split("/")[-1]
-            if filename.endswith(".json"):
-                related_word = filename[:-5]
-                
-                # Skip the original word itself
-                if related_word == word_lower:
-                    continue
-                
-                # Only include words that share more similarity
-                # (start with same prefix or are clearly related)
-                if len(related_word) >= len(stem):
-                    try:
-                        response = minio_client.get_object(MINIO_BUCKET, obj.object_name)
-                        data = json.loads(response.read().decode('utf-8'))
-                        response.close()
-                        response.release_conn()
-                        
-                        related.append({
-                            "word": related_word,
-                            "ipa": data.get("ipa"),
-                            "meanings": data.get("meanings", [])[:2]  # Limit meanings
-                        })
-                    except:
-                        pass
+        # Words starting with the stem, in dictionary order (skipping the word itself)
+        for related_word in related_candidates(stem, exclude=word_lower, limit=8):
+            data = get_pronunciation_data(related_word)
+            if not data:
+                continue
+            related.append({
+                "word": related_word,
+                "ipa": data.get("ipa"),
+                "meanings": data.get("meanings", [])[:2]  # Limit meanings
+            })
         
         print(f"📚 Found {len(related)} related words for: {word}")
         
@@ -440,65 +543,23 @@ def get_related_words(word: str) -> dict:
 
 
 def search_words(query: str, limit: int = 10) -> list:
-    """Search for words starting with query (autocomplete)"""
-    _, minio_client, MINIO_BUCKET = _get_clients()
-    
-    if not minio_client or not query:
+    """Search for words starting with query (autocomplete from the in-process prefix index)"""
+    if not query:
         return []
     
-    query_lower = query.lower().strip()
-    suggestions = []
-    
-    try:
-        # List objects with prefix matching the query
-        objects = minio_client.list_objects(
-            MINIO_BUCKET, 
-            prefix=f"pronunciation/{query_lower}",
-            recursive=False
-        )
-        
-        for obj in objects:
-            if len(suggestions) >= limit:
-                break
-            
-            # Extract word from path (pronunciation/word.json -> word)
-            filename = obj.object_name.split("/")[-1]
-            if filename.endswith(".json"):
-                word = filename[:-5]  # Remove .json
-                
-                # Get IPA for this word (quick lookup)
-                try:
-                    response = minio_client.get_object(MINIO_BUCKET, obj.object_name)
-                    data = json.loads(response.read().decode('utf-8'))
-                    response.close()
-                    response.release_conn()
-                    
-                    suggestions.append({
-                        "word": word,
-                        "ipa": data.get("ipa")
-                    })
-                except:
-                    suggestions.append({
-                        "word": word,
-                        "ipa": None
-                    })
-        
-        print(f"🔍 Found {len(suggestions)} suggestions for: {query}")
-        return suggestions
-        
-    except Exception as e:
-        print(f"❌ Search error: {e}")
-        return []
+    suggestions = search_prefix(query, limit)
+    print(f"🔍 Found {len(suggestions)} suggestions for: {query}")
+    return suggestions
 
-def generate_pronunciation_audio(word: str) -> Optional[bytes]:
-    """Generate pronunciation audio using Text-to-Speech"""
+def generate_pronunciation_audio(word: str, tld: str = "com", slow: bool = True) -> Optional[bytes]:
+    """Generate pronunciation audio using Text-to-Speech (blocking network call, see tts_cache)"""
     try:
         from gtts import gTTS
         import io
         
         print(f"🎵 Generating audio for: {word}")
-        # Create TTS with slow speech for pronunciation
-        tts = gTTS(text=word, lang='en', slow=True)
+        # Slow speech by default for pronunciation; tld selects the accent
+        tts = gTTS(text=word, lang='en', tld=tld, slow=slow)
         audio_buffer = io.BytesIO()
         tts.write_to_fp(audio_buffer)
         audio_buffer.seek(0)
@@ -531,7 +592,7 @@ def get_all_topics() -> dict:
 
 # Export functions
 __all__ = [
-    'get_speaking_topic', 'get_writing_topic', 'generate_topic',
+    'TopicIndexes', 'build_topic_indexes', 'get_speaking_topic', 'get_read_aloud_topic', 'get_writing_topic', 'generate_topic',
     'get_all_topics', 'get_pronunciation', 'generate_pronunciation_audio',
     'get_pronunciation_tips', 'get_related_words', 'search_words'
 ]
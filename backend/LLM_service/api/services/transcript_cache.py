@@ -0,0 +1,172 @@
+"""
+Transcript Cache
+Whisper results keyed by SHA-256 of the audio bytes (computed while the upload is read) plus the model name:
+- In-memory LRU bounded by total (JSON) size
+- Optional MinIO tier (transcripts/) shared by all workers and restarts
+- Concurrent requests for the same recording share one Whisper call
+Only successful transcriptions are cached; errors are always retried.
+"""
+
+import io
+import os
+import copy
+import json
+import asyncio
+from collections import OrderedDict
+from urllib.parse import quote
+from typing import Optional, Dict, Tuple, Callable, Awaitable
+
+from .llm_cache import SingleFlight
+
+TRANSCRIPT_PREFIX = "transcripts/"
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+TRANSCRIPT_CACHE_STORAGE = os.getenv("TRANSCRIPT_CACHE_STORAGE", "true").lower() == "true"
+
+Transcription = Tuple[Optional[str], Optional[dict]]
+
+
+def _get_clients():
+    from .clients import minio_client, MINIO_BUCKET
+    return minio_client, MINIO_BUCKET
+
+
+def make_transcript_key(audio_sha256: str, model: str) -> str:
+    return f"{model}/{audio_sha256}"
+
+
+def _object_name(key: str) -> str:
+    model, digest = key.rsplit("/", 1)
+    return f"{TRANSCRIPT_PREFIX}{quote(model, safe='')}/{digest}.json"
+
+
+class TranscriptCache:
+    """LRU of {"text", "metadata"} by audio hash, evicting by total serialized size"""
+
+    def __init__(self, max_bytes: int = TRANSCRIPT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self.flight = SingleFlight()
+        self.memory_hits = 0
+        self.storage_hits = 0
+        self.transcribed = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        # Callers add fields to the metadata they get back
+        return copy.deepcopy(entry[0])
+
+    def set(self, key: str, value: Dict, size: int):
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "memory_hits": self.memory_hits,
+            "storage_hits": self.storage_hits,
+            "transcribed": self.transcribed,
+            "evictions": self.evictions,
+            "coalesced": self.flight.coalesced,
+            "storage": TRANSCRIPT_CACHE_STORAGE
+        }
+
+
+transcript_cache = TranscriptCache()
+
+
+def _load_from_storage(key: str) -> Optional[bytes]:
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return None
+    try:
+        response = minio_client.get_object(MINIO_BUCKET, _object_name(key))
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    except Exception:
+        return None  # Not stored yet
+
+
+def _save_to_storage(key: str, payload: bytes):
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return
+    try:
+        minio_client.put_object(
+            MINIO_BUCKET,
+            _object_name(key),
+            io.BytesIO(payload),
+            len(payload),
+            content_type='application/json'
+        )
+    except Exception as e:
+        print(f"⚠️ Failed to store transcript {key}: {e}")
+
+
+async def cached_transcription(
+    audio_sha256: str,
+    model: str,
+    compute: Callable[[], Awaitable[Transcription]]
+) -> Transcription:
+    """(transcript, metadata) for the recording with this hash, running compute() only on a miss in every tier"""
+    key = make_transcript_key(audio_sha256, model)
+    entry = transcript_cache.get(key)
+    if entry is not None:
+        transcript_cache.memory_hits += 1
+        return entry["text"], entry["metadata"]
+
+    async def load():
+        if TRANSCRIPT_CACHE_STORAGE:
+            payload = await asyncio.to_thread(_load_from_storage, key)
+            if payload:
+                try:
+                    entry = json.loads(payload.decode("utf-8"))
+                    transcript_cache.storage_hits += 1
+                    transcript_cache.set(key, entry, len(payload))
+                    return entry
+                except ValueError:
+                    pass  # Corrupt object, transcribe again
+
+        text, metadata = await compute()
+        entry = {"text": text, "metadata": metadata}
+        if text is None:
+            return entry  # Failed transcriptions are not cached
+
+        transcript_cache.transcribed += 1
+        payload = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        transcript_cache.set(key, entry, len(payload))
+        if TRANSCRIPT_CACHE_STORAGE:
+            await asyncio.to_thread(_save_to_storage, key, payload)
+        return entry
+
+    entry = await transcript_cache.flight.run(key, load)  # Copied per caller
+    return entry["text"], entry["metadata"]
+
+
+def get_transcript_cache_stats() -> Dict:
+    return transcript_cache.stats()
+
+
+__all__ = [
+    'TranscriptCache', 'transcript_cache', 'make_transcript_key',
+    'cached_transcription', 'get_transcript_cache_stats'
+]
@@ -0,0 +1,174 @@
+"""
+TTS Audio Cache
+Pronunciation audio store keyed by (word, voice, speed):
+- In-memory LRU bounded by total bytes
+- MinIO tier (pronunciation-audio/) shared by all workers and restarts
+- gTTS is only called on a miss in both tiers, off the event loop
+- Concurrent misses for the same key share one load (SingleFlight)
+"""
+
+import io
+import os
+import asyncio
+import hashlib
+from collections import OrderedDict
+from urllib.parse import quote
+from typing import Optional, Dict, Tuple
+
+from .llm_cache import SingleFlight
+
+TTS_AUDIO_PREFIX = "pronunciation-audio/"
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Voice name -> gTTS top-level domain (accent)
+TTS_VOICES = {"us": "com", "uk": "co.uk", "au": "com.au", "in": "co.in"}
+TTS_SPEEDS = {"slow": True, "normal": False}
+DEFAULT_VOICE = "us"
+DEFAULT_SPEED = "slow"
+
+
+def _get_clients():
+    from .clients import minio_client, MINIO_BUCKET
+    return minio_client, MINIO_BUCKET
+
+
+def make_etag(audio: bytes) -> str:
+    """Strong ETag from the audio content"""
+    return '"' + hashlib.sha256(audio).hexdigest()[:32] + '"'
+
+
+def _object_name(word: str, voice: str, speed: str) -> str:
+    return f"{TTS_AUDIO_PREFIX}{voice}/{speed}/{quote(word, safe='')}.mp3"
+
+
+class TTSAudioCache:
+    """LRU of (audio, etag) by (word, voice, speed), evicting by total size"""
+
+    def __init__(self, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[bytes, str]]" = OrderedDict()
+        self.flight = SingleFlight()
+        self.memory_hits = 0
+        self.storage_hits = 0
+        self.synthesized = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Tuple[str, str, str], audio: bytes) -> Tuple[bytes, str]:
+        entry = (audio, make_etag(audio))
+        if len(audio) > self.max_bytes:
+            return entry
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous[0])
+        self._entries[key] = entry
+        self.size += len(audio)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+        return entry
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "memory_hits": self.memory_hits,
+            "storage_hits": self.storage_hits,
+            "synthesized": self.synthesized,
+            "evictions": self.evictions,
+            "coalesced": self.flight.coalesced
+        }
+
+
+tts_cache = TTSAudioCache()
+
+
+def _load_from_storage(word: str, voice: str, speed: str) -> Optional[bytes]:
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return None
+    try:
+        response = minio_client.get_object(MINIO_BUCKET, _object_name(word, voice, speed))
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    except Exception:
+        return None  # Not stored yet
+
+
+def _save_to_storage(word: str, voice: str, speed: str, audio: bytes):
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return
+    try:
+        minio_client.put_object(
+            MINIO_BUCKET,
+            _object_name(word, voice, speed),
+            io.BytesIO(audio),
+            len(audio),
+            content_type='audio/mpeg'
+        )
+    except Exception as e:
+        print(f"⚠️ Failed to store audio for '{word}': {e}")
+
+
+def _load_or_synthesize(word: str, voice: str, speed: str) -> Optional[bytes]:
+    """Blocking part of a cache miss: MinIO, then gTTS (written back to MinIO)"""
+    audio = _load_from_storage(word, voice, speed)
+    if audio:
+        tts_cache.storage_hits += 1
+        return audio
+
+    from .topics import generate_pronunciation_audio
+    audio = generate_pronunciation_audio(word, tld=TTS_VOICES[voice], slow=TTS_SPEEDS[speed])
+    if audio:
+        tts_cache.synthesized += 1
+        _save_to_storage(word, voice, speed, audio)
+    return audio
+
+
+async def get_pronunciation_audio_cached(
+    word: str,
+    voice: str = DEFAULT_VOICE,
+    speed: str = DEFAULT_SPEED
+) -> Optional[Tuple[bytes, str]]:
+    """(audio, etag) for a word; raises ValueError for an unknown voice or speed"""
+    if voice not in TTS_VOICES:
+        raise ValueError(f"Unknown voice '{voice}' (available: {', '.join(TTS_VOICES)})")
+    if speed not in TTS_SPEEDS:
+        raise ValueError(f"Unknown speed '{speed}' (available: {', '.join(TTS_SPEEDS)})")
+
+    key = (word.lower().strip(), voice, speed)
+    entry = tts_cache.get(key)
+    if entry is not None:
+        tts_cache.memory_hits += 1
+        return entry
+
+    async def load():
+        audio = await asyncio.to_thread(_load_or_synthesize, *key)
+        if not audio:
+            return None
+        return tts_cache.set(key, audio)
+
+    return await tts_cache.flight.run(key, load)
+
+
+def get_tts_cache_stats() -> Dict:
+    return tts_cache.stats()
+
+
+__all__ = [
+    'TTS_VOICES', 'TTS_SPEEDS', 'DEFAULT_VOICE', 'DEFAULT_SPEED', 'TTSAudioCache', 'tts_cache',
+    'make_etag', 'get_pronunciation_audio_cached', 'get_tts_cache_stats'
+]
@@ -0,0 +1,193 @@
+"""
+Word Prefix Index
+In-process word -> IPA index for pronunciation autocomplete:
+- Sorted word array, prefix range found with binary search
+- Suggestions ranked by (exact match, length, alphabetical), not S3 listing order
+- Top suggestions precomputed for short prefixes (the widest ranges)
+- Built once from the packed dictionary (or the index object) and reloaded when it changes
+"""
+
+import json
+import heapq
+from bisect import bisect_left
+from typing import Optional, List, Dict, Iterable, Tuple
+
+# Published by scripts/ingest_dictionary.py
+WORD_INDEX_OBJECT = "pronunciation-index/words.json"
+
+# Prefixes up to this length get their top suggestions precomputed
+PRECOMPUTED_PREFIX_LENGTH = 3
+MAX_SUGGESTIONS = 20
+
+
+def _get_clients():
+    from .clients import minio_client, MINIO_BUCKET
+    return minio_client, MINIO_BUCKET
+
+
+def _rank(word: str) -> Tuple[int, str]:
+    return (len(word), word)
+
+
+class WordPrefixIndex:
+    """Immutable sorted word array with precomputed top-k for short prefixes"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Optional[str]]] = (), version: Optional[str] = None):
+        pairs = sorted({word: ipa for word, ipa in entries if word}.items())
+        self.words: List[str] = [word for word, _ in pairs]
+        self.ipas: List[Optional[str]] = [ipa for _, ipa in pairs]
+        self.version = version
+
+        buckets: Dict[str, List[int]] = {}
+        for i, word in enumerate(self.words):
+            for length in range(1, min(len(word), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                buckets.setdefault(word[:length], []).append(i)
+        self._top: Dict[str, List[int]] = {
+            prefix: heapq.nsmallest(MAX_SUGGESTIONS, ids, key=lambda i: _rank(self.words[i]))
+            for prefix, ids in buckets.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) positions of words starting with prefix"""
+        lo = bisect_left(self.words, prefix)
+        hi = bisect_left(self.words, prefix + "\uffff", lo)
+        return lo, hi
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Top-k words starting with prefix, shortest first"""
+        if not prefix or limit <= 0:
+            return []
+
+        if prefix in self._top:
+            ids = self._top[prefix][:limit]
+        elif len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            ids = []  # Every existing short prefix is precomputed
+        else:
+            lo, hi = self.prefix_range(prefix)
+            ids = heapq.nsmallest(limit, range(lo, hi), key=lambda i: _rank(self.words[i]))
+
+        return [{"word": self.words[i], "ipa": self.ipas[i]} for i in ids]
+
+    def get_ipa(self, word: str) -> Optional[str]:
+        i = bisect_left(self.words, word)
+        if i < len(self.words) and self.words[i] == word:
+            return self.ipas[i]
+        return None
+
+
+# Replaced atomically on (re)load, readers never see a half-built index
+word_index = WordPrefixIndex()
+
+
+def _load_entries_from_minio() -> Tuple[Optional[List], Optional[str]]:
+    """Read the published [word, ipa] list; returns (entries, etag)"""
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return None, None
+
+    try:
+        stat = minio_client.stat_object(MINIO_BUCKET, WORD_INDEX_OBJECT)
+        response = minio_client.get_object(MINIO_BUCKET, WORD_INDEX_OBJECT)
+        try:
+            payload = json.loads(response.read().decode('utf-8'))
+        finally:
+            response.close()
+            response.release_conn()
+        return payload.get("words", []), stat.etag
+    except Exception as e:
+        print(f"⚠️ Word index object not available ({WORD_INDEX_OBJECT}): {e}")
+        return None, None
+
+
+def _list_entries_from_minio() -> List:
+    """Fallback: word names from the per-word objects (without IPA)"""
+    minio_client, MINIO_BUCKET = _get_clients()
+    entries = []
+    for obj in minio_client.list_objects(MINIO_BUCKET, prefix="pronunciation/", recursive=True):
+        filename = obj.object_name.split("/")[-1]
+        if filename.endswith(".json"):
+            entries.append((filename[:-5], None))
+    return entries
+
+
+def load_word_index() -> bool:
+    """Build the prefix index once from the dictionary"""
+    global word_index
+
+    minio_client, _ = _get_clients()
+    if not minio_client:
+        print("MinIO client not initialized")
+        return False
+
+    try:
+        from .packed_dictionary import get_packed_dictionary
+        packed = get_packed_dictionary()
+        if packed is not None:
+            entries, version = list(packed.iter_word_ipas()), packed.version
+        else:
+            entries, version = _load_entries_from_minio()
+        if entries is None:
+            print("📖 Building word index from pronunciation/ listing...")
+            entries, version = _list_entries_from_minio(), None
+
+        word_index = WordPrefixIndex(entries, version=version)
+        print(f"✅ Word index ready: {len(word_index)} words")
+        return True
+    except Exception as e:
+        print(f"❌ Word index loading error: {e}")
+        return False
+
+
+def refresh_word_index(force: bool = False) -> bool:
+    """Reload the index if the published dictionary index changed (or when forced)"""
+    minio_client, MINIO_BUCKET = _get_clients()
+    if not minio_client:
+        return False
+
+    from .packed_dictionary import get_packed_version, load_packed_dictionary
+    packed_version = get_packed_version()
+    if packed_version:
+        if not force and packed_version == word_index.version:
+            return False
+        print("🔄 Reloading packed dictionary...")
+        load_packed_dictionary(force=force)
+    elif not force:
+        try:
+            stat = minio_client.stat_object(MINIO_BUCKET, WORD_INDEX_OBJECT)
+        except Exception:
+            return False  # Nothing published yet, keep the current index
+        if stat.etag == word_index.version:
+            return False
+
+    print("🔄 Reloading word index...")
+    return load_word_index()
+
+
+def related_candidates(stem: str, exclude: Optional[str] = None, limit: int = 8) -> List[str]:
+    """First words (alphabetically) starting with stem"""
+    lo, hi = word_index.prefix_range(stem)
+    candidates = []
+    for i in range(lo, hi):
+        if len(candidates) >= limit:
+            break
+        if word_index.words[i] != exclude:
+            candidates.append(word_index.words[i])
+    return candidates
+
+
+def search_prefix(query: str, limit: int = 10) -> List[Dict]:
+    """Autocomplete suggestions from the in-process index"""
+    return word_index.search(query.lower().strip(), min(limit, MAX_SUGGESTIONS))
+
+
+def get_word_index_stats() -> Dict:
+    return {"words": len(word_index), "version": word_index.version}
+
+
+__all__ = [
+    'WordPrefixIndex', 'word_index', 'load_word_index', 'refresh_word_index',
+    'related_candidates', 'search_prefix', 'get_word_index_stats'
+]
@@ -1,33 +1,73 @@
 """
 Writing Evaluation Module
-Implements multi-step writing evaluation system:
+Implements multi-step writing evaluation system (independent steps run concurrently):
 1. Scoring - Evaluate scores for each criteria
 2. Error Analysis - Find and analyze all errors
 3. Strengths Analysis - Identify good points (for good essays)
 4. Suggestions - Generate improvement suggestions
 5. Improved Version - Rewrite with fixes
+
+Single-pass mode asks for steps 1-4 in one call (the improved version stays a
+separate, optional call), sending the essay twice instead of five times.
+"auto" (default) switches to it while the Groq key pool is under pressure.
+
+evaluate_writing_stream() emits each step's output as soon as it finishes,
+with the improved version streamed token by token.
 """
 
+import os
 import json
-from typing import Optional, List, Dict
+import time
+import asyncio
+from typing import Optional, List, Dict, Callable, AsyncIterator
 
 # Import at function level to avoid issues
 def _get_clients():
     from .clients import groq_clients, groq_api_call_with_retry, LLM_MODEL
     return groq_clients, groq_api_call_with_retry, LLM_MODEL
 
-# ========== STEP 1: SCORING PROMPT ==========
-SCORING_PROMPT = """You are an expert English writing evaluator for TOEIC Writing and IELTS exams.
-Task: Score the essay based on 4 criteria.
+def _get_pressure():
+    from .clients import get_groq_pressure
+    return get_groq_pressure()
+
+from .key_pool import estimate_tokens, get_usage_tokens
+from .llm_cache import cached_llm_call
+
+# Essays evaluated at once across all batch requests (each runs up to 5 LLM steps, ~5500 tokens).
+# A 6000 TPM key fits about one full essay per minute, so by default 2 essays per key run at once:
+# enough to keep every key busy while queued calls stay well within GROQ_QUEUE_TIMEOUT.
+# WRITING_BATCH_CONCURRENCY (if set) overrides the per-key default.
+WRITING_BATCH_CONCURRENCY = int(os.getenv("WRITING_BATCH_CONCURRENCY", "0"))
+WRITING_BATCH_ESSAYS_PER_KEY = int(os.getenv("WRITING_BATCH_ESSAYS_PER_KEY", "2"))
+WRITING_BATCH_MAX_ESSAYS = int(os.getenv("WRITING_BATCH_MAX_ESSAYS", "50"))
+_batch_semaphore: Optional[asyncio.Semaphore] = None
+
+# "full" = 5 step calls, "single_pass" = 1 combined call (+ improved version), "auto" = pick by key pool load
+WRITING_EVAL_MODES = ("full", "single_pass", "auto")
+WRITING_EVAL_MODE = os.getenv("WRITING_EVAL_MODE", "auto").lower()
+if WRITING_EVAL_MODE not in WRITING_EVAL_MODES:
+    print(f"⚠️ Unknown WRITING_EVAL_MODE '{WRITING_EVAL_MODE}', using 'auto'")
+    WRITING_EVAL_MODE = "auto"
+# Key pool load (0-1) at which "auto" switches to single pass
+WRITING_SINGLE_PASS_PRESSURE = float(os.getenv("WRITING_SINGLE_PASS_PRESSURE", "0.7"))
+
+SINGLE_PASS_STEP = "evaluation"
 
-Evaluate each criterion (score 0-10):
+# ========== STEP 1: SCORING PROMPT ==========
+# Shared by the full pipeline and single pass, so both modes score on the same scale
+SCORING_RUBRIC = """Evaluate each criterion (score 0-10):
 1. Task Achievement: How well does the essay address the topic requirements?
 2. Coherence & Cohesion: How well organized is the essay with appropriate linking?
 3. Lexical Resource: How diverse and appropriate is the vocabulary?
 4. Grammar Accuracy: How correctly is grammar used?
 
 Calculate overall_score as the average of the 4 scores.
-Determine level based on overall_score: weak (<5), average (5-7), good (>7).
+Determine level based on overall_score: weak (<5), average (5-7), good (>7)."""
+
+SCORING_PROMPT = """You are an expert English writing evaluator for TOEIC Writing and IELTS exams.
+Task: Score the essay based on 4 criteria.
+
+""" + SCORING_RUBRIC + """
 
 Return JSON format (all scores must be numbers, not expressions):
 {
@@ -166,6 +206,48 @@ Return JSON format (exactly 2-3 suggestions):
     "suggestions": ["Chú ý chia động từ đúng với chủ ngữ (he/she → verb + s)", "Sử dụng thêm từ nối để liên kết ý (however, therefore, moreover)", "Mở rộng ý tưởng bằng cách đưa thêm ví dụ cụ thể"]
 }"""
 
+# ========== SINGLE PASS PROMPT (STEPS 1-4 IN ONE CALL) ==========
+SINGLE_PASS_PROMPT = """You are an expert English writing evaluator for TOEIC Writing and IELTS exams, helping Vietnamese learners.
+Task: Evaluate the essay in ONE pass - scores, errors, strengths, feedback and suggestions.
+
+SCORING:
+""" + SCORING_RUBRIC + """
+
+ERRORS (0-5, only the MOST IMPORTANT):
+- ONLY flag OBVIOUS errors that are 100% WRONG (wrong tense, subject-verb agreement, word with a completely wrong meaning, off-topic content)
+- NEVER flag correct usage, synonyms ("big" vs "large"), correct linking words (Moreover, Furthermore, However) or stylistic preferences
+- If in doubt, DON'T flag it
+
+STRENGTHS (1-3 genuine strengths, even basic ones for weak essays)
+
+FEEDBACK: start positive, name 1-2 key areas to improve, end with encouragement.
+SUGGESTIONS: exactly 2-3 specific, actionable items, most impactful first.
+
+IMPORTANT:
+- Keep original English text in "text" and "correction" fields
+- Write assessment, explanations, feedback and suggestions in VIETNAMESE with proper diacritics (có dấu tiếng Việt)
+
+Return JSON format:
+{
+    "task_achievement_score": 5.0,
+    "coherence_cohesion_score": 5.5,
+    "lexical_resource_score": 4.5,
+    "grammar_accuracy_score": 4.0,
+    "overall_score": 5.0,
+    "level": "average",
+    "brief_assessment": "Nhận xét ngắn (1-2 câu)",
+    "errors": [
+        {"type": "grammar", "text": "When teacher make joke", "correction": "When teachers make jokes", "explanation": "Lỗi ngữ pháp: danh từ số nhiều và chia động từ"}
+    ],
+    "error_summary": "Bài viết có một số lỗi ngữ pháp cơ bản cần sửa",
+    "strengths": [
+        {"type": "coherence", "text": "Humor also helps students remember lessons", "explanation": "Ý tưởng tốt và có liên quan đến chủ đề"}
+    ],
+    "strengths_summary": "Bài viết có ý tưởng rõ ràng",
+    "feedback": "Bài viết có ý tưởng tốt và trả lời đúng chủ đề. Tuy nhiên, cần cải thiện thêm về ngữ pháp.",
+    "suggestions": ["Chú ý chia động từ đúng với chủ ngữ (he/she → verb + s)", "Sử dụng thêm từ nối để liên kết ý"]
+}"""
+
 # ========== STEP 5: IMPROVED VERSION PROMPT ==========
 IMPROVED_VERSION_PROMPT = """You are an expert English essay editor.
 Task: Rewrite the student's essay with all errors fixed.
@@ -182,6 +264,19 @@ Return JSON format:
     "improved_version": "The complete rewritten essay in English"
 }"""
 
+# Plain-text variant used when the rewrite is streamed token by token
+IMPROVED_VERSION_STREAM_PROMPT = """You are an expert English essay editor.
+Task: Rewrite the student's essay with all errors fixed.
+
+Requirements:
+1. MUST write in ENGLISH only
+2. Keep the same ideas and structure as the original
+3. Fix all grammar, vocabulary, and coherence errors
+4. Improve sentence variety and word choice
+5. Maintain the original meaning and intent
+
+Return ONLY the complete rewritten essay as plain text (no JSON, no headings, no comments)."""
+
 
 # ========== HELPER FUNCTIONS ==========
 def _extract_json_from_error(error):
@@ -200,16 +295,27 @@ def _extract_json_from_error(error):
     return None
 
 
-def _call_llm(prompt, user_content):
-    """Helper to call LLM with a prompt"""
-    groq_clients, groq_api_call_with_retry, LLM_MODEL = _get_clients()
+async def _call_llm(prompt, user_content):
+    """Helper to call LLM with a prompt (repeated essays are served from the LLM result cache)"""
+    groq_clients, _, LLM_MODEL = _get_clients()
     
     if not groq_clients:
         return None
     
+    return await cached_llm_call(
+        prompt, user_content,
+        lambda: _call_llm_uncached(prompt, user_content),
+        model=LLM_MODEL
+    )
+
+
+async def _call_llm_uncached(prompt, user_content):
+    """Call LLM with a prompt and parse the JSON response"""
+    _, groq_api_call_with_retry, LLM_MODEL = _get_clients()
+    
     try:
-        def api_call(client):
-            return client.chat.completions.create(
+        async def api_call(client):
+            return await client.chat.completions.create(
                 model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": prompt},
@@ -218,7 +324,7 @@ def _call_llm(prompt, user_content):
                 response_format={"type": "json_object"}
             )
         
-        response = groq_api_call_with_retry(api_call)
+        response = await groq_api_call_with_retry(api_call, estimated_tokens=estimate_tokens(prompt, user_content))
         return json.loads(response.choices[0].message.content)
     except Exception as e:
         print(f"LLM call error: {e}")
@@ -227,12 +333,48 @@ def _call_llm(prompt, user_content):
         return None
 
 
+async def _stream_llm_text(prompt, user_content, on_token):
+    """Stream a plain-text completion, passing each text delta to on_token; returns the full text"""
+    _, groq_api_call_with_retry, LLM_MODEL = _get_clients()
+    
+    try:
+        async def api_call(client):
+            return await client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+        
+        async def consume(stream):
+            # Runs while the key is held, so the pool sees the call as in flight until the last token
+            parts = []
+            usage_tokens = None
+            async for chunk in stream:
+                usage_tokens = get_usage_tokens(chunk) or usage_tokens  # Only on the final chunk
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    on_token(delta)
+            return "".join(parts).strip(), usage_tokens
+        
+        return await groq_api_call_with_retry(
+            api_call, estimated_tokens=estimate_tokens(prompt, user_content), consume=consume
+        )
+    except Exception as e:
+        print(f"LLM stream error: {e}")
+        return None
+
+
 # ========== STEP FUNCTIONS ==========
-def step1_scoring(context, essay):
+async def step1_scoring(context, essay):
     """Step 1: Score the essay on 4 criteria"""
     print("Step 1: Scoring essay...")
     user_content = f"Topic/Prompt: {context}\n\nEssay: {essay}"
-    result = _call_llm(SCORING_PROMPT, user_content)
+    result = await _call_llm(SCORING_PROMPT, user_content)
     if result:
         print(f"   Done - Overall score: {result.get('overall_score', 'N/A')}, Level: {result.get('level', 'N/A')}")
     return result
@@ -282,11 +424,11 @@ def _filter_fake_errors(errors):
     return valid_errors
 
 
-def step2_error_analysis(context, essay):
+async def step2_error_analysis(context, essay):
     """Step 2: Find and analyze all errors"""
     print("Step 2: Analyzing errors...")
     user_content = f"Topic/Prompt: {context}\n\nEssay: {essay}"
-    result = _call_llm(ERROR_ANALYSIS_PROMPT, user_content)
+    result = await _call_llm(ERROR_ANALYSIS_PROMPT, user_content)
     
     if result and "errors" in result:
         original_count = len(result.get("errors", []))
@@ -303,7 +445,7 @@ def step2_error_analysis(context, essay):
     return result
 
 
-def step3_strengths_analysis(context, essay, level):
+async def step3_strengths_analysis(context, essay, level):
     """Step 3: Find strengths (mainly for average/good essays)"""
     if level == "weak":
         print("Step 3: Skipping strengths (weak essay)...")
@@ -311,13 +453,13 @@ def step3_strengths_analysis(context, essay, level):
     
     print("Step 3: Analyzing strengths...")
     user_content = f"Topic/Prompt: {context}\n\nEssay: {essay}"
-    result = _call_llm(STRENGTHS_PROMPT, user_content)
+    result = await _call_llm(STRENGTHS_PROMPT, user_content)
     if result:
         print(f"   Done - Found {result.get('total_strengths', 0)} strengths")
     return result
 
 
-def step4_feedback_suggestions(context, essay, errors, strengths):
+async def step4_feedback_suggestions(context, essay, errors, strengths):
     """Step 4: Generate feedback and suggestions"""
     print("Step 4: Generating feedback...")
     
@@ -335,19 +477,58 @@ Errors found:
 Strengths found:
 {strength_summary}"""
     
-    result = _call_llm(FEEDBACK_PROMPT, user_content)
+    result = await _call_llm(FEEDBACK_PROMPT, user_content)
     if result:
         print(f"   Done - Generated {len(result.get('suggestions', []))} suggestions")
     return result
 
 
-def step5_improved_version(context, essay, errors):
-    """Step 5: Generate improved version"""
-    print("Step 5: Generating improved version...")
+async def step_single_pass(context, essay):
+    """Steps 1-4 in one call: scores, errors, strengths, feedback and suggestions"""
+    print("Single pass: Evaluating essay...")
+    user_content = f"Topic/Prompt: {context}\n\nEssay: {essay}"
+    result = await _call_llm(SINGLE_PASS_PROMPT, user_content)
+    
+    if result:
+        original_count = len(result.get("errors") or [])
+        result["errors"] = _filter_fake_errors(result.get("errors") or [])
+        filtered_count = original_count - len(result["errors"])
+        print(f"   Done - Overall score: {result.get('overall_score', 'N/A')}, Level: {result.get('level', 'N/A')}, "
+              f"{len(result['errors'])} errors (filtered out {filtered_count} false positives)")
+    return result
+
+
+def _single_pass_sections(result):
+    """Split a single-pass result into the outputs of steps 1-4 (same shapes as the full pipeline)"""
+    if not result:
+        return {}
     
+    errors = result.get("errors") or []
+    # As in step 3, weak essays get no strengths section
+    strengths = [] if result.get("level") == "weak" else (result.get("strengths") or [])[:3]
+    return {
+        "scoring": result,
+        "error_analysis": {
+            "errors": errors,
+            "total_errors": len(errors),
+            "error_summary": result.get("error_summary", "")
+        },
+        "strengths_analysis": {
+            "strengths": strengths,
+            "total_strengths": len(strengths),
+            "strengths_summary": result.get("strengths_summary", "")
+        },
+        "feedback": {
+            "feedback": result.get("feedback", ""),
+            "suggestions": result.get("suggestions") or []
+        }
+    }
+
+
+def _improved_version_content(context, essay, errors):
     error_list = "\n".join([f"- {e.get('text')} -> {e.get('correction')}" for e in errors])
     
-    user_content = f"""Topic/Prompt: {context}
+    return f"""Topic/Prompt: {context}
 
 Original Essay: {essay}
 
@@ -355,22 +536,239 @@ Errors to fix:
 {error_list}
 
 Please rewrite the essay fixing all these errors while keeping the same ideas."""
+
+
+async def step5_improved_version(context, essay, errors):
+    """Step 5: Generate improved version"""
+    print("Step 5: Generating improved version...")
     
-    result = _call_llm(IMPROVED_VERSION_PROMPT, user_content)
+    user_content = _improved_version_content(context, essay, errors)
+    result = await _call_llm(IMPROVED_VERSION_PROMPT, user_content)
     if result:
         print("   Done - Improved version generated")
     return result
 
 
+async def step5_improved_version_stream(context, essay, errors, on_token: Callable[[str], None]):
+    """Step 5 (streaming): same result shape, text deltas passed to on_token as they arrive"""
+    groq_clients, _, LLM_MODEL = _get_clients()
+    if not groq_clients:
+        return None
+    
+    print("Step 5: Streaming improved version...")
+    user_content = _improved_version_content(context, essay, errors)
+    streamed = False
+    
+    async def compute():
+        nonlocal streamed
+        streamed = True
+        text = await _stream_llm_text(IMPROVED_VERSION_STREAM_PROMPT, user_content, on_token)
+        return {"improved_version": text} if text else None
+    
+    result = await cached_llm_call(IMPROVED_VERSION_STREAM_PROMPT, user_content, compute, model=LLM_MODEL)
+    if result and not streamed:
+        # Served from the cache or a coalesced call: deliver the text in one piece
+        on_token(result.get("improved_version", ""))
+    if result:
+        print("   Done - Improved version streamed")
+    return result
+
+
+# ========== PIPELINE SCHEDULER ==========
+async def _run_step_graph(graph, required=(), on_step=None):
+    """
+    Run pipeline steps as a dependency graph
+    graph: {name: (dependencies, step_factory)} where step_factory(results) returns a coroutine
+    Each step starts as soon as all of its dependencies finished, so independent steps overlap.
+    on_step(name, result), if given, is called as each step finishes.
+    
+    Returns: (results, timings) - results is None if a required step failed
+    """
+    pipeline_start = time.perf_counter()
+    results = {}
+    timings = {}
+    tasks = {}
+    
+    async def run_step(name):
+        dependencies, step_factory = graph[name]
+        if dependencies:
+            await asyncio.gather(*(tasks[dep] for dep in dependencies))
+        
+        started = time.perf_counter()
+        try:
+            results[name] = await step_factory(results)
+        except Exception as e:
+            print(f"   Step '{name}' error: {e}")
+            results[name] = None
+        finished = time.perf_counter()
+        
+        timings[name] = {
+            "start": round(started - pipeline_start, 3),
+            "end": round(finished - pipeline_start, 3),
+            "duration": round(finished - started, 3)
+        }
+        if on_step:
+            on_step(name, results[name])
+        return results[name]
+    
+    # Tasks only start running at the next await, so every dependency task exists by then
+    for name in graph:
+        tasks[name] = asyncio.create_task(run_step(name))
+    
+    try:
+        for name in required:
+            if await tasks[name] is None:
+                print(f"   Required step '{name}' failed - cancelling pipeline")
+                return None, timings
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+    
+    return results, timings
+
+
+def _critical_path(graph, timings):
+    """Walk back from the last finished step through the dependency that finished last"""
+    if not timings:
+        return []
+    
+    path = []
+    current = max(timings, key=lambda name: timings[name]["end"])
+    while current:
+        path.insert(0, current)
+        dependencies = [dep for dep in graph[current][0] if dep in timings]
+        current = max(dependencies, key=lambda name: timings[name]["end"]) if dependencies else None
+    return path
+
+
+def _build_writing_result(topic_id, essay, scoring, errors, strengths, feedback_result, improved):
+    """Combine step outputs into the WritingEvaluateResponse shape"""
+    return {
+        "topic_id": topic_id,
+        "essay": essay,
+        "word_count": len(essay.split()),
+        
+        # Scores from Step 1
+        "task_achievement_score": scoring.get("task_achievement_score", 0),
+        "coherence_cohesion_score": scoring.get("coherence_cohesion_score", 0),
+        "lexical_resource_score": scoring.get("lexical_resource_score", 0),
+        "grammar_accuracy_score": scoring.get("grammar_accuracy_score", 0),
+        "overall_score": scoring.get("overall_score", 0),
+        
+        # Feedback from Step 4
+        "feedback": feedback_result.get("feedback", "") if feedback_result else scoring.get("brief_assessment", ""),
+        
+        # Errors from Step 2 (max 5) + Strengths from Step 3 (max 3) = Total max 8
+        "errors": (errors[:5] + [{"type": "strength", "text": s.get("text", ""), "correction": "", "explanation": s.get("explanation", "")} for s in strengths[:3]]),
+        
+        # Suggestions from Step 4 (max 3)
+        "suggestions": (feedback_result.get("suggestions", []) if feedback_result else [])[:3],
+        
+        # Improved version from Step 5
+        "improved_version": improved.get("improved_version", "") if improved else ""
+    }
+
+
+def _step_errors(results):
+    error_analysis = results.get("error_analysis")
+    return error_analysis.get("errors", []) if error_analysis else []
+
+
+def _step_strengths(results):
+    strengths_analysis = results.get("strengths_analysis")
+    return strengths_analysis.get("strengths", []) if strengths_analysis else []
+
+
+def resolve_writing_mode(mode=None):
+    """
+    "full" or "single_pass" for this request, falling back to WRITING_EVAL_MODE (validated at import)
+    "auto" picks single pass while the key pool load is at or above WRITING_SINGLE_PASS_PRESSURE.
+    Raises ValueError for unknown modes.
+    """
+    mode = (mode or WRITING_EVAL_MODE).lower()
+    if mode not in WRITING_EVAL_MODES:
+        raise ValueError(f"Unknown writing evaluation mode '{mode}' (available: {', '.join(WRITING_EVAL_MODES)})")
+    if mode == "auto":
+        return "single_pass" if _get_pressure() >= WRITING_SINGLE_PASS_PRESSURE else "full"
+    return mode
+
+
+def build_writing_pipeline(context, essay, on_token=None, mode="full", include_improved=True):
+    """
+    Dependency graph of the writing steps
+    full (5 calls):
+    - scoring, error_analysis: only need the essay (run together)
+    - strengths_analysis: needs level from scoring
+    - improved_version: needs errors from error_analysis (streamed to on_token if given)
+    - feedback: needs errors and strengths
+    single_pass (1-2 calls):
+    - evaluation: steps 1-4 in one call
+    - improved_version: needs errors from evaluation
+    include_improved=False drops the improved_version step.
+    """
+    if mode == "single_pass":
+        get_errors = lambda r: (r.get(SINGLE_PASS_STEP) or {}).get("errors", [])
+    else:
+        get_errors = _step_errors
+    
+    if on_token:
+        improved_version_step = lambda r: step5_improved_version_stream(context, essay, get_errors(r), on_token)
+    else:
+        improved_version_step = lambda r: step5_improved_version(context, essay, get_errors(r))
+    
+    if mode == "single_pass":
+        graph = {
+            SINGLE_PASS_STEP: ((), lambda r: step_single_pass(context, essay)),
+            "improved_version": ((SINGLE_PASS_STEP,), improved_version_step),
+        }
+    else:
+        graph = {
+            "scoring": ((), lambda r: step1_scoring(context, essay)),
+            "error_analysis": ((), lambda r: step2_error_analysis(context, essay)),
+            "strengths_analysis": (("scoring",), lambda r: step3_strengths_analysis(
+                context, essay, r["scoring"].get("level", "average"))),
+            "improved_version": (("error_analysis",), improved_version_step),
+            "feedback": (("error_analysis", "strengths_analysis"), lambda r: step4_feedback_suggestions(
+                context, essay, _step_errors(r), _step_strengths(r))),
+        }
+    
+    if not include_improved:
+        del graph["improved_version"]
+    return graph
+
+
+async def _run_writing_pipeline(graph, on_step=None):
+    """
+    Run a graph from build_writing_pipeline
+    Results (and on_step calls) always use the full-pipeline step names, so a single-pass
+    evaluation is reported as scoring, error_analysis, strengths_analysis and feedback.
+    """
+    def step_done(name, result):
+        if not on_step:
+            return
+        if name == SINGLE_PASS_STEP:
+            for section, value in _single_pass_sections(result).items():
+                on_step(section, value)
+        else:
+            on_step(name, result)
+    
+    required = (SINGLE_PASS_STEP,) if SINGLE_PASS_STEP in graph else ("scoring",)
+    results, timings = await _run_step_graph(graph, required=required, on_step=step_done)
+    if results and SINGLE_PASS_STEP in results:
+        results.update(_single_pass_sections(results[SINGLE_PASS_STEP]))
+    return results, timings
+
+
 # ========== MAIN EVALUATION FUNCTION ==========
-def evaluate_writing(topic_id, context, essay):
+async def evaluate_writing(topic_id, context, essay, mode=None, include_improved=True):
     """
-    Multi-step writing evaluation:
-    1. Scoring
-    2. Error Analysis  
-    3. Strengths Analysis (for average/good essays)
-    4. Feedback & Suggestions
-    5. Improved Version
+    Multi-step writing evaluation, scheduled as a dependency graph:
+    1. Scoring                      ∥ 2. Error Analysis
+    3. Strengths (after 1)          ∥ 5. Improved Version (after 2)
+    4. Feedback & Suggestions (after 2 and 3)
+    In single-pass mode 1-4 are one call, followed by 5.
     """
     groq_clients, _, _ = _get_clients()
     
@@ -378,63 +776,178 @@ def evaluate_writing(topic_id, context, essay):
         print("No Groq clients available for writing evaluation")
         return None
     
-    print(f"Starting writing evaluation for topic: {topic_id}")
+    mode = resolve_writing_mode(mode)
+    print(f"Starting writing evaluation for topic: {topic_id} ({mode})")
     
     try:
-        # Step 1: Scoring
-        scoring = step1_scoring(context, essay)
-        if not scoring:
+        graph = build_writing_pipeline(context, essay, mode=mode, include_improved=include_improved)
+        results, timings = await _run_writing_pipeline(graph)
+        if not results:
             return None
         
-        level = scoring.get("level", "average")
-        
-        # Step 2: Error Analysis
-        error_analysis = step2_error_analysis(context, essay)
-        errors = error_analysis.get("errors", []) if error_analysis else []
+        return _assemble_writing_result(topic_id, essay, graph, results, timings)
         
-        # Step 3: Strengths Analysis
-        strengths_analysis = step3_strengths_analysis(context, essay, level)
-        strengths = strengths_analysis.get("strengths", []) if strengths_analysis else []
+    except Exception as e:
+        print(f"Writing evaluation error: {e}")
+        return None
+
+
+def _assemble_writing_result(topic_id, essay, graph, results, timings):
+    """Final WritingEvaluateResponse payload with step timings"""
+    result = _build_writing_result(
+        topic_id, essay,
+        results["scoring"],
+        _step_errors(results),
+        _step_strengths(results),
+        results.get("feedback"),
+        results.get("improved_version")
+    )
+    
+    critical_path = _critical_path(graph, timings)
+    total = max(t["end"] for t in timings.values())
+    result["step_timings"] = {
+        "mode": "single_pass" if SINGLE_PASS_STEP in graph else "full",
+        "steps": timings,
+        "critical_path": critical_path,
+        "total": total
+    }
+    
+    print(f"Writing evaluation completed - Overall score: {result.get('overall_score', 'N/A')} "
+          f"({total:.2f}s, critical path: {' -> '.join(critical_path)})")
+    return result
+
+
+def _step_event(name, result):
+    """Partial payload streamed when a step finishes (None if there is nothing to show)"""
+    if not result:
+        return None
+    if name == "scoring":
+        return "scores", {
+            "task_achievement_score": result.get("task_achievement_score", 0),
+            "coherence_cohesion_score": result.get("coherence_cohesion_score", 0),
+            "lexical_resource_score": result.get("lexical_resource_score", 0),
+            "grammar_accuracy_score": result.get("grammar_accuracy_score", 0),
+            "overall_score": result.get("overall_score", 0),
+            "level": result.get("level"),
+            "brief_assessment": result.get("brief_assessment", "")
+        }
+    if name == "error_analysis":
+        return "errors", {"errors": result.get("errors", [])[:5]}
+    if name == "strengths_analysis":
+        return "strengths", {"strengths": result.get("strengths", [])[:3]}
+    if name == "feedback":
+        return "feedback", {
+            "feedback": result.get("feedback", ""),
+            "suggestions": result.get("suggestions", [])[:3]
+        }
+    if name == "improved_version":
+        return "improved_version", {"improved_version": result.get("improved_version", "")}
+    return None
+
+
+async def evaluate_writing_stream(topic_id, context, essay, mode=None, include_improved=True) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of evaluate_writing
+    Yields {"event", "data"} as steps finish: scores, errors, strengths, feedback,
+    improved_version_delta (text tokens), improved_version, then "result" with the full
+    WritingEvaluateResponse payload (or "error").
+    """
+    groq_clients, _, _ = _get_clients()
+    
+    if not groq_clients:
+        yield {"event": "error", "data": {"detail": "Writing evaluation failed"}}
+        return
+    
+    mode = resolve_writing_mode(mode)
+    print(f"Starting streaming writing evaluation for topic: {topic_id} ({mode})")
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def on_step(name, result):
+        event = _step_event(name, result)
+        if event:
+            queue.put_nowait(event)
+    
+    def on_token(text):
+        if text:
+            queue.put_nowait(("improved_version_delta", {"text": text}))
+    
+    graph = build_writing_pipeline(context, essay, on_token=on_token, mode=mode, include_improved=include_improved)
+    
+    async def run_pipeline():
+        try:
+            return await _run_writing_pipeline(graph, on_step=on_step)
+        finally:
+            queue.put_nowait(None)
+    
+    pipeline = asyncio.create_task(run_pipeline())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            event, data = item
+            yield {"event": event, "data": data}
         
-        # Step 4: Feedback & Suggestions
-        feedback_result = step4_feedback_suggestions(context, essay, errors, strengths)
+        try:
+            results, timings = await pipeline
+        except Exception as e:
+            print(f"Writing evaluation error: {e}")
+            results, timings = None, None
         
-        # Step 5: Improved Version
-        improved = step5_improved_version(context, essay, errors)
+        if not results:
+            yield {"event": "error", "data": {"detail": "Writing evaluation failed"}}
+            return
         
-        # Combine all results
-        result = {
-            "topic_id": topic_id,
-            "essay": essay,
-            "word_count": len(essay.split()),
-            
-            # Scores from Step 1
-            "task_achievement_score": scoring.get("task_achievement_score", 0),
-            "coherence_cohesion_score": scoring.get("coherence_cohesion_score", 0),
-            "lexical_resource_score": scoring.get("lexical_resource_score", 0),
-            "grammar_accuracy_score": scoring.get("grammar_accuracy_score", 0),
-            "overall_score": scoring.get("overall_score", 0),
-            
-            # Feedback from Step 4
-            "feedback": feedback_result.get("feedback", "") if feedback_result else scoring.get("brief_assessment", ""),
-            
-            # Errors from Step 2 (max 5) + Strengths from Step 3 (max 3) = Total max 8
-            "errors": (errors[:5] + [{"type": "strength", "text": s.get("text", ""), "correction": "", "explanation": s.get("explanation", "")} for s in strengths[:3]]),
-            
-            # Suggestions from Step 4 (max 3)
-            "suggestions": (feedback_result.get("suggestions", []) if feedback_result else [])[:3],
-            
-            # Improved version from Step 5
-            "improved_version": improved.get("improved_version", "") if improved else ""
+        yield {"event": "result", "data": _assemble_writing_result(topic_id, essay, graph, results, timings)}
+    finally:
+        # Client went away: cancelling the pipeline cancels its steps, and each step's LLM call
+        # stops unless another request is waiting on the same call (see SingleFlight)
+        if not pipeline.done():
+            pipeline.cancel()
+
+
+def _get_batch_semaphore() -> asyncio.Semaphore:
+    """Created on first use, once the number of Groq keys is known"""
+    global _batch_semaphore
+    if _batch_semaphore is None:
+        groq_clients = _get_clients()[0]
+        limit = WRITING_BATCH_CONCURRENCY or WRITING_BATCH_ESSAYS_PER_KEY * max(1, len(groq_clients))
+        _batch_semaphore = asyncio.Semaphore(limit)
+        print(f"📚 Writing batch concurrency: {limit} essays")
+    return _batch_semaphore
+
+
+async def evaluate_writing_batch(topic_id, context, essays, mode=None, include_improved=True) -> AsyncIterator[Dict]:
+    """
+    Evaluate many essays for one topic concurrently
+    essays: [{"id": optional client id, "essay": text}]
+    Yields one {"index", "id", "success", "result", "error"} per essay in completion order.
+    Every item shares the same topic context; a global semaphore bounds how many
+    pipelines run at once (the key pool still paces the individual LLM calls).
+    The mode is resolved per essay, so "auto" falls back to single pass as the batch loads the key pool.
+    """
+    async def evaluate_item(index, item):
+        async with _get_batch_semaphore():
+            result = await evaluate_writing(topic_id, context, item["essay"], mode, include_improved)
+        return {
+            "index": index,
+            "id": item.get("id"),
+            "success": result is not None,
+            "result": result,
+            "error": None if result is not None else "Evaluation failed"
         }
-        
-        print(f"Writing evaluation completed - Overall score: {result.get('overall_score', 'N/A')}")
-        return result
-        
-    except Exception as e:
-        print(f"Writing evaluation error: {e}")
-        return None
+    
+    tasks = [asyncio.create_task(evaluate_item(i, item)) for i, item in enumerate(essays)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: cancel the essays not evaluated yet; their LLM calls stop
+        # unless another request is waiting on the same call (see SingleFlight)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
 
 
 # Export functions
-__all__ = ['evaluate_writing', 'step1_scoring', 'step2_error_analysis', 'step3_strengths_analysis', 'step4_feedback_suggestions', 'step5_improved_version']
+__all__ = ['evaluate_writing', 'evaluate_writing_stream', 'evaluate_writing_batch', 'build_writing_pipeline', 'resolve_writing_mode', 'WRITING_EVAL_MODES', 'step_single_pass', 'step1_scoring', 'step2_error_analysis', 'step3_strengths_analysis', 'step4_feedback_suggestions', 'step5_improved_version']
@@ -4,6 +4,7 @@ Uses YouTube Data API v3 to find relevant educational content
 """
 
 import os
+import asyncio
 from typing import Optional
 
 # Get API key from environment
@@ -35,14 +36,13 @@ Grammar tenses for beginners
 """
 
 
-def generate_search_queries(feedback: str, weaknesses: list[str]) -> list[str]:
+async def generate_search_queries(feedback: str, weaknesses: list[str]) -> list[str]:
     """Use LLM to generate relevant YouTube search queries based on feedback"""
     try:
         # Import here to avoid circular dependency
-        from .clients import get_groq_client
+        from .clients import groq_clients, groq_api_call_with_retry
         
-        client = get_groq_client()
-        if not client:
+        if not groq_clients:
             # Fallback to generic queries
             return ["English learning for Vietnamese speakers"]
         
@@ -51,12 +51,15 @@ def generate_search_queries(feedback: str, weaknesses: list[str]) -> list[str]:
             weaknesses=", ".join(weaknesses[:5]) if weaknesses else "general improvement"
         )
         
-        response = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=200
-        )
+        async def api_call(client):
+            return await client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7,
+                max_tokens=200
+            )
+        
+        response = await groq_api_call_with_retry(api_call)
         
         queries = response.choices[0].message.content.strip().split("\n")
         return [q.strip() for q in queries if q.strip()][:3]  # Max 3 queries
@@ -121,7 +124,7 @@ def search_youtube_videos(query: str, max_results: int = 3) -> list[dict]:
         return []
 
 
-def get_recommended_videos(
+async def get_recommended_videos(
     feedback: str,
     weaknesses: list[str],
     skill_type: str = "speaking",
@@ -140,7 +143,7 @@ def get_recommended_videos(
         List of video recommendations with metadata
     """
     # Generate search queries based on feedback
-    queries = generate_search_queries(feedback, weaknesses)
+    queries = await generate_search_queries(feedback, weaknesses)
     
     # Add skill-specific context
     if skill_type == "speaking":
@@ -151,12 +154,15 @@ def get_recommended_videos(
     if not queries:
         queries = [default_query]
     
-    # Collect videos from all queries
+    # Collect videos from all queries (urllib is blocking, so search in worker threads)
     all_videos = []
     seen_ids = set()
     
-    for query in queries:
-        videos = search_youtube_videos(query, max_results=2)
+    results = await asyncio.gather(*[
+        asyncio.to_thread(search_youtube_videos, query, 2) for query in queries
+    ])
+    
+    for query, videos in zip(queries, results):
         for video in videos:
             if video["video_id"] not in seen_ids:
                 seen_ids.add(video["video_id"])
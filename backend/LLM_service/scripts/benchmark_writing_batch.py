@@ -0,0 +1,87 @@
+"""
+Benchmark /writing/evaluate/batch scheduling against a simulated Groq client
+No network or API keys: every LLM call sleeps for SIMULATED_LATENCY and returns a fixed result,
+so the numbers reflect the pipeline/batch scheduling, not the model.
+
+Run from backend/LLM_service:
+    python -m scripts.benchmark_writing_batch
+"""
+import os
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+
+BATCH_ESSAYS = int(os.getenv("BENCHMARK_ESSAYS", "40"))
+# The simulated key has no rate limit, so use a fixed batch concurrency instead of the per-key default
+os.environ.setdefault("WRITING_BATCH_CONCURRENCY", "8")
+SIMULATED_LATENCY = float(os.getenv("BENCHMARK_LATENCY", "0.3"))
+
+# Fields read by every writing step (scores, errors, strengths, feedback, improved version)
+SIMULATED_RESULT = {
+    "task_achievement_score": 6.0, "coherence_cohesion_score": 6.0,
+    "lexical_resource_score": 6.0, "grammar_accuracy_score": 6.0,
+    "overall_score": 6.0, "level": "average", "brief_assessment": "",
+    "errors": [], "total_errors": 0, "error_summary": "",
+    "strengths": [], "total_strengths": 0, "strengths_summary": "",
+    "feedback": "", "suggestions": [], "improved_version": ""
+}
+
+
+class SimulatedCompletions:
+    async def create(self, **kwargs):
+        await asyncio.sleep(SIMULATED_LATENCY)
+        message = SimpleNamespace(content=json.dumps(SIMULATED_RESULT))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class SimulatedClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimulatedCompletions())
+
+
+def _setup():
+    from api.services import clients
+    from api.services.key_pool import GroqKeyPool
+
+    clients.groq_clients[:] = [SimulatedClient()]
+    # Unlimited budget: measure scheduling, not rate limiting
+    clients.groq_key_pool = GroqKeyPool(rpm=10 ** 6, tpm=10 ** 9)
+    clients.groq_key_pool.reset(clients.groq_clients)
+
+
+async def _run():
+    from api.services.llm_cache import bypass_llm_cache
+    from api.services.writing_evaluation import (
+        evaluate_writing, evaluate_writing_batch, WRITING_BATCH_CONCURRENCY
+    )
+
+    essays = [{"id": f"s{i}", "essay": f"Essay number {i} about the topic."} for i in range(BATCH_ESSAYS)]
+    context = "Some people prefer to study alone. Others prefer to study in groups. Which do you prefer?"
+
+    with bypass_llm_cache():
+        start = time.perf_counter()
+        for item in essays:
+            await evaluate_writing("benchmark-serial", context, item["essay"], "full")
+        serial = time.perf_counter() - start
+
+        # Distinct content so the batch does not hit results cached by the serial run
+        batch_essays = [{**item, "essay": item["essay"] + " (batch)"} for item in essays]
+        start = time.perf_counter()
+        done = [item async for item in evaluate_writing_batch("benchmark-batch", context, batch_essays, "full")]
+        batch = time.perf_counter() - start
+
+    failed = sum(1 for item in done if not item["success"])
+    print(f"\n{BATCH_ESSAYS} essays, {SIMULATED_LATENCY}s per LLM call, "
+          f"WRITING_BATCH_CONCURRENCY={WRITING_BATCH_CONCURRENCY}")
+    print(f"   Serial: {serial:.2f}s")
+    print(f"   Batch:  {batch:.2f}s ({serial / batch:.1f}x, {failed} failed)")
+
+
+def main():
+    _setup()
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
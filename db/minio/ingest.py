@@ -3,7 +3,10 @@ Ingest script to load data from local files to MinIO bucket
 Run this on startup to populate MinIO with exam data
 """
 import os
+import sys
 import json
+import hashlib
+from datetime import datetime, timezone
 from minio import Minio
 from minio.error import S3Error
 import io
@@ -14,6 +17,12 @@ MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
 MINIO_BUCKET = os.getenv("MINIO_BUCKET", "english-learning")
 DATA_DIR = os.getenv("DATA_DIR", "/app/data")
 
+# Everything the API needs at startup, loaded with a single GET
+TOPIC_BUNDLE_OBJECT = "bundle/topics.json"
+# Only these questions are served as topics (speaking Q1-2 Read Aloud and Q7, writing Q8)
+SPEAKING_QUESTIONS = ("1", "2", "7")
+WRITING_QUESTIONS = ("8",)
+
 def create_bucket_if_not_exists(client: Minio, bucket_name: str):
     """Create bucket if it doesn't exist"""
     try:
@@ -119,6 +128,76 @@ def ingest_topics(client: Minio, bucket: str, data_dir: str):
             print(f"File size: {os.path.getsize(topics_file)} bytes")
         return 0
 
+def content_hash(data) -> str:
+    """Stable short hash of a JSON value"""
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def collect_exam_records(exam_dir: str, question_numbers: tuple) -> dict:
+    """topic_id -> exam trimmed to the questions the API serves"""
+    records = {}
+    if not os.path.exists(exam_dir):
+        print(f"Exam directory not found: {exam_dir}")
+        return records
+    
+    for folder in sorted(os.listdir(exam_dir)):
+        data_file = os.path.join(exam_dir, folder, "data.json")
+        if not os.path.exists(data_file):
+            continue
+        try:
+            with open(data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error processing {data_file}: {e}")
+            continue
+        
+        questions = [q for q in data.get("questions", []) if str(q.get("questionNumber")) in question_numbers]
+        if not questions:
+            print(f"No question {'/'.join(question_numbers)} in {data_file}, skipping from bundle")
+            continue
+        records[folder] = {"testName": data.get("testName", ""), "questions": questions}
+    return records
+
+def build_topic_bundle(speaking_dir: str, writing_dir: str, topics_file: str) -> dict:
+    """Speaking Q1-2/Q7 / writing Q8 records + custom topics, with a manifest of content hashes"""
+    speaking = collect_exam_records(speaking_dir, SPEAKING_QUESTIONS)
+    writing = collect_exam_records(writing_dir, WRITING_QUESTIONS)
+    
+    custom_topics = []
+    if os.path.exists(topics_file):
+        try:
+            with open(topics_file, 'r', encoding='utf-8') as f:
+                custom_topics = json.load(f)
+        except Exception as e:
+            print(f"Error processing topics: {e}")
+    
+    manifest = {
+        "speaking": {topic_id: content_hash(record) for topic_id, record in speaking.items()},
+        "writing": {topic_id: content_hash(record) for topic_id, record in writing.items()},
+        "custom_topics": content_hash(custom_topics),
+        "counts": {"speaking": len(speaking), "writing": len(writing), "custom_topics": len(custom_topics)}
+    }
+    # The version only depends on content, so re-ingesting unchanged data keeps it
+    manifest["version"] = content_hash(manifest)
+    manifest["created_at"] = datetime.now(timezone.utc).isoformat()
+    
+    return {"manifest": manifest, "speaking": speaking, "writing": writing, "custom_topics": custom_topics}
+
+def upload_topic_bundle(client: Minio, bucket: str, bundle: dict):
+    """Upload the bundle as compact JSON"""
+    json_bytes = json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    client.put_object(
+        bucket,
+        TOPIC_BUNDLE_OBJECT,
+        io.BytesIO(json_bytes),
+        len(json_bytes),
+        content_type='application/json'
+    )
+    counts = bundle["manifest"]["counts"]
+    print(f"Published topic bundle {bundle['manifest']['version']}: "
+          f"{counts['speaking']} speaking, {counts['writing']} writing, {counts['custom_topics']} custom "
+          f"({len(json_bytes) // 1024} KB)")
+
 def ingest_pronunciation_data(client: Minio, bucket: str):
     """
     Ingest pronunciation data from HuggingFace dataset
@@ -185,12 +264,29 @@ def main():
     # Create bucket
     create_bucket_if_not_exists(client, MINIO_BUCKET)
     
+    # Seed layout (speaking/, writing/, topics/topics.json) already mirrored by ingest.sh
+    if "--bundle-only" in sys.argv:
+        bundle = build_topic_bundle(
+            os.path.join(DATA_DIR, "speaking"),
+            os.path.join(DATA_DIR, "writing"),
+            os.path.join(DATA_DIR, "topics", "topics.json")
+        )
+        upload_topic_bundle(client, MINIO_BUCKET, bundle)
+        sys.exit(0)
+    
     # Ingest data
     total = 0
     total += ingest_speaking_data(client, MINIO_BUCKET, DATA_DIR)
     total += ingest_writing_data(client, MINIO_BUCKET, DATA_DIR)
     total += ingest_topics(client, MINIO_BUCKET, DATA_DIR)
     
+    # Publish the consolidated bundle the API loads at startup
+    upload_topic_bundle(client, MINIO_BUCKET, build_topic_bundle(
+        os.path.join(DATA_DIR, "exam_speaking"),
+        os.path.join(DATA_DIR, "exam_writting"),
+        os.path.join(DATA_DIR, "topics.json")
+    ))
+    
     # Optionally ingest pronunciation (can be slow)
     if os.getenv("INGEST_PRONUNCIATION", "false").lower() == "true":
         total += ingest_pronunciation_data(client, MINIO_BUCKET)
@@ -198,7 +294,6 @@ def main():
     print(f"\nIngestion complete! Total items: {total}")
     
     # Graceful exit to avoid PyGILState_Release error
-    import sys
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -40,6 +40,12 @@ echo "📦 Upload seed data: $SEED_DIR -> local/$BUCKET"
 # Mirror all files except dictionary source (will be processed separately)
 mc mirror --overwrite --exclude "SPDict-Anh-Viet-Anh.dictd/*" "$SEED_DIR" "local/$BUCKET"
 
+# Publish the consolidated topic bundle (speaking Q1-2/Q7, writing Q8, custom topics + manifest; see build_topic_bundle in ingest.py)
+echo "📦 Publishing topic bundle..."
+MINIO_ENDPOINT="${MINIO_ENDPOINT#http://}" MINIO_ACCESS_KEY="$MINIO_USER" MINIO_SECRET_KEY="$MINIO_PASSWORD" \
+  MINIO_BUCKET="$BUCKET" DATA_DIR="$SEED_DIR" \
+  python /ingest.py --bundle-only || echo "⚠️ Topic bundle publishing failed (API falls back to per-exam objects)"
+
 # Process dictionary data if enabled
 if [ "$PROCESS_DICTIONARY" = "true" ]; then
   DICT_DIR="$SEED_DIR/SPDict-Anh-Viet-Anh.dictd"
@@ -6,6 +6,7 @@ import os
 import json
 import re
 import io
+import struct
 from typing import Optional, Dict, Tuple
 from minio import Minio
 
@@ -25,6 +26,15 @@ WORD_PATTERN = re.compile(r'^[a-z]+$')
 # IPA extraction pattern
 IPA_PATTERN = re.compile(r'/([^/]+)/')
 
+# Compact word -> IPA index loaded by the API for autocomplete
+WORD_INDEX_OBJECT = "pronunciation-index/words.json"
+
+# Single packed artifact memory-mapped by the API (format: api/services/packed_dictionary.py)
+PACKED_DICTIONARY_OBJECT = "pronunciation-packed/dictionary.pdict"
+PACKED_MAGIC = b"PDICT001"
+PACKED_HEADER = struct.Struct("<8sIIQQ")
+PACKED_ENTRY = struct.Struct("<IHHII")
+
 
 def decode_base64_num(s: str) -> int:
     """Decode base64 number from dictd format"""
@@ -139,6 +149,60 @@ def upload_to_minio(client: Minio, bucket: str, object_name: str, data: dict):
     )
 
 
+def upload_word_index(client: Minio, bucket: str, word_ipas: Dict[str, str]):
+    """Upload the sorted [word, ipa] list used by the API prefix index"""
+    payload = {
+        "count": len(word_ipas),
+        "words": [[word, word_ipas[word]] for word in sorted(word_ipas)]
+    }
+    json_bytes = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    client.put_object(
+        bucket,
+        WORD_INDEX_OBJECT,
+        io.BytesIO(json_bytes),
+        len(json_bytes),
+        content_type='application/json'
+    )
+    print(f"✅ Uploaded word index: {len(word_ipas)} words ({len(json_bytes) // 1024} KB)")
+
+
+def build_packed_dictionary(entries: Dict[str, Dict]) -> bytes:
+    """Pack entries into a sorted key table + offsets + compact JSON records"""
+    words = sorted(entries, key=lambda w: w.encode('utf-8'))
+    
+    table = []
+    keys = bytearray()
+    records = bytearray()
+    for word in words:
+        entry = entries[word]
+        word_bytes = word.encode('utf-8')
+        ipa_bytes = (entry.get('ipa') or '').encode('utf-8')
+        record = {k: v for k, v in entry.items() if k != 'word'}
+        record_bytes = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        
+        table.append(PACKED_ENTRY.pack(len(keys), len(word_bytes), len(ipa_bytes), len(records), len(record_bytes)))
+        keys += word_bytes + ipa_bytes
+        records += record_bytes
+    
+    keys_offset = PACKED_HEADER.size + PACKED_ENTRY.size * len(words)
+    records_offset = keys_offset + len(keys)
+    header = PACKED_HEADER.pack(PACKED_MAGIC, len(words), 0, keys_offset, records_offset)
+    return header + b''.join(table) + bytes(keys) + bytes(records)
+
+
+def upload_packed_dictionary(client: Minio, bucket: str, entries: Dict[str, Dict]):
+    """Upload the packed dictionary artifact"""
+    packed = build_packed_dictionary(entries)
+    client.put_object(
+        bucket,
+        PACKED_DICTIONARY_OBJECT,
+        io.BytesIO(packed),
+        len(packed),
+        content_type='application/octet-stream'
+    )
+    print(f"✅ Uploaded packed dictionary: {len(entries)} words ({len(packed) // 1024} KB)")
+
+
 def main():
     print("=" * 60)
     print("SPDict-Anh-Viet-Anh Dictionary Ingestion")
@@ -172,14 +236,14 @@ def main():
         print(f"✅ Connected to bucket: {MINIO_BUCKET}")
     
     # Check if dictionary already ingested (check for a common word)
+    already_ingested = False
     try:
         client.stat_object(MINIO_BUCKET, "pronunciation/hello.json")
         # Count existing pronunciation files
         existing_count = sum(1 for _ in client.list_objects(MINIO_BUCKET, prefix="pronunciation/", recursive=True))
         if existing_count > 40000:
-            print(f"\n✅ Dictionary already ingested ({existing_count} words). Skipping...")
-            print("=" * 60)
-            return
+            print(f"\n✅ Dictionary already ingested ({existing_count} words). Skipping word uploads...")
+            already_ingested = True
         else:
             print(f"\n⚠️ Found {existing_count} words, expected 45k+. Re-ingesting...")
     except Exception:
@@ -194,6 +258,8 @@ def main():
     print("\n🚀 Processing dictionary entries...")
     success_count = 0
     error_count = 0
+    word_ipas = {}
+    packed_entries = {}
     
     with open(DICT_FILE, 'rb') as dict_file:
         for i, (word, (offset, length)) in enumerate(entries.items()):
@@ -205,9 +271,13 @@ def main():
                 entry_data = extract_entry_data(content, word)
                 
                 if entry_data and entry_data.get('ipa'):
+                    word_ipas[word] = entry_data['ipa']
+                    packed_entries[word] = entry_data
+                    
                     # Upload to MinIO
-                    object_name = f"pronunciation/{word}.json"
-                    upload_to_minio(client, MINIO_BUCKET, object_name, entry_data)
+                    if not already_ingested:
+                        object_name = f"pronunciation/{word}.json"
+                        upload_to_minio(client, MINIO_BUCKET, object_name, entry_data)
                     success_count += 1
                     
                     if success_count % 1000 == 0:
@@ -220,6 +290,10 @@ def main():
                 if error_count <= 5:
                     print(f"   ⚠ Error processing '{word}': {e}")
     
+    # The word index and packed dictionary are cheap to rebuild, so they are refreshed on every run
+    upload_word_index(client, MINIO_BUCKET, word_ipas)
+    upload_packed_dictionary(client, MINIO_BUCKET, packed_entries)
+    
     print("\n" + "=" * 60)
     print(f"✅ Successfully ingested: {success_count} words")
     print(f"⚠ Skipped (no IPA): {error_count} words")